@@ -1,27 +1,65 @@
 from Client.models.user_model import UserModel
 from Client.models.log_model import LogModel
+from Client.models.risk_control_model import LogMonitoringModel
+from Client.utils.metrics import get_registry
+from Client.utils.logger import timed
+from Client.utils.security import PasswordManager, get_password_executor
 
+LOGIN_ATTEMPTS = get_registry().counter(
+    'login_attempts_total', 'Login attempts by outcome', ('result',))
+LOGIN_SECONDS = get_registry().histogram(
+    'login_duration_seconds', 'Time to authenticate a login attempt')
+
+@timed
 class AdminController:
     def __init__(self):
         pass
     
     def login(self, username, password, is_admin_login):
         """Handle login attempt and return success status."""
-        user_type = UserModel.authenticate(username, password)
+        credentials = UserModel.get_credentials(username)
+        verified = self._verify_password(password, credentials)
+        return self.finish_login(username, password, is_admin_login, credentials, verified)
+    
+    def submit_login(self, username, password, is_admin_login):
+        """Start a login without running the password check on the calling thread.
         
-        if user_type is None:
+        The stored credentials are read here and only the password check runs
+        on the password pool. The Future resolves to (credentials, verified);
+        pass both to finish_login() back on the calling thread.
+        """
+        credentials = UserModel.get_credentials(username)
+        return get_password_executor().submit(
+            lambda: (credentials, self._verify_password(password, credentials)))
+    
+    def finish_login(self, username, password, is_admin_login, credentials, verified):
+        """Record the outcome of a password check and return success status."""
+        if not verified:
+            LOGIN_ATTEMPTS.labels('failure').inc()
             return False
         
+        is_admin, stored = credentials
+        UserModel.upgrade_password(username, password, stored)
+        
         # Check permission
-        if is_admin_login and not user_type:
+        if is_admin_login and not is_admin:
+            LOGIN_ATTEMPTS.labels('denied').inc()
             return False
         
+        LOGIN_ATTEMPTS.labels('success').inc()
+        
         # Log login
         user_role = "Administrator" if is_admin_login else "Regular User"
         LogModel.add_log(username, 'Login', f'{user_role} logged into the system')
         
         return True
     
+    def _verify_password(self, password, credentials):
+        if credentials is None:
+            return False
+        with LOGIN_SECONDS.time():
+            return PasswordManager.verify_password(password, credentials[1], allow_plaintext=True)
+    
     def get_log_details(self, log_id):
         """Get details for a specific log."""
         return LogModel.get_log_details(log_id)
@@ -29,3 +67,7 @@ class AdminController:
     def get_all_logs(self):
         """Get all logs."""
         return LogModel.get_all_logs()
+    
+    def search_logs(self, **filters):
+        """Get one page of monitoring logs matching the filters."""
+        return LogMonitoringModel.search_logs(**filters)
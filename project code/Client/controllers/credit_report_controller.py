@@ -3,8 +3,11 @@ Implementation of the new credit report controller
 """
 from Client.models.credit_report_model import CreditReportModel
 from Client.models.risk_control_model import LogMonitoringModel
+from Client.models.database import unit_of_work
+from Client.utils.logger import timed
 import random
 
+@timed
 class CreditReportController:
     def __init__(self, current_username=None):
         self.current_username = current_username
@@ -32,69 +35,75 @@ class CreditReportController:
         # Generate a new log ID
         log_id = random.randint(1000, 9999)
         
-        # Create a log entry
-        LogMonitoringModel.add_log(
-            log_id=log_id,
-            operator=self.current_username,
-            operation=f"Add credit report - {name}",
-            is_warning=0,
-            is_done=1,
-            warning_type=""
-        )
-        
-        # Add credit report
-        return CreditReportModel.add_report(
-            rule_id, name, value, value_type, status, data_source, risk_domain, identification
-        )
+        with unit_of_work() as uow:
+            # Create a log entry
+            LogMonitoringModel.add_log(
+                log_id=log_id,
+                operator=self.current_username,
+                operation=f"Add credit report - {name}",
+                is_warning=0,
+                is_done=1,
+                warning_type=""
+            )
+            
+            # Add credit report
+            success = CreditReportModel.add_report(
+                rule_id, name, value, value_type, status, data_source, risk_domain, identification
+            )
+        return success and uow.committed
     
     def update_report_status(self, report_id, status):
         """Update credit report status"""
         if not self.current_username:
             return False
             
-        # Get report info
-        report = CreditReportModel.get_report_by_id(report_id)
-        if not report:
-            return False
+        with unit_of_work() as uow:
+            # Get report info
+            report = CreditReportModel.get_report_by_id(report_id)
+            if not report:
+                return False
+                
+            # Generate a new log ID
+            log_id = random.randint(1000, 9999)
             
-        # Generate a new log ID
-        log_id = random.randint(1000, 9999)
-        
-        # Create a log entry
-        LogMonitoringModel.add_log(
-            log_id=log_id,
-            operator=self.current_username,
-            operation=f"Update credit report status - ID: {report_id}",
-            is_warning=0,
-            is_done=1,
-            warning_type=""
-        )
-        
-        # Update status
-        return CreditReportModel.update_report_status(report_id, status)
+            # Create a log entry
+            LogMonitoringModel.add_log(
+                log_id=log_id,
+                operator=self.current_username,
+                operation=f"Update credit report status - ID: {report_id}",
+                is_warning=0,
+                is_done=1,
+                warning_type=""
+            )
+            
+            # Update status
+            success = CreditReportModel.update_report_status(report_id, status)
+        return success and uow.committed
     
     def delete_report(self, report_id):
         """Delete credit report"""
         if not self.current_username:
             return False
             
-        # Get report info
-        report = CreditReportModel.get_report_by_id(report_id)
-        if not report:
-            return False
+        with unit_of_work() as uow:
+            # Get report info
+            report = CreditReportModel.get_report_by_id(report_id)
+            if not report:
+                return False
+                
+            # Generate a new log ID
+            log_id = random.randint(1000, 9999)
             
-        # Generate a new log ID
-        log_id = random.randint(1000, 9999)
-        
-        # Create a log entry
-        LogMonitoringModel.add_log(
-            log_id=log_id,
-            operator=self.current_username,
-            operation=f"Delete credit report - ID: {report_id}",
-            is_warning=0,
-            is_done=1,
-            warning_type=""
-        )
-        
-        # Delete report
-        return CreditReportModel.delete_report(report_id)
+            # Create a log entry
+            LogMonitoringModel.add_log(
+                log_id=log_id,
+                operator=self.current_username,
+                operation=f"Delete credit report - ID: {report_id}",
+                is_warning=0,
+                is_done=1,
+                warning_type=""
+            )
+            
+            # Delete report
+            success = CreditReportModel.delete_report(report_id)
+        return success and uow.committed
@@ -1,7 +1,11 @@
 from Client.models.model_management_model import ModelManagementModel
 from Client.models.risk_control_model import LogMonitoringModel
+from Client.models.database import unit_of_work
+from Client.models.model_serving import get_model_cache
+from Client.utils.logger import timed
 import random
 
+@timed
 class ModelManagementController:
     def __init__(self, current_username=None):
         self.current_username = current_username
@@ -25,6 +29,10 @@ class ModelManagementController:
         """Get models with errors."""
         return ModelManagementModel.get_model_errors()
     
+    def upload_model_file(self, file_path, progress=None):
+        """Stream a model file into the artifact store; pass the result to add_model."""
+        return ModelManagementModel.store_model_file(file_path, progress)
+    
     def add_model(self, model_name, model_file, model_version, environment, approver):
         """Add a new model."""
         if not self.current_username:
@@ -33,21 +41,23 @@ class ModelManagementController:
         # Generate a new log ID
         log_id = random.randint(1000, 9999)
         
-        # Create a log entry
-        LogMonitoringModel.add_log(
-            log_id=log_id,
-            operator=self.current_username,
-            operation=f"Add model {model_name} {model_version}",
-            is_warning=0,
-            is_done=1,
-            warning_type=""
-        )
-        
-        # Add the model
-        return ModelManagementModel.add_model(
-            log_id, model_name, model_file, model_version, environment,
-            self.current_username, approver
-        )
+        with unit_of_work() as uow:
+            # Create a log entry
+            LogMonitoringModel.add_log(
+                log_id=log_id,
+                operator=self.current_username,
+                operation=f"Add model {model_name} {model_version}",
+                is_warning=0,
+                is_done=1,
+                warning_type=""
+            )
+            
+            # Add the model
+            success = ModelManagementModel.add_model(
+                log_id, model_name, model_file, model_version, environment,
+                self.current_username, approver
+            )
+        return success and uow.committed
     
     def toggle_rollback(self, model_id, rollback_state):
         """Toggle the rollback state of a model."""
@@ -59,17 +69,22 @@ class ModelManagementController:
         
         # Create a log entry
         action = "Rollback" if rollback_state else "Cancel rollback"
-        LogMonitoringModel.add_log(
-            log_id=log_id,
-            operator=self.current_username,
-            operation=f"{action} model ID: {model_id}",
-            is_warning=0,
-            is_done=1,
-            warning_type=""
-        )
-        
-        # Toggle rollback state
-        return ModelManagementModel.toggle_rollback(model_id, rollback_state)
+        with unit_of_work() as uow:
+            LogMonitoringModel.add_log(
+                log_id=log_id,
+                operator=self.current_username,
+                operation=f"{action} model ID: {model_id}",
+                is_warning=0,
+                is_done=1,
+                warning_type=""
+            )
+            
+            # Toggle rollback state
+            success = ModelManagementModel.toggle_rollback(model_id, rollback_state)
+        if success and uow.committed:
+            # A served copy must not outlive a rollback or loss of verification
+            get_model_cache().invalidate_model(int(model_id))
+        return success and uow.committed
     
     def toggle_verified(self, model_id, verified_state):
         """Toggle the verified state of a model."""
@@ -81,14 +96,19 @@ class ModelManagementController:
         
         # Create a log entry
         action = "Verified" if verified_state else "Unverified"
-        LogMonitoringModel.add_log(
-            log_id=log_id,
-            operator=self.current_username,
-            operation=f"{action} model ID: {model_id}",
-            is_warning=0,
-            is_done=1,
-            warning_type=""
-        )
-        
-        # Toggle verified state
-        return ModelManagementModel.toggle_verified(model_id, verified_state)
+        with unit_of_work() as uow:
+            LogMonitoringModel.add_log(
+                log_id=log_id,
+                operator=self.current_username,
+                operation=f"{action} model ID: {model_id}",
+                is_warning=0,
+                is_done=1,
+                warning_type=""
+            )
+            
+            # Toggle verified state
+            success = ModelManagementModel.toggle_verified(model_id, verified_state)
+        if success and uow.committed:
+            # A served copy must not outlive a rollback or loss of verification
+            get_model_cache().invalidate_model(int(model_id))
+        return success and uow.committed
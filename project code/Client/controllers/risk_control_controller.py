@@ -1,6 +1,23 @@
 from Client.models.risk_control_model import NameListModel, RuleModel, LogMonitoringModel
+from Client.models.database import unit_of_work
+from Client.models import model_serving, shadow_scoring, drift_monitor
+from Client.utils.metrics import get_registry
+from Client.utils.logger import timed
 import random
+import time
 
+NAME_LIST_CHECKS = get_registry().counter(
+    'name_list_checks_total', 'Name list lookups by outcome', ('result',))
+NAME_LIST_CHECK_SECONDS = get_registry().histogram(
+    'name_list_check_duration_seconds', 'Name list lookup latency')
+RULE_EVALUATION_SECONDS = get_registry().histogram(
+    'rule_evaluation_duration_seconds', 'Time to evaluate the active rules for one applicant')
+RULE_HITS = get_registry().counter(
+    'rule_hits_total', 'Rules triggered during loan evaluation', ('rule_id',))
+LOAN_EVALUATIONS = get_registry().counter(
+    'loan_evaluations_total', 'Loan applications evaluated by decision', ('decision',))
+
+@timed
 class RiskControlController:
     def __init__(self, current_username=None):
         self.current_username = current_username
@@ -14,7 +31,10 @@ class RiskControlController:
     
     def check_hit(self, value, value_type=None):
         """Check if a value hits any rule in the name list."""
-        return NameListModel.check_hit(value, value_type)
+        with NAME_LIST_CHECK_SECONDS.time():
+            hits = NameListModel.check_hit(value, value_type)
+        NAME_LIST_CHECKS.labels('hit' if hits else 'miss').inc()
+        return hits
     
     def add_name_list_entry(self, rule_id, risk_level, list_type, business_line, 
                            risk_label, risk_domain, value, value_type):
@@ -25,21 +45,23 @@ class RiskControlController:
         # Generate a new log ID
         log_id = random.randint(1000, 9999)
         
-        # Create a log entry
-        LogMonitoringModel.add_log(
-            log_id=log_id,
-            operator=self.current_username,
-            operation="Add name list record",
-            is_warning=0,
-            is_done=1,
-            warning_type=""
-        )
-        
-        # Add the entry
-        return NameListModel.add_entry(
-            rule_id, log_id, risk_level, list_type, business_line,
-            risk_label, risk_domain, value, value_type, self.current_username
-        )
+        with unit_of_work() as uow:
+            # Create a log entry
+            LogMonitoringModel.add_log(
+                log_id=log_id,
+                operator=self.current_username,
+                operation="Add name list record",
+                is_warning=0,
+                is_done=1,
+                warning_type=""
+            )
+            
+            # Add the entry
+            success = NameListModel.add_entry(
+                rule_id, log_id, risk_level, list_type, business_line,
+                risk_label, risk_domain, value, value_type, self.current_username
+            )
+        return success and uow.committed
     
     def delete_name_list_entry(self, entry_id):
         """Delete an entry from the name list."""
@@ -49,18 +71,20 @@ class RiskControlController:
         # Generate a new log ID
         log_id = random.randint(1000, 9999)
         
-        # Create a log entry
-        LogMonitoringModel.add_log(
-            log_id=log_id,
-            operator=self.current_username,
-            operation="Delete name list record",
-            is_warning=0,
-            is_done=1,
-            warning_type=""
-        )
-        
-        # Delete the entry
-        return NameListModel.delete_entry(entry_id)
+        with unit_of_work() as uow:
+            # Create a log entry
+            LogMonitoringModel.add_log(
+                log_id=log_id,
+                operator=self.current_username,
+                operation="Delete name list record",
+                is_warning=0,
+                is_done=1,
+                warning_type=""
+            )
+            
+            # Delete the entry
+            success = NameListModel.delete_entry(entry_id)
+        return success and uow.committed
     
     def get_all_rules(self):
         """Get all rules from rule management."""
@@ -83,21 +107,23 @@ class RiskControlController:
         rule_id = random.randint(100, 999)
         log_id = random.randint(1000, 9999)
         
-        # Create a log entry
-        LogMonitoringModel.add_log(
-            log_id=log_id,
-            operator=self.current_username,
-            operation="Create rule",
-            is_warning=0,
-            is_done=1,
-            warning_type=""
-        )
-        
-        # Add the rule
-        return RuleModel.add_rule(
-            rule_id, log_id, rule_name, rule_expression, 
-            is_external, priority, self.current_username
-        )
+        with unit_of_work() as uow:
+            # Create a log entry
+            LogMonitoringModel.add_log(
+                log_id=log_id,
+                operator=self.current_username,
+                operation="Create rule",
+                is_warning=0,
+                is_done=1,
+                warning_type=""
+            )
+            
+            # Add the rule
+            success = RuleModel.add_rule(
+                rule_id, log_id, rule_name, rule_expression, 
+                is_external, priority, self.current_username
+            )
+        return success and uow.committed
     
     def get_all_logs(self):
         """Get all logs."""
@@ -114,17 +140,19 @@ class RiskControlController:
             
         # Add a new log for this action
         new_log_id = random.randint(1000, 9999)
-        LogMonitoringModel.add_log(
-            log_id=new_log_id,
-            operator=self.current_username,
-            operation=f"Mark log {log_id} as done",
-            is_warning=0,
-            is_done=1,
-            warning_type=""
-        )
-        
-        # Mark the original log as done
-        return LogMonitoringModel.mark_as_done(log_id)
+        with unit_of_work() as uow:
+            LogMonitoringModel.add_log(
+                log_id=new_log_id,
+                operator=self.current_username,
+                operation=f"Mark log {log_id} as done",
+                is_warning=0,
+                is_done=1,
+                warning_type=""
+            )
+            
+            # Mark the original log as done
+            success = LogMonitoringModel.mark_as_done(log_id)
+        return success and uow.committed
     
     def get_log_by_type(self, log_type):
         """Get logs by type"""
@@ -267,12 +295,48 @@ class RiskControlController:
         active_rules = self.get_active_rules()
         print(f"已加载 {len(active_rules)} 条规则")
         
-        # 2. 初始化评分
+        # 2. 规则评分
+        rule_score, rule_results = self._evaluate_rules(applicant_data, active_rules)
+        
+        # 3. 模型推理（与并发请求合批，最多等待 MODEL_BATCH_MAX_WAIT_MS）
+        model_score = model_serving.get_batch_scorer().score(applicant_data)
+        
+        # 4. 挑战者模型影子评分（后台线程池，不影响请求延迟）
+        shadow_scoring.shadow_score([applicant_data], [model_score])
+        
+        return self._finalize_evaluation(applicant_data, rule_score, model_score, rule_results)
+    
+    def evaluate_loan_applications(self, applicants):
+        """
+        批量评估贷款申请：规则逐条评估，模型对整批只调用一次
+        
+        Args:
+            applicants (list): 申请人数据字典列表
+            
+        Returns:
+            list: 与 applicants 顺序一致的评估结果
+        """
+        if not self.current_username:
+            return [{"approved": False, "score": 0, "reason": "未授权的评估"} for _ in applicants]
+        
+        active_rules = self.get_active_rules()
+        rule_stage = [self._evaluate_rules(applicant, active_rules) for applicant in applicants]
+        model_scores = model_serving.score_batch(applicants)
+        shadow_scoring.shadow_score(applicants, model_scores)
+        
+        return [
+            self._finalize_evaluation(applicant, rule_score, model_score, rule_results)
+            for applicant, (rule_score, rule_results), model_score
+            in zip(applicants, rule_stage, model_scores)
+        ]
+    
+    def _evaluate_rules(self, applicant_data, active_rules):
+        """规则阶段：返回 (规则评分, 触发的规则列表)"""
+        started = time.perf_counter()
         base_score = 100
         score = base_score
         rule_results = []
         
-        # 3. 评估每条规则
         for rule in active_rules:
             rule_id = str(rule[1])
             rule_name = rule[3]
@@ -285,6 +349,7 @@ class RiskControlController:
             
             if is_triggered:
                 print(f"规则触发! 扣除 {penalty} 分")
+                RULE_HITS.labels(rule_id).inc()
                 score -= penalty
                 rule_results.append({
                     "rule_id": rule_id,
@@ -293,13 +358,25 @@ class RiskControlController:
                     "penalty": penalty
                 })
         
-        # 4. 确定最终评估结果
+        RULE_EVALUATION_SECONDS.observe(time.perf_counter() - started)
+        return score, rule_results
+    
+    def _finalize_evaluation(self, applicant_data, rule_score, model_score, rule_results):
+        """融合规则与模型评分，记录结果并处理拒绝名单"""
+        # 1. 按 RULE_SCORE_WEIGHT / MODEL_SCORE_WEIGHT 融合评分
+        score = model_serving.blend_scores(rule_score, model_score)
+        if model_score is not None:
+            print(f"规则评分: {rule_score}/100, 模型评分: {model_score}/100")
+        
+        # 2. 确定最终评估结果，并计入输入与评分的漂移直方图
         approved = score >= 60
+        LOAN_EVALUATIONS.labels('approved' if approved else 'rejected').inc()
+        drift_monitor.observe_scored_application(applicant_data, score)
         print(f"\n最终评分: {score}/100")
         print(f"决定: {'通过' if approved else '拒绝'}")
         print("========= 评估结束 =========\n")
         
-        # 5. 记录评估结果
+        # 3. 记录评估结果
         log_id = random.randint(1000, 9999)
         LogMonitoringModel.add_log(
             log_id=log_id,
@@ -312,7 +389,7 @@ class RiskControlController:
             warning_type="" if approved else "风控评分过低"
         )
         
-        # 6. 如果拒绝，添加到名单
+        # 4. 如果拒绝，添加到名单
         if not approved:
             for rule_result in rule_results:
                 try:
@@ -335,10 +412,12 @@ class RiskControlController:
                     traceback.print_exc()
                     print(f"添加名单失败: {str(e)}")
         
-        # 7. 返回评估结果
+        # 5. 返回评估结果
         return {
             "approved": approved,
             "score": score,
+            "rule_score": rule_score,
+            "model_score": model_score,
             "rule_results": rule_results,
         }
 
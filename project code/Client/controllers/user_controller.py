@@ -1,6 +1,10 @@
+from concurrent.futures import Future
 from Client.models.user_model import UserModel
 from Client.models.log_model import LogModel
+from Client.utils.logger import timed
+from Client.utils.security import PasswordManager
 
+@timed
 class UserController:
     def __init__(self, current_username=None):
         self.current_username = current_username
@@ -14,14 +18,28 @@ class UserController:
     def get_all_users(self):
         return UserModel.get_all_users()
     
-    def add_user(self, username, password, is_admin, full_name, email, phone):
-        success = UserModel.add_user(username, password, is_admin, full_name, email, phone)
+    def submit_password_hash(self, password):
+        """Hash a new password on the password pool; returns a Future of the hash (None for no password)."""
+        if not password:
+            future = Future()
+            future.set_result(None)
+            return future
+        return PasswordManager.submit_hash_password(password)
+    
+    def add_user(self, username, password, is_admin, full_name, email, phone, password_hash=None):
+        """Add a user; pass password_hash from submit_password_hash to skip hashing here."""
+        if password_hash is None:
+            password_hash = self.submit_password_hash(password).result()
+        success = UserModel.add_user(username, password_hash, is_admin, full_name, email, phone)
         if success and self.current_username:
             LogModel.add_log(self.current_username, '创建用户', f'创建了用户: {username}')
         return success
     
-    def update_user(self, user_id, username, password, is_admin, full_name, email, phone):
-        success, old_username = UserModel.update_user(user_id, username, password, is_admin, full_name, email, phone)
+    def update_user(self, user_id, username, password, is_admin, full_name, email, phone, password_hash=None):
+        """Update a user; pass password_hash from submit_password_hash to skip hashing here."""
+        if password_hash is None:
+            password_hash = self.submit_password_hash(password).result()
+        success, old_username = UserModel.update_user(user_id, username, password_hash, is_admin, full_name, email, phone)
         if success and self.current_username:
             LogModel.add_log(self.current_username, '更新用户', f'更新了用户信息: {old_username} -> {username}')
         return success
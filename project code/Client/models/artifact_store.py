@@ -0,0 +1,142 @@
+"""
+Content-addressed storage for model artifacts
+
+Artifacts live on disk under MODEL_STORAGE_PATH, named by the SHA-256 of
+their bytes (<root>/ab/abcdef...), so identical uploads are stored once and
+the database only keeps the digest, size and relative path.
+"""
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import namedtuple
+
+try:
+    from config.settings import current_config
+except ImportError:
+    # Fallback for when config is not available
+    class MockConfig:
+        MODEL_STORAGE_PATH = './models'
+    current_config = MockConfig()
+
+logger = logging.getLogger('artifact_store')
+
+CHUNK_SIZE = 1024 * 1024
+
+StoredArtifact = namedtuple('StoredArtifact', ['sha256', 'size', 'path'])
+
+
+class ArtifactStore:
+    """Deduplicating artifact store rooted at a directory"""
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+
+    @staticmethod
+    def relative_path(digest):
+        """Path of an artifact relative to the store root"""
+        if len(digest) != 64 or not all(c in '0123456789abcdef' for c in digest):
+            raise ValueError(f"Invalid SHA-256 digest: {digest!r}")
+        return f"{digest[:2]}/{digest}"
+
+    def path_for(self, digest):
+        return os.path.join(self.root, *self.relative_path(digest).split('/'))
+
+    def exists(self, digest):
+        return os.path.exists(self.path_for(digest))
+
+    def put_stream(self, stream, chunk_size=CHUNK_SIZE, progress=None, total=None):
+        """Store everything read from a binary stream, hashing as it is written
+
+        Only one chunk is held in memory at a time. The data goes to a
+        temporary file first and is renamed into place only if no artifact
+        with the same digest exists yet.
+
+        Args:
+            progress: Optional callable(bytes_written, total) called after each chunk
+            total: Expected size passed through to progress, if known
+        """
+        os.makedirs(self.root, exist_ok=True)
+        sha256 = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                for chunk in iter(lambda: stream.read(chunk_size), b''):
+                    sha256.update(chunk)
+                    tmp.write(chunk)
+                    size += len(chunk)
+                    if progress:
+                        progress(size, total)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+
+            digest = sha256.hexdigest()
+            final_path = self.path_for(digest)
+            if os.path.exists(final_path):
+                # Refresh the mtime so prune() treats it like a fresh upload
+                os.utime(final_path)
+                logger.info(f"Artifact {digest} already stored, skipping duplicate upload")
+            else:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                os.replace(tmp_path, final_path)
+                logger.info(f"Stored artifact {digest} ({size} bytes)")
+            return StoredArtifact(digest, size, self.relative_path(digest))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def put_bytes(self, data):
+        """Store an in-memory artifact"""
+        return self.put_stream(io.BytesIO(data))
+
+    def put_file(self, file_path, chunk_size=CHUNK_SIZE, progress=None):
+        """Store a file without reading it into memory"""
+        with open(file_path, 'rb') as f:
+            return self.put_stream(f, chunk_size, progress, os.fstat(f.fileno()).st_size)
+
+    def open(self, digest):
+        """Open a stored artifact for reading"""
+        return open(self.path_for(digest), 'rb')
+
+    def read_bytes(self, digest):
+        with self.open(digest) as f:
+            return f.read()
+
+    def prune(self, keep, min_age=3600):
+        """Delete stored artifacts whose digest is not in keep; returns the number removed
+
+        Files younger than min_age seconds are left alone so an upload whose
+        row has not been committed yet is not removed from under it.
+        """
+        keep = set(keep)
+        cutoff = time.time() - min_age
+        removed = 0
+        if not os.path.isdir(self.root):
+            return removed
+        for prefix in os.listdir(self.root):
+            shard = os.path.join(self.root, prefix)
+            if len(prefix) != 2 or not os.path.isdir(shard):
+                continue
+            for digest in os.listdir(shard):
+                path = os.path.join(shard, digest)
+                if digest not in keep and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+        return removed
+
+
+_STORES = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_artifact_store(root=None):
+    """Get the store for root, defaulting to MODEL_STORAGE_PATH"""
+    root = os.path.abspath(root or current_config.MODEL_STORAGE_PATH)
+    with _STORES_LOCK:
+        if root not in _STORES:
+            _STORES[root] = ArtifactStore(root)
+        return _STORES[root]
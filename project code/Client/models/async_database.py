@@ -0,0 +1,183 @@
+"""
+Async facade over the data-access layer for asyncio services
+
+Every database gets a dedicated, bounded thread pool sized to the connection
+pool, so the event loop never blocks on a query and the facade can never hold
+more connections than the pool allows. On PostgreSQL, asyncpg is used for
+execute_query when it is installed.
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from Client.models import database
+from Client.models.credit_report_model import CreditReportModel
+from Client.models.model_management_model import ModelManagementModel
+from Client.models.risk_control_model import NameListModel, RuleModel, LogMonitoringModel
+from Client.models.user_model import UserModel
+
+try:
+    import asyncpg
+    HAS_ASYNCPG = True
+except ImportError:
+    HAS_ASYNCPG = False
+
+logger = logging.getLogger('async_database')
+
+_PLACEHOLDER_RE = re.compile(r"\?|%s")
+
+# One facade per database, keyed by its connection target
+_DATABASES = {}
+_DATABASES_LOCK = threading.Lock()
+
+
+def _to_asyncpg_query(query):
+    """Rewrite ? / %s placeholders into asyncpg's $1, $2, ..."""
+    counter = iter(range(1, query.count('?') + query.count('%s') + 1))
+    return _PLACEHOLDER_RE.sub(lambda _: f"${next(counter)}", query)
+
+
+class AsyncDatabase:
+    """Async access to one database"""
+
+    def __init__(self, name, max_workers=None):
+        self.name = name
+        self.max_workers = max_workers or database.MAX_POOL_SIZE
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix=f'db-{name}'
+        )
+        self._native_pool = None
+        self._native_lock = None
+
+    @property
+    def uses_native_driver(self):
+        return HAS_ASYNCPG and database.DB_TYPE == 'postgres'
+
+    async def run(self, func, *args, **kwargs):
+        """Run a blocking data-access callable on this database's thread pool
+
+        The caller's context (e.g. read_your_writes()) is carried into the worker thread.
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(context.run, func, *args, **kwargs)
+        )
+
+    async def _get_native_pool(self):
+        if self._native_pool is None:
+            if self._native_lock is None:
+                self._native_lock = asyncio.Lock()
+            async with self._native_lock:
+                if self._native_pool is None:
+                    self._native_pool = await asyncpg.create_pool(
+                        host=database.PG_HOST,
+                        port=int(database.PG_PORT),
+                        database=database.PG_DB,
+                        user=database.PG_USER,
+                        password=database.PG_PASSWORD,
+                        min_size=1,
+                        max_size=self.max_workers
+                    )
+        return self._native_pool
+
+    async def execute_query(self, query, params=None, read_your_writes=False):
+        """Execute a database query and return the result"""
+        if not self.uses_native_driver or database.has_read_target():
+            return await self.run(database.execute_query, query, params, read_your_writes)
+        try:
+            pool = await self._get_native_pool()
+            async with pool.acquire() as conn:
+                rows = await conn.fetch(_to_asyncpg_query(query), *(params or ()))
+            return [tuple(row) for row in rows]
+        except Exception as e:
+            logger.error(f"Async database operation error: {str(e)}")
+            raise
+
+    async def execute_update(self, query, params=None):
+        """Execute a database update operation
+
+        Writes always go through database.execute_update on the thread pool,
+        even with asyncpg, so they join the caller's unit of work, are traced
+        and counted, and invalidate cached reads of the tables they touch.
+        """
+        return await self.run(database.execute_update, query, params)
+
+    async def close(self):
+        """Close the native pool and wait for queued work to finish"""
+        if self._native_pool is not None:
+            await self._native_pool.close()
+            self._native_pool = None
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+
+
+class AsyncModel:
+    """Expose a model class's static methods as coroutines
+
+    Example:
+        hits = await async_name_list.check_hit('110101199001011234', 1)
+    """
+
+    def __init__(self, model_cls, db=None):
+        self._model_cls = model_cls
+        self._db = db
+
+    def __getattr__(self, name):
+        method = getattr(self._model_cls, name)
+        if name.startswith('_') or not callable(method):
+            raise AttributeError(name)
+
+        @functools.wraps(method)
+        async def call(*args, **kwargs):
+            db = self._db or get_async_database()
+            return await db.run(method, *args, **kwargs)
+
+        return call
+
+
+def _database_key():
+    if database.DB_TYPE == 'sqlite':
+        return f"sqlite:{database.SQLITE_DB_PATH}"
+    return f"postgres:{database.PG_HOST}:{database.PG_PORT}/{database.PG_DB}"
+
+
+def get_async_database():
+    """Get the async facade for the configured database"""
+    key = _database_key()
+    with _DATABASES_LOCK:
+        if key not in _DATABASES:
+            _DATABASES[key] = AsyncDatabase(name=str(len(_DATABASES)))
+        return _DATABASES[key]
+
+
+async def shutdown_async_databases():
+    """Close every async facade (call on service shutdown)"""
+    with _DATABASES_LOCK:
+        databases = list(_DATABASES.values())
+        _DATABASES.clear()
+    for db in databases:
+        await db.close()
+
+
+async def execute_query(query, params=None, read_your_writes=False):
+    """Execute a database query without blocking the event loop"""
+    return await get_async_database().execute_query(query, params, read_your_writes)
+
+
+async def execute_update(query, params=None):
+    """Execute a database update without blocking the event loop"""
+    return await get_async_database().execute_update(query, params)
+
+
+# Async views of the models used on the request path
+async_users = AsyncModel(UserModel)
+async_name_list = AsyncModel(NameListModel)
+async_rules = AsyncModel(RuleModel)
+async_log_monitoring = AsyncModel(LogMonitoringModel)
+async_credit_reports = AsyncModel(CreditReportModel)
+async_models = AsyncModel(ModelManagementModel)
@@ -2,12 +2,14 @@
 Implementation of the credit report model
 """
 from Client.models.database import get_connection, get_db_cursor, execute_query, execute_update
+from Client.utils.logger import timed
 from datetime import date
 import random
 import logging
 
 logger = logging.getLogger('credit_report')
 
+@timed
 class CreditReportModel:
     @staticmethod
     def get_all_reports():
@@ -20,7 +22,7 @@ class CreditReportModel:
                 FROM credit_report
                 ORDER BY create_time DESC
             """
-            return execute_query(query)
+            return execute_query(query, read_target=True)
         except Exception as e:
             logger.error(f"Failed to get credit reports: {str(e)}")
             return []
@@ -32,7 +34,7 @@ class CreditReportModel:
             query = """
                 SELECT * FROM credit_report WHERE id = ?
             """
-            results = execute_query(query, (report_id,))
+            results = execute_query(query, (report_id,), read_target=True)
             return results[0] if results else None
         except Exception as e:
             logger.error(f"Failed to get credit report by ID: {str(e)}")
@@ -65,7 +67,7 @@ class CreditReportModel:
                 
             query += " ORDER BY create_time DESC"
             
-            return execute_query(query, params)
+            return execute_query(query, params, read_target=True)
         except Exception as e:
             logger.error(f"Failed to search credit reports: {str(e)}")
             return []
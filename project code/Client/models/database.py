@@ -3,16 +3,57 @@ Improve database.py by adding connection pooling and exception handling
 """
 import sqlite3
 import os
+import re
+import io
+import ast
 import csv  # Add missing csv import
-import psycopg2  # Requires installation: pip install psycopg2-binary
+import time
+import threading
+import contextvars
+import atexit
+from pathlib import Path
+from datetime import date, datetime
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 import logging
 
+from Client.models.query_cache import QueryCache, normalize_sql, tables_read_by, table_written_by
+from Client.models.query_stats import QueryStats
+from Client.models.artifact_store import get_artifact_store
+from Client.utils.metrics import get_registry
+from Client.utils.tracing import start_span
+
+try:
+    import psycopg2  # Requires installation: pip install psycopg2-binary
+    HAS_PSYCOPG2 = True
+except ImportError:
+    HAS_PSYCOPG2 = False
+
+try:
+    from config.settings import current_config
+except ImportError:
+    # Fallback for when config is not available
+    class MockConfig:
+        DB_READ_NAME = ''
+        PG_READ_HOST = ''
+        PG_READ_PORT = 5432
+        SQLITE_REPLICA_SYNC_DELAY = 0.5
+        QUERY_CACHE_ENABLED = True
+        QUERY_CACHE_SIZE = 256
+        QUERY_CACHE_TTL = 30.0
+        QUERY_STATS_ENABLED = True
+        SLOW_QUERY_THRESHOLD_MS = 200.0
+        QUERY_STATS_FILE = 'query_stats.json'
+        VACUUM_STEP_PAGES = 1000
+        VACUUM_MAX_STEPS = 100
+    current_config = MockConfig()
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
                     filename='database.log')
 logger = logging.getLogger('database')
+slow_query_logger = logging.getLogger('database.slow')
 
 # Configure database type: 'sqlite' or 'postgres'
 DB_TYPE = 'sqlite'
@@ -24,108 +65,1198 @@ PG_DB = 'risk_control'
 PG_USER = 'postgres'
 PG_PASSWORD = 'postgres'
 
-# Global connection pool (simple implementation)
+# SQLite database file
+SQLITE_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'user_management.db')
+
+# Read target: a SQLite file (opened read-only; may be the primary file itself)
+# or a PostgreSQL replica host. Empty means reads go to the primary.
+SQLITE_READ_DB_PATH = (
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), current_config.DB_READ_NAME)
+    if current_config.DB_READ_NAME else None
+)
+PG_READ_HOST = current_config.PG_READ_HOST or None
+# Seconds a separate SQLite read file may trail the primary after a commit
+SQLITE_REPLICA_SYNC_DELAY = current_config.SQLITE_REPLICA_SYNC_DELAY
+_replica_sync_timer = None
+_replica_sync_lock = threading.Lock()
+PG_READ_PORT = str(current_config.PG_READ_PORT)
+
+# Connection targets
+PRIMARY = 'primary'
+READ = 'read'
+
+# Global connection pools (simple implementation), one per target
 CONNECTION_POOL = []
+READ_CONNECTION_POOL = []
 MAX_POOL_SIZE = 5
+_POOL_LOCK = threading.Lock()
+
+# Pool metrics, labelled by target
+POOL_WAIT_SECONDS = get_registry().histogram(
+    'db_pool_wait_seconds', 'Time to get a connection from the pool (including opening one)', ('target',))
+POOL_CONNECTIONS_OPENED = get_registry().counter(
+    'db_connections_opened_total', 'Connections opened because the pool was empty', ('target',))
+POOL_CONNECTIONS_CLOSED = get_registry().counter(
+    'db_connections_closed_total', 'Connections closed because the pool was full', ('target',))
+POOL_IDLE_CONNECTIONS = get_registry().gauge(
+    'db_pool_idle_connections', 'Idle connections in the pool', ('target',))
+
+# Set while reads must see this context's own writes (see read_your_writes)
+_primary_reads = contextvars.ContextVar('primary_reads', default=False)
+
+# The unit of work (single transaction) the current context has joined, if any
+_current_uow = contextvars.ContextVar('unit_of_work', default=None)
+
+# Result cache for execute_query(..., cache=True)
+QUERY_CACHE_ENABLED = current_config.QUERY_CACHE_ENABLED
+QUERY_CACHE = QueryCache(current_config.QUERY_CACHE_SIZE, current_config.QUERY_CACHE_TTL)
+
+# Per-statement timing, slow query log and EXPLAIN capture
+QUERY_STATS_ENABLED = current_config.QUERY_STATS_ENABLED
+SLOW_QUERY_THRESHOLD_MS = current_config.SLOW_QUERY_THRESHOLD_MS
+QUERY_STATS_FILE = current_config.QUERY_STATS_FILE
+QUERY_STATS = QueryStats()
+_EXPLAINED = set()
+_EXPLAINED_LOCK = threading.Lock()
+_explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='explain')
+
+# Incremental vacuum: pages released per step and steps per run
+VACUUM_STEP_PAGES = current_config.VACUUM_STEP_PAGES
+VACUUM_MAX_STEPS = current_config.VACUUM_MAX_STEPS
+
+# SQLite PRAGMA data_version watcher, used to notice writes from other processes
+_data_version_lock = threading.Lock()
+_data_version_conn = None
+_data_version_path = None
+_data_version = None
+
+# Bulk loading: rows per executemany batch (SQLite) or per COPY chunk (PostgreSQL)
+BULK_BATCH_SIZE = 10000
+
+# Tables seeded from CSV by init_database, with their source files
+SEED_TABLES = {
+    'users': 'users.csv',
+    'logs': 'logs.csv',
+    'name_list': 'name_list.csv',
+    'log_monitoring': 'log_monitoring.csv',
+    'model_management': 'model_management.csv',
+    'rule_management': 'rule_management.csv',
+    'credit_report': 'credit_report.csv',
+}
+
+# Directory next to the CSV exports holding the artifacts model_management.csv refers to
+MODEL_ARTIFACTS_DIR = 'model_artifacts'
+
+_IDENTIFIER_RE = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+def has_read_target():
+    """Whether reads are routed to a target separate from the primary"""
+    if DB_TYPE == 'sqlite':
+        return bool(SQLITE_READ_DB_PATH)
+    return bool(PG_READ_HOST)
 
-def get_connection():
-    """Create and return a database connection"""
+
+def _resolve_target(target):
+    return READ if target == READ and has_read_target() else PRIMARY
+
+
+def _pool_for(target):
+    return READ_CONNECTION_POOL if target == READ else CONNECTION_POOL
+
+
+def get_connection(target=PRIMARY):
+    """Create and return a database connection
+
+    Args:
+        target: PRIMARY for writes, READ for the read target (falls back to
+            the primary when no read target is configured)
+    """
+    target = _resolve_target(target)
+    pool = _pool_for(target)
+    started = time.perf_counter()
     # Check connection pool
-    if CONNECTION_POOL:
-        return CONNECTION_POOL.pop()
-    
+    with _POOL_LOCK:
+        conn = pool.pop() if pool else None
+        idle = len(pool)
+    if conn is None:
+        conn = _open_connection(target)
+        POOL_CONNECTIONS_OPENED.labels(target).inc()
+    POOL_IDLE_CONNECTIONS.labels(target).set(idle)
+    POOL_WAIT_SECONDS.labels(target).observe(time.perf_counter() - started)
+    return conn
+
+
+def _open_connection(target):
     try:
         if DB_TYPE == 'sqlite':
-            # SQLite connection
-            db_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'user_management.db')
-            conn = sqlite3.connect(db_path)
+            # SQLite connection; pooled connections may be reused by worker threads,
+            # each one is only ever used by one thread at a time
+            if target == READ:
+                read_uri = Path(os.path.abspath(SQLITE_READ_DB_PATH)).as_uri() + '?mode=ro'
+                return sqlite3.connect(read_uri, uri=True, check_same_thread=False)
+            conn = sqlite3.connect(SQLITE_DB_PATH, check_same_thread=False)
             # Enable foreign key constraints
             conn.execute("PRAGMA foreign_keys = ON")
             return conn
         else:
             # PostgreSQL connection
+            if not HAS_PSYCOPG2:
+                raise ImportError("psycopg2 is required for PostgreSQL support")
             return psycopg2.connect(
-                host=PG_HOST,
-                port=PG_PORT,
+                host=PG_READ_HOST if target == READ else PG_HOST,
+                port=PG_READ_PORT if target == READ else PG_PORT,
                 database=PG_DB,
                 user=PG_USER,
                 password=PG_PASSWORD
             )
     except Exception as e:
-        logger.error(f"Database connection failed: {str(e)}")
+        logger.error(f"Database connection failed ({target}): {str(e)}")
         raise
 
-def release_connection(conn):
-    """Return the connection to the connection pool"""
-    if len(CONNECTION_POOL) < MAX_POOL_SIZE:
-        CONNECTION_POOL.append(conn)
-    else:
+def release_connection(conn, target=PRIMARY):
+    """Return the connection to the connection pool it came from"""
+    target = _resolve_target(target)
+    pool = _pool_for(target)
+    with _POOL_LOCK:
+        pooled = len(pool) < MAX_POOL_SIZE
+        if pooled:
+            pool.append(conn)
+        idle = len(pool)
+    POOL_IDLE_CONNECTIONS.labels(target).set(idle)
+    if not pooled:
         conn.close()
+        POOL_CONNECTIONS_CLOSED.labels(target).inc()
 
 @contextmanager
-def get_db_cursor():
-    """Context manager to get a database cursor and automatically handle connection closing"""
-    conn = get_connection()
-    cursor = conn.cursor()
+def read_your_writes():
+    """Route reads in this context to the primary so they see its own writes
+
+    Example:
+        with read_your_writes():
+            report = CreditReportModel.get_report_by_id(report_id)
+    """
+    token = _primary_reads.set(True)
+    try:
+        yield
+    finally:
+        _primary_reads.reset(token)
+
+def _capture_plan(sql, query, params, target):
+    """Run EXPLAIN for a slow statement on a separate connection and log the plan"""
+    explain = "EXPLAIN QUERY PLAN " if DB_TYPE == 'sqlite' else "EXPLAIN "
+    conn = get_connection(target)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(explain + query, params or ())
+        plan = '\n'.join(' '.join(str(col) for col in row) for row in cursor.fetchall())
+        cursor.close()
+        conn.rollback()
+        QUERY_STATS.set_plan(sql, plan)
+        slow_query_logger.warning(f"Query plan for slow statement: {sql}\n{plan}")
+    except Exception as e:
+        slow_query_logger.warning(f"Could not capture query plan for {sql}: {e}")
+    finally:
+        release_connection(conn, target)
+
+
+def _explainable(sql):
+    return sql.split(None, 1)[0].upper() in ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE')
+
+
+class _TimedCursor:
+    """Cursor wrapper that records latency, rows and pool wait for each statement
+
+    A statement's time runs from execute() until its rows are fetched, the
+    next statement starts or the cursor is closed, so lazily stepped SQLite
+    queries are measured in full.
+    """
+
+    def __init__(self, cursor, pool_wait_ms, target):
+        self._cursor = cursor
+        self._pool_wait_ms = pool_wait_ms
+        self._target = target
+        self._query = None
+
+    def _begin(self, query, params, many=False):
+        self._finish()
+        self._query = query
+        self._params = params
+        self._many = many
+        self._rows = None
+        self._started = time.perf_counter()
+
+    def _finish(self):
+        if self._query is None:
+            return
+        elapsed_ms = (time.perf_counter() - self._started) * 1000
+        rows = self._rows if self._rows is not None else max(self._cursor.rowcount, 0)
+        sql = normalize_sql(self._query)
+        QUERY_STATS.record(sql, elapsed_ms, rows, self._pool_wait_ms)
+        # Only the first statement on a checkout waited for the pool
+        self._pool_wait_ms = 0.0
+
+        if elapsed_ms >= SLOW_QUERY_THRESHOLD_MS:
+            slow_query_logger.warning(f"Slow statement ({elapsed_ms:.1f} ms, {rows} rows): {sql}")
+            with _EXPLAINED_LOCK:
+                first_time = sql not in _EXPLAINED and _explainable(sql)
+                _EXPLAINED.add(sql)
+            if first_time and not self._many:
+                _explain_executor.submit(_capture_plan, sql, self._query, self._params, self._target)
+        self._query = None
+
+    def _count(self, n):
+        self._rows = (self._rows or 0) + n
+
+    def execute(self, query, params=()):
+        self._begin(query, params)
+        self._cursor.execute(query, params)
+        return self
+
+    def executemany(self, query, seq_of_params):
+        self._begin(query, None, many=True)
+        self._cursor.executemany(query, seq_of_params)
+        return self
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._count(1)
+        else:
+            self._finish()
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._cursor.fetchmany(*args)
+        self._count(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._count(len(rows))
+        self._finish()
+        return rows
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._count(1)
+            yield row
+        self._finish()
+
+    def close(self):
+        self._finish()
+        self._cursor.close()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def get_query_stats(n=10):
+    """Top-n statements by total time recorded in this process"""
+    return QUERY_STATS.top(n)
+
+
+def dump_query_stats(path=None):
+    """Merge this process's statement statistics into the shared stats file"""
+    path = path or QUERY_STATS_FILE
+    if not path or not QUERY_STATS.snapshot():
+        return
+    try:
+        QUERY_STATS.save(path)
+    except OSError as e:
+        logger.error(f"Could not write query statistics to {path}: {str(e)}")
+
+
+atexit.register(dump_query_stats)
+
+
+class UnitOfWork:
+    """State of one unit_of_work() transaction"""
+
+    joined = False
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.rollback_only = False
+        self.committed = False
+        self.written = []
+
+
+class _JoinedUnitOfWork:
+    """What a nested unit_of_work() yields: a view of the outer unit
+
+    The outer unit commits after the nested block ends, so `committed` is
+    still False there; callers that may be nested check `joined` first.
+    """
+
+    joined = True
+
+    def __init__(self, outer):
+        self.outer = outer
+
+    def __getattr__(self, name):
+        return getattr(self.outer, name)
+
+
+@contextmanager
+def unit_of_work():
+    """Run every database call in the block on one connection, in one transaction
+
+    Models join the active unit of work through get_db_cursor, so a controller
+    operation made of several model calls checks out one connection and
+    commits once. A nested unit_of_work() joins the outer one and yields a
+    view whose `joined` is True; the outer unit decides whether it commits.
+    If any statement fails, the whole unit is rolled back, even when the
+    model swallowed the exception; check `committed` afterwards.
+
+    Example:
+        with unit_of_work() as uow:
+            LogMonitoringModel.add_log(...)
+            success = NameListModel.add_entry(...)
+        return success and uow.committed
+    """
+    outer = _current_uow.get()
+    if outer is not None:
+        try:
+            yield _JoinedUnitOfWork(outer)
+        except Exception:
+            outer.rollback_only = True
+            raise
+        return
+
+    with start_span('db.transaction'):
+        wait_started = time.perf_counter()
+        with start_span('db.pool_wait', target=PRIMARY):
+            conn = get_connection(PRIMARY)
+        if QUERY_STATS_ENABLED:
+            QUERY_STATS.record_pool_wait((time.perf_counter() - wait_started) * 1000)
+        uow = UnitOfWork(conn)
+        token = _current_uow.set(uow)
+        try:
+            if DB_TYPE == 'sqlite':
+                # Take the write lock up front so reads and writes in the unit stay consistent
+                conn.execute("BEGIN IMMEDIATE")
+            yield uow
+            if uow.rollback_only:
+                conn.rollback()
+                logger.warning("Unit of work rolled back after a failed statement")
+            else:
+                conn.commit()
+                uow.committed = True
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Unit of work failed: {str(e)}")
+            raise
+        finally:
+            _current_uow.reset(token)
+            release_connection(conn, PRIMARY)
+
+    if uow.committed:
+        for query in uow.written:
+            _note_own_write(query)
+
+
+@contextmanager
+def savepoint(name='sp'):
+    """Run the block in a savepoint, so its failure does not undo the rest of the unit
+
+    A statement that fails inside the block rolls back to the savepoint and
+    leaves the surrounding unit of work committable. Outside a unit of work
+    the block gets a unit of its own.
+    """
+    uow = _current_uow.get()
+    if uow is None:
+        with unit_of_work() as uow:
+            yield uow
+        return
+
+    rollback_only, written = uow.rollback_only, len(uow.written)
+    cursor = uow.conn.cursor()
+    cursor.execute(f"SAVEPOINT {name}")
+    failed = True
+    try:
+        yield uow
+        failed = uow.rollback_only and not rollback_only
+    finally:
+        if failed:
+            cursor.execute(f"ROLLBACK TO SAVEPOINT {name}")
+            uow.rollback_only = rollback_only
+            del uow.written[written:]
+            logger.warning(f"Rolled back to savepoint {name}")
+        cursor.execute(f"RELEASE SAVEPOINT {name}")
+        cursor.close()
+
+
+@contextmanager
+def _uow_cursor(uow):
+    cursor = _TimedCursor(uow.conn.cursor(), 0.0, PRIMARY) if QUERY_STATS_ENABLED else uow.conn.cursor()
     try:
         yield cursor
-        conn.commit()
     except Exception as e:
-        conn.rollback()
+        uow.rollback_only = True
         logger.error(f"Database operation error: {str(e)}")
         raise
     finally:
         cursor.close()
-        release_connection(conn)
 
-def execute_query(query, params=None):
-    """Execute a database query and return the result"""
-    with get_db_cursor() as cursor:
-        cursor.execute(query, params or ())
-        return cursor.fetchall()
+
+@contextmanager
+def get_db_cursor(readonly=False):
+    """Context manager to get a database cursor and automatically handle connection closing
+
+    Inside unit_of_work() the cursor belongs to the unit's transaction and
+    nothing is committed here.
+
+    Args:
+        readonly: Use the read target unless read_your_writes() is active
+    """
+    uow = _current_uow.get()
+    if uow is not None:
+        with _uow_cursor(uow) as cursor:
+            yield cursor
+        return
+
+    target = READ if readonly and not _primary_reads.get() else PRIMARY
+    with start_span('db.cursor', target=target):
+        wait_started = time.perf_counter()
+        with start_span('db.pool_wait', target=target):
+            conn = get_connection(target)
+        if QUERY_STATS_ENABLED:
+            pool_wait_ms = (time.perf_counter() - wait_started) * 1000
+            QUERY_STATS.record_pool_wait(pool_wait_ms)
+            cursor = _TimedCursor(conn.cursor(), pool_wait_ms, target)
+        else:
+            cursor = conn.cursor()
+        try:
+            yield cursor
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Database operation error: {str(e)}")
+            raise
+        finally:
+            cursor.close()
+            release_connection(conn, target)
+
+def _is_read_statement(query):
+    return query.lstrip().split(None, 1)[0].upper() in ('SELECT', 'WITH')
+
+def _read_data_version():
+    """Current PRAGMA data_version of the SQLite file reads are served from"""
+    global _data_version_conn, _data_version_path, _data_version
+    source = SQLITE_READ_DB_PATH or SQLITE_DB_PATH
+    if _data_version_conn is None or _data_version_path != source:
+        if _data_version_conn is not None:
+            _data_version_conn.close()
+        _data_version = None
+        _data_version_conn = sqlite3.connect(
+            Path(os.path.abspath(source)).as_uri() + '?mode=ro', uri=True, check_same_thread=False
+        )
+        _data_version_path = source
+    return _data_version_conn.execute("PRAGMA data_version").fetchone()[0]
+
+def _check_external_writes():
+    """Clear the query cache if another connection or process committed to SQLite"""
+    global _data_version
+    if DB_TYPE != 'sqlite':
+        return
+    with _data_version_lock:
+        try:
+            version = _read_data_version()
+        except sqlite3.Error:
+            return
+        if _data_version is not None and version != _data_version:
+            QUERY_CACHE.clear()
+        _data_version = version
+
+def _note_own_write(query):
+    """Invalidate cached reads of the written table after one of our own writes"""
+    global _data_version
+    table = table_written_by(query)
+    if table:
+        QUERY_CACHE.invalidate_tables([table])
+    else:
+        QUERY_CACHE.clear()
+    if DB_TYPE == 'sqlite' and _data_version is not None:
+        # Our own commit already invalidated by table; don't let data_version flush everything
+        with _data_version_lock:
+            try:
+                _data_version = _read_data_version()
+            except sqlite3.Error:
+                _data_version = None
+    _schedule_replica_sync()
+
+def invalidate_tables(*tables):
+    """Drop cached results that read any of the given tables"""
+    QUERY_CACHE.invalidate_tables(tables)
+
+def get_query_cache_stats():
+    """Hit/miss counters and size of the query result cache"""
+    return QUERY_CACHE.stats()
+
+def execute_query(query, params=None, read_your_writes=False, cache=False, read_target=False):
+    """Execute a database query and return the result
+
+    With read_target=True (the model get_*/search_* reads and check_hit) a
+    SELECT goes to the read target, unless read_your_writes=True or
+    read_your_writes() is active; everything else runs on the primary. With
+    cache=True the result is served from the query cache until a write to
+    one of the tables it reads.
+    """
+    with start_span('db.query', sql=query) as span:
+        use_cache = (cache and QUERY_CACHE_ENABLED and _current_uow.get() is None
+                     and not read_your_writes and not _primary_reads.get())
+        if use_cache:
+            _check_external_writes()
+            key = QUERY_CACHE.make_key(query, params)
+            hit, rows = QUERY_CACHE.get(key)
+            span.set('cache_hit', hit)
+            if hit:
+                return rows
+            generation = QUERY_CACHE.generation
+
+        readonly = read_target and not read_your_writes and _is_read_statement(query)
+        with get_db_cursor(readonly=readonly) as cursor:
+            cursor.execute(query, params or ())
+            rows = cursor.fetchall()
+        span.set('rows', len(rows))
+
+        if use_cache:
+            QUERY_CACHE.put(key, tables_read_by(query), rows, generation)
+        return rows
 
 def execute_update(query, params=None):
     """Execute a database update operation"""
-    with get_db_cursor() as cursor:
+    with start_span('db.update', sql=query), get_db_cursor() as cursor:
         cursor.execute(query, params or ())
-        return cursor.rowcount
+        rowcount = cursor.rowcount
+    uow = _current_uow.get()
+    if uow is not None:
+        # Cached reads are invalidated once the unit of work commits
+        uow.written.append(query)
+    else:
+        _note_own_write(query)
+    return rowcount
+
+def execute_many(query, params_seq):
+    """Execute one statement for many parameter tuples in a single transaction"""
+    with start_span('db.execute_many', sql=query), get_db_cursor() as cursor:
+        cursor.executemany(query, params_seq)
+        rowcount = cursor.rowcount
+    uow = _current_uow.get()
+    if uow is not None:
+        uow.written.append(query)
+    else:
+        _note_own_write(query)
+    return rowcount
+
+def incremental_vacuum(step_pages=None, max_steps=None, pause=0.05, tables=None):
+    """Return free pages to the operating system in bounded steps
+
+    On SQLite each step runs PRAGMA incremental_vacuum(step_pages) in its own
+    short transaction, pausing between steps so other writers get the lock,
+    and stops when the freelist is empty or after max_steps. This requires
+    auto_vacuum=INCREMENTAL (see enable_incremental_vacuum). On PostgreSQL a
+    plain (non-FULL) VACUUM ANALYZE is run on the given tables.
+    Returns the number of pages released (always 0 on PostgreSQL).
+    """
+    step_pages = step_pages or VACUUM_STEP_PAGES
+    max_steps = max_steps or VACUUM_MAX_STEPS
+    conn = get_connection()
+    try:
+        conn.commit()
+        if DB_TYPE != 'sqlite':
+            conn.autocommit = True
+            try:
+                cursor = conn.cursor()
+                for table in tables or SEED_TABLES:
+                    cursor.execute(f"VACUUM ANALYZE {_check_identifier(table)}")
+                cursor.close()
+            finally:
+                conn.autocommit = False
+            return 0
+
+        if conn.execute("PRAGMA auto_vacuum").fetchall()[0][0] != 2:
+            logger.warning("auto_vacuum is not INCREMENTAL; run enable_incremental_vacuum() once")
+            return 0
+        released = 0
+        for _ in range(max_steps):
+            free_pages = conn.execute("PRAGMA freelist_count").fetchall()[0][0]
+            if not free_pages:
+                break
+            # executescript steps the pragma to completion; execute() frees a single page
+            conn.executescript(f"PRAGMA incremental_vacuum({int(step_pages)});")
+            released += min(free_pages, step_pages)
+            time.sleep(pause)
+        logger.info(f"Incremental vacuum released {released} pages")
+        return released
+    finally:
+        release_connection(conn)
+
+def enable_incremental_vacuum():
+    """Switch an existing SQLite file to auto_vacuum=INCREMENTAL
+
+    This rebuilds the whole file with a full VACUUM, so run it once, offline.
+    """
+    if DB_TYPE != 'sqlite':
+        return False
+    conn = get_connection()
+    try:
+        conn.commit()
+        if conn.execute("PRAGMA auto_vacuum").fetchall()[0][0] == 2:
+            return False
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        logger.info("Enabled incremental auto_vacuum")
+        return True
+    finally:
+        release_connection(conn)
+
+def _has_sqlite_replica_file():
+    return (DB_TYPE == 'sqlite' and bool(SQLITE_READ_DB_PATH)
+            and os.path.abspath(SQLITE_READ_DB_PATH) != os.path.abspath(SQLITE_DB_PATH))
+
+def sync_sqlite_replica():
+    """Copy the primary SQLite database into a separate read file
+
+    Uses SQLite's online backup API, so it is safe while the primary is in
+    use. Returns False when there is no separate SQLite read file.
+    """
+    if not _has_sqlite_replica_file():
+        return False
+
+    source = sqlite3.connect(SQLITE_DB_PATH)
+    replica = sqlite3.connect(SQLITE_READ_DB_PATH)
+    try:
+        source.backup(replica)
+        QUERY_CACHE.clear()
+        logger.info(f"Synced SQLite read replica {SQLITE_READ_DB_PATH}")
+        return True
+    finally:
+        replica.close()
+        source.close()
+
+def _run_scheduled_replica_sync():
+    global _replica_sync_timer
+    with _replica_sync_lock:
+        # Commits from here on schedule the next copy
+        _replica_sync_timer = None
+    try:
+        sync_sqlite_replica()
+    except sqlite3.Error as e:
+        logger.error(f"SQLite read replica sync failed: {str(e)}")
+
+def _schedule_replica_sync():
+    """Refresh a separate SQLite read file after a commit
+
+    Commits within SQLITE_REPLICA_SYNC_DELAY seconds share one copy, so the
+    read file trails the primary by about that long; 0 copies right away.
+    """
+    global _replica_sync_timer
+    if not _has_sqlite_replica_file():
+        return
+    if SQLITE_REPLICA_SYNC_DELAY <= 0:
+        _run_scheduled_replica_sync()
+        return
+    with _replica_sync_lock:
+        if _replica_sync_timer is None:
+            _replica_sync_timer = threading.Timer(SQLITE_REPLICA_SYNC_DELAY, _run_scheduled_replica_sync)
+            _replica_sync_timer.daemon = True
+            _replica_sync_timer.start()
         
-def load_csv_to_table(cursor, table_name, csv_path):
-    """Load data from a CSV file into the specified table"""
+def _check_identifier(name):
+    """Reject table/column names that are not plain SQL identifiers"""
+    if not _IDENTIFIER_RE.match(name):
+        raise ValueError(f"Invalid SQL identifier: {name!r}")
+    return name
+
+
+def _parse_int(cell):
+    try:
+        return int(cell)
+    except ValueError:
+        return float(cell)
+
+
+def _parse_date(cell):
+    for fmt in ('%Y-%m-%d', '%Y/%m/%d'):
+        try:
+            return datetime.strptime(cell, fmt).date()
+        except ValueError:
+            continue
+    return datetime.fromisoformat(cell).date()
+
+
+def _parse_bytes(cell):
+    # Exported BLOBs look like Python bytes literals: b'...'
+    if cell[:2] in ("b'", 'b"'):
+        return ast.literal_eval(cell)
+    return cell.encode('utf-8')
+
+
+def _converter_for(declared_type):
+    """Pick a cell parser from a declared column type (SQLite affinity rules)"""
+    declared = (declared_type or '').upper()
+    if 'INT' in declared:
+        return _parse_int
+    if 'CHAR' in declared or 'CLOB' in declared or 'TEXT' in declared:
+        return str
+    if 'BLOB' in declared or 'BYTEA' in declared:
+        return _parse_bytes
+    if any(t in declared for t in ('REAL', 'FLOA', 'DOUB', 'NUMERIC', 'DECIMAL')):
+        return float
+    if 'TIMESTAMP' in declared or 'DATETIME' in declared:
+        return datetime.fromisoformat
+    if 'DATE' in declared:
+        return _parse_date
+    return str
+
+
+def get_column_types(cursor, table_name):
+    """Return {column: declared type} for a table"""
+    _check_identifier(table_name)
+    if DB_TYPE == 'sqlite':
+        cursor.execute(f"PRAGMA table_info({table_name})")
+        return {row[1]: row[2] for row in cursor.fetchall()}
+    cursor.execute(
+        "SELECT column_name, data_type FROM information_schema.columns WHERE table_name = %s",
+        (table_name,)
+    )
+    return {row[0]: row[1] for row in cursor.fetchall()}
+
+
+def _typed_rows(reader, converters):
+    """Yield CSV rows with each cell parsed by its column converter"""
+    for row in reader:
+        processed_row = []
+        for cell, convert in zip(row, converters):
+            cell = cell.strip()
+            if cell == '':
+                processed_row.append(None)
+                continue
+            try:
+                processed_row.append(convert(cell))
+            except (ValueError, SyntaxError):
+                # Leave unparseable values to the database's own type affinity
+                processed_row.append(cell)
+        yield processed_row
+
+
+def _copy_cell(value):
+    """Render a parsed value for COPY ... (FORMAT csv)"""
+    if value is None:
+        return None
+    if isinstance(value, bytes):
+        return '\\x' + value.hex()
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _copy_chunk(cursor, table_name, headers, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(['' if v is None else v for v in map(_copy_cell, row)])
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY {table_name} ({','.join(headers)}) FROM STDIN WITH (FORMAT csv, NULL '')",
+        buffer
+    )
+
+
+def load_csv_to_table(cursor, table_name, csv_path, batch_size=None):
+    """Load data from a CSV file into the specified table
+
+    Cells are parsed according to the table's declared column types. On
+    PostgreSQL the rows are streamed with COPY FROM STDIN, on SQLite they are
+    inserted with large executemany batches. The caller owns the transaction.
+    Returns the number of rows loaded.
+    """
+    batch_size = batch_size or BULK_BATCH_SIZE
     try:
-        with open(csv_path, 'r', encoding='utf-8') as f:
+        _check_identifier(table_name)
+        with open(csv_path, 'r', encoding='utf-8', newline='') as f:
             reader = csv.reader(f)
-            headers = next(reader)
-            
-            # Generate placeholders
-            placeholders = ','.join(['?'] * len(headers)) if DB_TYPE == 'sqlite' else \
-                          ','.join(['%s'] * len(headers))
-            
-            # Build insert statement
-            query = f"INSERT INTO {table_name} ({','.join(headers)}) VALUES ({placeholders})"
-            
-            # Bulk insert data
+            headers = [_check_identifier(h.strip()) for h in next(reader)]
+
+            column_types = get_column_types(cursor, table_name)
+            converters = [_converter_for(column_types.get(h)) for h in headers]
+
+            if DB_TYPE == 'sqlite':
+                placeholders = ','.join(['?'] * len(headers))
+                query = f"INSERT INTO {table_name} ({','.join(headers)}) VALUES ({placeholders})"
+
+            row_count = 0
             batch = []
-            for row in reader:
-                # Handle empty values
-                processed_row = [None if cell.strip() == '' else cell for cell in row]
-                batch.append(processed_row)
-                
-                # Commit every 100 records
-                if len(batch) >= 100:
-                    cursor.executemany(query, batch)
+            for row in _typed_rows(reader, converters):
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    if DB_TYPE == 'sqlite':
+                        cursor.executemany(query, batch)
+                    else:
+                        _copy_chunk(cursor, table_name, headers, batch)
+                    row_count += len(batch)
                     batch = []
-            
-            # Commit remaining data
+
             if batch:
-                cursor.executemany(query, batch)
-            
-            logger.info(f"Successfully imported {table_name} from {csv_path}")
+                if DB_TYPE == 'sqlite':
+                    cursor.executemany(query, batch)
+                else:
+                    _copy_chunk(cursor, table_name, headers, batch)
+                row_count += len(batch)
+
+            if DB_TYPE != 'sqlite' and 'id' in headers:
+                # Explicit ids bypass the SERIAL sequence; move it past the loaded rows
+                cursor.execute(
+                    f"SELECT setval(pg_get_serial_sequence('{table_name}', 'id'), "
+                    f"COALESCE(MAX(id), 1)) FROM {table_name}"
+                )
+
+            logger.info(f"Successfully imported {row_count} rows into {table_name} from {csv_path}")
+            return row_count
     except Exception as e:
         logger.error(f"CSV import failed: {str(e)}")
         raise
 
 
+def _rebuild_full_text_index(cursor, table_name):
+    """Rebuild a table's full-text index in one pass after its rows were replaced"""
+    if DB_TYPE == 'sqlite':
+        fts = f"{table_name}_fts"
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (fts,))
+        if cursor.fetchall():
+            cursor.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+    else:
+        # search_vector is regenerated per row; REINDEX drops the GIN pending list left by COPY
+        cursor.execute(f"REINDEX INDEX idx_{table_name}_search")
+
+
+def _load_timed(cursor, table_name, csv_path, batch_size, replace=False):
+    started = time.perf_counter()
+    if replace:
+        # Same transaction as the load: a failed load keeps the old rows
+        cursor.execute(f"DELETE FROM {table_name}" if DB_TYPE == 'sqlite' else f"TRUNCATE {table_name}")
+        if table_name == 'log_monitoring':
+            # Rollups describe the old rows; bulk_load_tables rebuilds them after the load
+            cursor.execute("DELETE FROM log_rollups")
+    rows = load_csv_to_table(cursor, table_name, csv_path, batch_size)
+    if replace and table_name in FULL_TEXT_COLUMNS:
+        _rebuild_full_text_index(cursor, table_name)
+    elapsed = time.perf_counter() - started
+    stats = {
+        'rows': rows,
+        'seconds': elapsed,
+        'rows_per_sec': rows / elapsed if elapsed > 0 else float(rows),
+    }
+    logger.info(f"Bulk load {table_name}: {rows} rows in {elapsed:.3f}s "
+                f"({stats['rows_per_sec']:.0f} rows/s)")
+    return stats
+
+
+def _bulk_load_sqlite(files, batch_size, replace):
+    """Load all tables on one connection in a single relaxed-durability transaction"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    conn.commit()
+    cursor.execute("PRAGMA synchronous")
+    old_synchronous = cursor.fetchone()[0]
+    cursor.execute("PRAGMA journal_mode")
+    old_journal_mode = cursor.fetchone()[0]
+    stats = {}
+    try:
+        cursor.execute("PRAGMA synchronous = OFF")
+        cursor.execute("PRAGMA journal_mode = MEMORY")
+        cursor.execute("PRAGMA temp_store = MEMORY")
+        cursor.execute("PRAGMA cache_size = -65536")
+        cursor.execute("BEGIN")
+        for table, csv_path in files.items():
+            stats[table] = _load_timed(cursor, table, csv_path, batch_size, replace)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.execute(f"PRAGMA journal_mode = {old_journal_mode}")
+        cursor.execute(f"PRAGMA synchronous = {int(old_synchronous)}")
+        cursor.close()
+        release_connection(conn)
+    return stats
+
+
+def _bulk_load_postgres_table(table, csv_path, batch_size, replace):
+    with get_db_cursor() as cursor:
+        return _load_timed(cursor, table, csv_path, batch_size, replace)
+
+
+def bulk_load_tables(csv_data_path, tables=None, batch_size=None, max_workers=None, replace=False):
+    """Bulk load CSV files into their tables
+
+    Rows are inserted with their explicit ids, so loading into a table that
+    already holds those ids raises an integrity error and the load is rolled
+    back. Pass replace=True to empty each table in its load transaction first;
+    full-text indexes of replaced tables are rebuilt, and replacing
+    log_monitoring rebuilds log_rollups (as day buckets) from the new rows.
+
+    Args:
+        csv_data_path: Directory containing the CSV files
+        tables: {table_name: csv_filename}, defaults to SEED_TABLES
+        batch_size: Rows per executemany batch / COPY chunk
+        max_workers: Parallel table loads on PostgreSQL (defaults to MAX_POOL_SIZE)
+        replace: Delete the existing rows of each loaded table first
+
+    Returns:
+        dict: {table_name: {'rows', 'seconds', 'rows_per_sec'}}
+    """
+    tables = tables or SEED_TABLES
+    files = {}
+    for table, filename in tables.items():
+        csv_path = os.path.join(csv_data_path, filename)
+        if os.path.exists(csv_path):
+            files[table] = csv_path
+        else:
+            logger.warning(f"CSV file {csv_path} does not exist, skipping initialization")
+
+    if not files:
+        return {}
+
+    try:
+        if DB_TYPE == 'sqlite':
+            # SQLite allows a single writer, so parallel loads would only contend for the lock
+            stats = _bulk_load_sqlite(files, batch_size, replace)
+        else:
+            # The tables are independent, so each one loads on its own connection
+            workers = min(len(files), max_workers or MAX_POOL_SIZE)
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bulk-load') as executor:
+                futures = {
+                    table: executor.submit(_bulk_load_postgres_table, table, csv_path, batch_size, replace)
+                    for table, csv_path in files.items()
+                }
+                stats = {table: future.result() for table, future in futures.items()}
+        if 'model_management' in files:
+            load_model_artifacts(os.path.join(csv_data_path, MODEL_ARTIFACTS_DIR))
+        if replace and 'log_monitoring' in files:
+            from Client.models.risk_control_model import LogRollupModel
+            invalidate_tables('log_rollups')
+            LogRollupModel.backfill()
+        return stats
+    finally:
+        invalidate_tables(*files)
+        _schedule_replica_sync()
+
+
+def load_model_artifacts(artifacts_path):
+    """Copy the artifacts shipped next to the CSV exports into the artifact store
+
+    model_management.csv only holds digests; the files themselves sit under
+    <csv dir>/model_artifacts in the store's own <ab>/<sha256> layout.
+    Returns the number of artifacts stored.
+    """
+    if not os.path.isdir(artifacts_path):
+        return 0
+    store = get_artifact_store()
+    stored = 0
+    for directory, _, filenames in os.walk(artifacts_path):
+        for filename in filenames:
+            artifact = store.put_file(os.path.join(directory, filename))
+            if artifact.sha256 != filename:
+                logger.warning(f"Artifact {filename} does not match its content digest {artifact.sha256}")
+            stored += 1
+    logger.info(f"Loaded {stored} model artifacts from {artifacts_path}")
+    return stored
+
+
+def migrate_model_artifacts(cursor):
+    """Move model binaries stored in model_management.model_file into the artifact store
+
+    Databases created before artifacts moved out of the table still have the
+    BLOB column; each blob is written to the store one row at a time and the
+    column is dropped. The caller owns the transaction.
+    """
+    if 'model_file' not in get_column_types(cursor, 'model_management'):
+        return 0
+
+    placeholder = '?' if DB_TYPE == 'sqlite' else '%s'
+    for column, declared in (('model_sha256', 'TEXT'), ('model_size', 'BIGINT'), ('model_path', 'TEXT')):
+        default = "0" if declared == 'BIGINT' else "''"
+        cursor.execute(
+            f"ALTER TABLE model_management ADD COLUMN {column} {declared} NOT NULL DEFAULT {default}")
+
+    store = get_artifact_store()
+    cursor.execute("SELECT id FROM model_management")
+    model_ids = [row[0] for row in cursor.fetchall()]
+    for model_id in model_ids:
+        cursor.execute(f"SELECT model_file FROM model_management WHERE id = {placeholder}", (model_id,))
+        model_file = cursor.fetchall()[0][0] or b''
+        if isinstance(model_file, str):
+            model_file = model_file.encode('utf-8')
+        artifact = store.put_bytes(bytes(model_file))
+        cursor.execute(
+            f"UPDATE model_management SET model_sha256 = {placeholder}, model_size = {placeholder}, "
+            f"model_path = {placeholder} WHERE id = {placeholder}",
+            (artifact.sha256, artifact.size, artifact.path, model_id)
+        )
+    cursor.execute("ALTER TABLE model_management DROP COLUMN model_file")
+    logger.info(f"Moved {len(model_ids)} model artifacts into {store.root}")
+    return len(model_ids)
+
+
+# Operation keywords that make a log_monitoring row a runtime log
+RUNTIME_LOG_KEYWORDS = ('运行', 'run', 'start', 'login', 'system')
+LOG_TYPE_RUNTIME = 'runtime'
+LOG_TYPE_OPERATION = 'operation'
+
+# Columns covered by each table's full-text index
+FULL_TEXT_COLUMNS = {
+    'log_monitoring': ('operation', 'operator', 'error_info', 'exception_info'),
+    'logs': ('action', 'username', 'details'),
+}
+
+# Trigram tokens: shorter keywords cannot use the SQLite index
+FULL_TEXT_MIN_LENGTH = 3
+
+_full_text_tables = {}
+
+
+def _log_type_expression():
+    matches = " OR ".join(f"lower(operation) LIKE '%{keyword}%'" for keyword in RUNTIME_LOG_KEYWORDS)
+    return f"CASE WHEN {matches} THEN '{LOG_TYPE_RUNTIME}' ELSE '{LOG_TYPE_OPERATION}' END"
+
+
+def _create_sqlite_fts(cursor, table, columns):
+    fts = f"{table}_fts"
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (fts,))
+    if cursor.fetchall():
+        return False
+    column_list = ', '.join(columns)
+    new_values = ', '.join(f"new.{column}" for column in columns)
+    old_values = ', '.join(f"old.{column}" for column in columns)
+    # External-content index: the text lives only in the table itself.
+    # Trigrams keep LIKE '%keyword%' semantics, including for Chinese text.
+    cursor.execute(
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({column_list}, "
+        f"content='{table}', content_rowid='id', tokenize='trigram')"
+    )
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts} (rowid, {column_list}) VALUES (new.id, {new_values});
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts} ({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+        END
+    """)
+    # Only edits to indexed text touch the index (not e.g. is_done flips)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {column_list} ON {table} BEGIN
+            INSERT INTO {fts} ({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO {fts} (rowid, {column_list}) VALUES (new.id, {new_values});
+        END
+    """)
+    cursor.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+    return True
+
+
+def migrate_log_search(cursor):
+    """Add the computed log_type column and the full-text indexes over the log tables
+
+    On SQLite log_type is a virtual generated column whose index stores the
+    value computed at insert time, and each table gets an FTS5 trigram
+    index kept in sync by triggers. On PostgreSQL both are stored generated
+    columns, with a GIN index over a tsvector. The caller owns the transaction.
+    """
+    expression = _log_type_expression()
+    if DB_TYPE == 'sqlite':
+        cursor.execute("PRAGMA table_xinfo(log_monitoring)")
+        if 'log_type' not in {row[1] for row in cursor.fetchall()}:
+            cursor.execute(
+                f"ALTER TABLE log_monitoring ADD COLUMN log_type TEXT GENERATED ALWAYS AS ({expression}) VIRTUAL")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_log_monitoring_type ON log_monitoring (log_type, create_time, id)")
+        for table, columns in FULL_TEXT_COLUMNS.items():
+            try:
+                if _create_sqlite_fts(cursor, table, columns):
+                    logger.info(f"Built full-text index for {table}")
+            except sqlite3.OperationalError as e:
+                # SQLite built without FTS5 or older than 3.34 (no trigram tokenizer)
+                logger.warning(f"Full-text search unavailable for {table}: {str(e)}")
+    else:
+        cursor.execute(
+            f"ALTER TABLE log_monitoring ADD COLUMN IF NOT EXISTS log_type VARCHAR(16) "
+            f"GENERATED ALWAYS AS ({expression}) STORED")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_log_monitoring_type ON log_monitoring (log_type, create_time, id)")
+        for table, columns in FULL_TEXT_COLUMNS.items():
+            document = " || ' ' || ".join(f"coalesce({column}, '')" for column in columns)
+            cursor.execute(
+                f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                f"GENERATED ALWAYS AS (to_tsvector('simple', {document})) STORED")
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{table}_search ON {table} USING GIN (search_vector)")
+    _full_text_tables.clear()
+
+
+def has_full_text_index(table):
+    """Whether table has a usable full-text index"""
+    if DB_TYPE != 'sqlite':
+        return True
+    key = (SQLITE_DB_PATH, table)
+    if key not in _full_text_tables:
+        rows = execute_query("SELECT 1 FROM sqlite_master WHERE name = ?", (f"{table}_fts",))
+        _full_text_tables[key] = bool(rows)
+    return _full_text_tables[key]
+
+
+def _fts_phrase(keyword):
+    return '"' + keyword.replace('"', '""') + '"'
+
+
+def full_text_condition(table, keyword):
+    """(condition, params) restricting table to rows matching keyword via its full-text index
+
+    Returns None when the index cannot answer the search (no index, or on
+    SQLite a keyword shorter than FULL_TEXT_MIN_LENGTH); callers fall back to LIKE.
+    """
+    if not has_full_text_index(table):
+        return None
+    placeholder = '?' if DB_TYPE == 'sqlite' else '%s'
+    if DB_TYPE == 'sqlite':
+        if len(keyword) < FULL_TEXT_MIN_LENGTH:
+            return None
+        return (f"{table}.id IN (SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH {placeholder})",
+                [_fts_phrase(keyword)])
+    return f"{table}.search_vector @@ plainto_tsquery('simple', {placeholder})", [keyword]
+
+
+def ranked_search(table, columns, keyword, limit=50, offset=0):
+    """One page of table rows matching keyword, best match first
+
+    Returns None when the full-text index cannot answer the search (see
+    full_text_condition).
+    """
+    if full_text_condition(table, keyword) is None:
+        return None
+    select = ', '.join(f"{table}.{column}" for column in columns)
+    placeholder = '?' if DB_TYPE == 'sqlite' else '%s'
+    if DB_TYPE == 'sqlite':
+        query = f"""
+            SELECT {select}
+            FROM {table}_fts JOIN {table} ON {table}.id = {table}_fts.rowid
+            WHERE {table}_fts MATCH {placeholder}
+            ORDER BY bm25({table}_fts), {table}.id DESC
+            LIMIT {placeholder} OFFSET {placeholder}
+        """
+        return execute_query(query, (_fts_phrase(keyword), limit, offset), read_target=True)
+    query = f"""
+        SELECT {select}
+        FROM {table}
+        WHERE search_vector @@ plainto_tsquery('simple', {placeholder})
+        ORDER BY ts_rank(search_vector, plainto_tsquery('simple', {placeholder})) DESC, id DESC
+        LIMIT {placeholder} OFFSET {placeholder}
+    """
+    return execute_query(query, (keyword, keyword, limit, offset), read_target=True)
+
+
 def init_database(csv_data_path=None):  # Fix: add required parameter
     """Initialize the database and create tables (if not exist)"""
     conn = get_connection()
@@ -133,6 +1264,9 @@ def init_database(csv_data_path=None):  # Fix: add required parameter
 
     try:
         if DB_TYPE == 'sqlite':
+            # Only takes effect on a new file; lets incremental_vacuum() shrink it later
+            cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+
             # SQLite table definitions
             cursor.execute('''
             CREATE TABLE IF NOT EXISTS users (
@@ -208,7 +1342,9 @@ def init_database(csv_data_path=None):  # Fix: add required parameter
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 log_id INTEGER NOT NULL,
                 model_name TEXT NOT NULL,
-                model_file BLOB NOT NULL,
+                model_sha256 TEXT NOT NULL,
+                model_size INTEGER NOT NULL,
+                model_path TEXT NOT NULL,
                 model_version TEXT NOT NULL,
                 environment TEXT NOT NULL,
                 caller TEXT NOT NULL,
@@ -233,6 +1369,57 @@ def init_database(csv_data_path=None):  # Fix: add required parameter
                 create_time DATE NOT NULL
             )
             ''')
+            # Newest-first paging, optionally restricted to processed/unprocessed
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_log_monitoring_create_time "
+                "ON log_monitoring (create_time, id)"
+            )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_log_monitoring_done_time "
+                "ON log_monitoring (is_done, create_time, id)"
+            )
+
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS shadow_scores (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                model_name TEXT NOT NULL,
+                champion_version TEXT NOT NULL,
+                challenger_id INTEGER NOT NULL,
+                challenger_version TEXT NOT NULL,
+                applicant_ref TEXT,
+                champion_score REAL NOT NULL,
+                challenger_score REAL NOT NULL,
+                create_time DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+            ''')
+
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS drift_snapshots (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                feature TEXT NOT NULL,
+                window_start INTEGER NOT NULL,
+                is_baseline INTEGER NOT NULL DEFAULT 0,
+                samples INTEGER NOT NULL,
+                counts TEXT NOT NULL,
+                create_time DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+            ''')
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_drift_snapshots_window "
+                "ON drift_snapshots (is_baseline, window_start)"
+            )
+
+            # Pre-aggregated log counts per minute/hour/day bucket (see LogRollupModel)
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS log_rollups (
+                granularity TEXT NOT NULL,
+                metric TEXT NOT NULL,
+                bucket_start TEXT NOT NULL,
+                dimension TEXT NOT NULL DEFAULT '',
+                value INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (granularity, metric, bucket_start, dimension)
+            )
+            ''')
         else:
             # PostgreSQL table definitions
             cursor.execute('''
@@ -309,7 +1496,9 @@ def init_database(csv_data_path=None):  # Fix: add required parameter
                 id BIGSERIAL PRIMARY KEY,
                 log_id BIGINT NOT NULL,
                 model_name VARCHAR(16) NOT NULL,
-                model_file BYTEA NOT NULL,
+                model_sha256 CHAR(64) NOT NULL,
+                model_size BIGINT NOT NULL,
+                model_path VARCHAR(128) NOT NULL,
                 model_version VARCHAR(16) NOT NULL,
                 environment VARCHAR(16) NOT NULL,
                 caller VARCHAR(256) NOT NULL,
@@ -334,34 +1523,72 @@ def init_database(csv_data_path=None):  # Fix: add required parameter
                 create_time DATE NOT NULL
             )
             ''')
+            # Newest-first paging, optionally restricted to processed/unprocessed
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_log_monitoring_create_time "
+                "ON log_monitoring (create_time, id)"
+            )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_log_monitoring_done_time "
+                "ON log_monitoring (is_done, create_time, id)"
+            )
+
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS shadow_scores (
+                id BIGSERIAL PRIMARY KEY,
+                model_name VARCHAR(16) NOT NULL,
+                champion_version VARCHAR(16) NOT NULL,
+                challenger_id BIGINT NOT NULL,
+                challenger_version VARCHAR(16) NOT NULL,
+                applicant_ref VARCHAR(64),
+                champion_score REAL NOT NULL,
+                challenger_score REAL NOT NULL,
+                create_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            ''')
+
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS drift_snapshots (
+                id BIGSERIAL PRIMARY KEY,
+                feature VARCHAR(32) NOT NULL,
+                window_start BIGINT NOT NULL,
+                is_baseline SMALLINT NOT NULL DEFAULT 0,
+                samples BIGINT NOT NULL,
+                counts TEXT NOT NULL,
+                create_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            ''')
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_drift_snapshots_window "
+                "ON drift_snapshots (is_baseline, window_start)"
+            )
+
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS log_rollups (
+                granularity VARCHAR(8) NOT NULL,
+                metric VARCHAR(32) NOT NULL,
+                bucket_start TIMESTAMP NOT NULL,
+                dimension VARCHAR(64) NOT NULL DEFAULT '',
+                value BIGINT NOT NULL DEFAULT 0,
+                PRIMARY KEY (granularity, metric, bucket_start, dimension)
+            )
+            ''')
+
+        migrate_model_artifacts(cursor)
+        migrate_log_search(cursor)
+        conn.commit()
 
         # Add sample data (if not exist)
         if csv_data_path:  # Check if csv_data_path is provided
             cursor.execute("SELECT COUNT(*) FROM users")
             if cursor.fetchone()[0] == 0:
                 # Load data from CSV files
-                tables = {
-                    'users': 'users.csv',
-                    'logs': 'logs.csv',
-                    'name_list': 'name_list.csv',
-                    'log_monitoring': 'log_monitoring.csv',
-                    'model_management': 'model_management.csv',
-                    'rule_management': 'rule_management.csv',
-                    'name_list': 'name_list.csv',
-                    'credit_report': 'credit_report.csv',
-                }
-
-                for table, filename in tables.items():
-                    csv_path = os.path.join(csv_data_path, filename)
-                    if os.path.exists(csv_path):
-                        load_csv_to_table(cursor, table, csv_path)
-                    else:
-                        logger.warning(f"CSV file {csv_path} does not exist, skipping initialization")
-
-                conn.commit()
+                bulk_load_tables(csv_data_path, SEED_TABLES)
                 logger.info("CSV data initialization completed")
-        
+
         conn.commit()
+        # A separate SQLite read file must exist before read-only connections open it
+        sync_sqlite_replica()
         logger.info("Database initialization completed")
     except Exception as e:
         logger.error(f"Database initialization failed: {str(e)}")
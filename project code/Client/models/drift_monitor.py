@@ -0,0 +1,285 @@
+"""
+Streaming drift statistics for scoring inputs and final scores
+
+Every scored application adds one count per feature to fixed-bin
+histograms kept in rolling time windows, so comparing the recent
+distribution with the stored baseline (PSI and KS) costs O(bins) per
+feature and never rescans history. Closed windows are persisted to
+drift_snapshots, and crossing DRIFT_PSI_THRESHOLD or DRIFT_KS_THRESHOLD
+raises a log_monitoring warning.
+"""
+import bisect
+import json
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from Client.models.risk_control_model import DriftSnapshotModel, LogMonitoringModel
+
+try:
+    from config.settings import current_config
+except ImportError:
+    # Fallback for when config is not available
+    class MockConfig:
+        DRIFT_MONITORING_ENABLED = True
+        DRIFT_WINDOW_SECONDS = 3600
+        DRIFT_WINDOWS = 24
+        DRIFT_PSI_THRESHOLD = 0.2
+        DRIFT_KS_THRESHOLD = 0.1
+        DRIFT_MIN_SAMPLES = 100
+    current_config = MockConfig()
+
+logger = logging.getLogger('drift_monitor')
+
+DRIFT_MONITORING_ENABLED = current_config.DRIFT_MONITORING_ENABLED
+
+# Upper bin edges per monitored value; values above the last edge fall in an overflow bin
+BIN_EDGES = {
+    'credit_score': (350, 400, 450, 500, 550, 600, 650, 700, 750, 800, 850),
+    'debt_ratio': (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0),
+    'loan_amount': (10000, 50000, 100000, 200000, 300000, 500000, 1000000),
+    'overdue_count': (0, 1, 2, 3, 5, 10),
+    'max_overdue_days': (0, 7, 30, 60, 90, 180),
+    'score': (10, 20, 30, 40, 50, 60, 70, 80, 90, 100),
+}
+
+# Smoothing for empty bins so PSI stays finite
+_EPSILON = 1e-4
+
+
+def bin_index(feature, value):
+    return bisect.bisect_left(BIN_EDGES[feature], value)
+
+
+def empty_histograms():
+    return {feature: [0] * (len(edges) + 1) for feature, edges in BIN_EDGES.items()}
+
+
+def merge_histograms(into, other):
+    for feature, counts in other.items():
+        target = into.setdefault(feature, [0] * len(counts))
+        for i, count in enumerate(counts):
+            target[i] += count
+    return into
+
+
+def population_stability_index(actual, expected):
+    """PSI between two histograms over the same bins"""
+    actual_total, expected_total = sum(actual), sum(expected)
+    if not actual_total or not expected_total:
+        return 0.0
+    psi = 0.0
+    for a, e in zip(actual, expected):
+        a = max(a / actual_total, _EPSILON)
+        e = max(e / expected_total, _EPSILON)
+        psi += (a - e) * math.log(a / e)
+    return psi
+
+
+def ks_statistic(actual, expected):
+    """Kolmogorov-Smirnov distance between two binned distributions"""
+    actual_total, expected_total = sum(actual), sum(expected)
+    if not actual_total or not expected_total:
+        return 0.0
+    actual_cdf = expected_cdf = distance = 0.0
+    for a, e in zip(actual, expected):
+        actual_cdf += a / actual_total
+        expected_cdf += e / expected_total
+        distance = max(distance, abs(actual_cdf - expected_cdf))
+    return distance
+
+
+def compute_drift(current, baseline):
+    """{feature: {'psi', 'ks', 'samples'}} for features present in both"""
+    report = {}
+    for feature, counts in current.items():
+        expected = baseline.get(feature)
+        if expected is None or len(expected) != len(counts):
+            continue
+        report[feature] = {
+            'psi': population_stability_index(counts, expected),
+            'ks': ks_statistic(counts, expected),
+            'samples': sum(counts),
+        }
+    return report
+
+
+def _histograms_from_rows(rows):
+    histograms = {}
+    for feature, _, counts in rows:
+        if feature in BIN_EDGES:
+            merge_histograms(histograms, {feature: json.loads(counts)})
+    return histograms
+
+
+class DriftMonitor:
+    """Rolling-window histograms with on-demand PSI/KS against a stored baseline"""
+
+    def __init__(self, window_seconds=None, windows=None, psi_threshold=None,
+                 ks_threshold=None, min_samples=None):
+        self.window_seconds = window_seconds or current_config.DRIFT_WINDOW_SECONDS
+        self.windows = windows or current_config.DRIFT_WINDOWS
+        self.psi_threshold = psi_threshold or current_config.DRIFT_PSI_THRESHOLD
+        self.ks_threshold = ks_threshold or current_config.DRIFT_KS_THRESHOLD
+        self.min_samples = current_config.DRIFT_MIN_SAMPLES if min_samples is None else min_samples
+        self._lock = threading.Lock()
+        self._windows = OrderedDict()  # window_start -> histograms
+        self._persisted = set()
+        self._baseline = None
+        self._alerted = set()
+        self._last_log_id = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='drift')
+
+    def _window_start(self, now=None):
+        now = time.time() if now is None else now
+        return int(now // self.window_seconds) * self.window_seconds
+
+    def observe(self, applicant_data, score, now=None):
+        """Count one scored application; O(features * log bins)"""
+        window_start = self._window_start(now)
+        closed_rows = None
+        with self._lock:
+            histograms = self._windows.get(window_start)
+            if histograms is None:
+                if self._windows:
+                    # Copy the closed window now; it may be evicted before the write runs
+                    closed_rows = self._snapshot_rows([next(reversed(self._windows))])
+                histograms = self._windows[window_start] = empty_histograms()
+                while len(self._windows) > self.windows:
+                    old_start, _ = self._windows.popitem(last=False)
+                    self._persisted.discard(old_start)
+            for feature in BIN_EDGES:
+                value = score if feature == 'score' else applicant_data.get(feature)
+                if value is None:
+                    continue
+                try:
+                    histograms[feature][bin_index(feature, float(value))] += 1
+                except (TypeError, ValueError):
+                    continue
+        if closed_rows:
+            # A window just closed: persist it and check drift off the scoring path
+            self._executor.submit(self._on_window_closed, closed_rows)
+
+    def _on_window_closed(self, rows):
+        try:
+            DriftSnapshotModel.add_snapshots(rows)
+            self.check()
+        except Exception as e:
+            logger.error(f"Drift snapshot failed: {str(e)}")
+
+    def _snapshot_rows(self, starts):
+        # Caller holds self._lock
+        starts = [s for s in starts if s in self._windows and s not in self._persisted]
+        self._persisted.update(starts)
+        return [
+            (feature, start, 0, sum(counts), json.dumps(counts))
+            for start in starts
+            for feature, counts in self._windows[start].items()
+        ]
+
+    def current(self):
+        """Histograms summed over the retained windows"""
+        with self._lock:
+            windows = [
+                {feature: list(counts) for feature, counts in histograms.items()}
+                for histograms in self._windows.values()
+            ]
+        current = {}
+        for histograms in windows:
+            merge_histograms(current, histograms)
+        return current
+
+    def persist(self, window_start=None):
+        """Write closed (or the given) windows to drift_snapshots once each"""
+        with self._lock:
+            starts = [window_start] if window_start is not None else list(self._windows)[:-1]
+            rows = self._snapshot_rows(starts)
+        if rows:
+            DriftSnapshotModel.add_snapshots(rows)
+        return len(rows) // len(BIN_EDGES)
+
+    def baseline(self):
+        if self._baseline is None:
+            self._baseline = _histograms_from_rows(DriftSnapshotModel.get_baseline())
+        return self._baseline
+
+    def set_baseline(self, histograms=None):
+        """Store histograms (default: the current rolling windows) as the baseline"""
+        histograms = histograms if histograms is not None else self.current()
+        rows = [(feature, sum(counts), json.dumps(counts)) for feature, counts in histograms.items()]
+        if DriftSnapshotModel.replace_baseline(rows):
+            self._baseline = {feature: list(counts) for feature, counts in histograms.items()}
+            with self._lock:
+                self._alerted = set()
+            return True
+        return False
+
+    def report(self):
+        """PSI/KS of the rolling windows against the baseline"""
+        return compute_drift(self.current(), self.baseline())
+
+    def check(self):
+        """Raise a log_monitoring warning for features that newly crossed a threshold
+
+        Returns the features currently drifting.
+        """
+        drifting = {}
+        for feature, stats in self.report().items():
+            if stats['samples'] < self.min_samples:
+                continue
+            if stats['psi'] >= self.psi_threshold or stats['ks'] >= self.ks_threshold:
+                drifting[feature] = stats
+        with self._lock:
+            # Claimed under the lock so concurrent checks alert once per feature
+            new = [feature for feature in drifting if feature not in self._alerted]
+            self._alerted = set(drifting)
+        for feature in new:
+            stats = drifting[feature]
+            LogMonitoringModel.add_log(
+                log_id=self._next_log_id(),
+                operator='system',
+                operation=f"Drift detected: {feature}",
+                error_info=f"PSI={stats['psi']:.3f} KS={stats['ks']:.3f} over {stats['samples']} samples",
+                is_warning=1,
+                is_done=0,
+                warning_type="Data drift"
+            )
+            logger.warning(f"Drift detected on {feature}: PSI={stats['psi']:.3f} KS={stats['ks']:.3f}")
+        return drifting
+
+    def _next_log_id(self):
+        """Millisecond timestamp log id, strictly increasing within the process"""
+        with self._lock:
+            self._last_log_id = max(time.time_ns() // 1_000_000, self._last_log_id + 1)
+            return self._last_log_id
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+def drift_report_from_snapshots(windows=None, window_seconds=None, now=None):
+    """PSI/KS of the persisted recent windows against the baseline (for other processes)"""
+    windows = windows or current_config.DRIFT_WINDOWS
+    window_seconds = window_seconds or current_config.DRIFT_WINDOW_SECONDS
+    now = time.time() if now is None else now
+    since = int(now // window_seconds) * window_seconds - windows * window_seconds
+    current = _histograms_from_rows(DriftSnapshotModel.get_window_snapshots(since))
+    baseline = _histograms_from_rows(DriftSnapshotModel.get_baseline())
+    return compute_drift(current, baseline), current
+
+
+DRIFT_MONITOR = DriftMonitor()
+
+
+def get_drift_monitor():
+    """Get the process-wide drift monitor"""
+    return DRIFT_MONITOR
+
+
+def observe_scored_application(applicant_data, score):
+    """Feed one scored application to the drift monitor when monitoring is enabled"""
+    if DRIFT_MONITORING_ENABLED:
+        DRIFT_MONITOR.observe(applicant_data, score)
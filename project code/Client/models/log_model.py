@@ -1,32 +1,35 @@
-from Client.models.database import get_connection
+from Client.models.database import execute_query, execute_update, ranked_search
+from Client.utils.logger import timed
 
+@timed
 class LogModel:
     @staticmethod
     def add_log(username, action, details):
         """Add a new log entry."""
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("INSERT INTO logs (username, action, details) VALUES (?, ?, ?)",
-                      (username, action, details))
-        conn.commit()
-        conn.close()
+        execute_update("INSERT INTO logs (username, action, details) VALUES (?, ?, ?)",
+                       (username, action, details))
     
     @staticmethod
     def get_all_logs():
         """Get all logs from the database."""
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, timestamp, username, action FROM logs ORDER BY timestamp DESC")
-        logs = cursor.fetchall()
-        conn.close()
-        return logs
+        return execute_query("SELECT id, timestamp, username, action FROM logs ORDER BY timestamp DESC",
+                             read_target=True)
     
     @staticmethod
     def get_log_details(log_id):
         """Get details for a specific log entry."""
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT details FROM logs WHERE id = ?", (log_id,))
-        result = cursor.fetchone()
-        conn.close()
-        return result[0] if result else ""
\ No newline at end of file
+        results = execute_query("SELECT details FROM logs WHERE id = ?", (log_id,), read_target=True)
+        return results[0][0] if results else ""
+    
+    @staticmethod
+    def search_logs(keyword, limit=50, offset=0):
+        """Get logs matching keyword in action, username or details, best match first."""
+        columns = ('id', 'timestamp', 'username', 'action')
+        rows = ranked_search('logs', columns, keyword, limit, offset)
+        if rows is None:
+            rows = execute_query(
+                "SELECT id, timestamp, username, action FROM logs "
+                "WHERE action LIKE ? OR username LIKE ? OR details LIKE ? "
+                "ORDER BY timestamp DESC LIMIT ? OFFSET ?",
+                [f"%{keyword}%"] * 3 + [limit, offset], read_target=True)
+        return rows
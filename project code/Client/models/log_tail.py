@@ -0,0 +1,65 @@
+"""
+Incremental polling of new log_monitoring rows
+
+A LogTailer remembers the highest row id it has returned and only asks for
+rows above it, so each poll is a primary-key range scan no matter how large
+the table is. Polling backs off while nothing new arrives and snaps back to
+the minimum interval as soon as rows show up.
+"""
+import logging
+import threading
+
+from Client.models.risk_control_model import LogMonitoringModel
+
+try:
+    from config.settings import current_config
+except ImportError:
+    # Fallback for when config is not available
+    class MockConfig:
+        LOG_TAIL_MIN_INTERVAL_MS = 500
+        LOG_TAIL_MAX_INTERVAL_MS = 10000
+        LOG_TAIL_BATCH_SIZE = 500
+        LOG_TAIL_MAX_ROWS = 1000
+    current_config = MockConfig()
+
+logger = logging.getLogger('log_tail')
+
+LOG_TAIL_MAX_ROWS = current_config.LOG_TAIL_MAX_ROWS
+
+
+class LogTailer:
+    """Poll for logs newer than the last one seen, with adaptive backoff"""
+
+    def __init__(self, last_id=None, warnings_only=False, batch_size=None,
+                 min_interval_ms=None, max_interval_ms=None):
+        # Start after the newest existing row unless told otherwise
+        self.last_id = LogMonitoringModel.get_max_log_id() if last_id is None else last_id
+        self.warnings_only = warnings_only
+        self.batch_size = batch_size or current_config.LOG_TAIL_BATCH_SIZE
+        self.min_interval = (min_interval_ms or current_config.LOG_TAIL_MIN_INTERVAL_MS) / 1000
+        self.max_interval = (max_interval_ms or current_config.LOG_TAIL_MAX_INTERVAL_MS) / 1000
+        self.interval = self.min_interval
+
+    def poll(self):
+        """Return up to batch_size new rows (oldest first) and adjust the polling interval"""
+        rows = LogMonitoringModel.get_logs_after(self.last_id, self.batch_size, self.warnings_only)
+        if rows:
+            self.last_id = rows[-1][0]
+            # A full batch means more are waiting: poll again right away
+            self.interval = 0 if len(rows) >= self.batch_size else self.min_interval
+        else:
+            self.interval = min(max(self.interval * 2, self.min_interval), self.max_interval)
+        return rows
+
+    def follow(self, callback, stop_event=None):
+        """Call callback(rows) for every non-empty poll until stop_event is set"""
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            try:
+                rows = self.poll()
+            except Exception as e:
+                logger.error(f"Log tail poll failed: {str(e)}")
+                rows = []
+            if rows:
+                callback(rows)
+            stop_event.wait(self.interval)
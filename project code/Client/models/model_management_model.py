@@ -1,10 +1,13 @@
-from Client.models.database import get_connection, get_db_cursor, execute_query, execute_update
+from Client.models.database import get_connection, get_db_cursor, execute_query, execute_update, execute_many
+from Client.models.artifact_store import StoredArtifact, get_artifact_store
+from Client.utils.logger import timed
 from datetime import date
 import logging
 
 # Configure logger
 logger = logging.getLogger('model_management')
 
+@timed
 class ModelManagementModel:
     @staticmethod
     def get_all_models():
@@ -17,7 +20,7 @@ class ModelManagementModel:
                 FROM model_management
                 ORDER BY create_time DESC
             """
-            return execute_query(query)
+            return execute_query(query, cache=True, read_target=True)
         except Exception as e:
             logger.error(f"Failed to get all models: {str(e)}")
             return []
@@ -27,12 +30,14 @@ class ModelManagementModel:
         """Get models that have been rolled back"""
         try:
             query = """
-                SELECT *
+                SELECT
+                    id, model_name, model_version, environment,
+                    caller, approver, verified, rollback, create_time
                 FROM model_management
                 WHERE rollback = 1
                 ORDER BY create_time DESC
             """
-            return execute_query(query)
+            return execute_query(query, read_target=True)
         except Exception as e:
             logger.error(f"Failed to get rollback models: {str(e)}")
             return []
@@ -42,16 +47,48 @@ class ModelManagementModel:
         """Get unverified models"""
         try:
             query = """
-                SELECT *
+                SELECT
+                    id, model_name, model_version, environment,
+                    caller, approver, verified, rollback, create_time
                 FROM model_management
                 WHERE verified = 0
                 ORDER BY create_time DESC
             """
-            return execute_query(query)
+            return execute_query(query, read_target=True)
         except Exception as e:
             logger.error(f"Failed to get unverified models: {str(e)}")
             return []
     
+    @staticmethod
+    def get_serving_models():
+        """Get verified, not rolled back production models, newest first"""
+        try:
+            query = """
+                SELECT id, model_name, model_version, model_sha256
+                FROM model_management
+                WHERE environment = 'production' AND verified = 1 AND rollback = 0
+                ORDER BY create_time DESC, id DESC
+            """
+            return execute_query(query, cache=True, read_target=True)
+        except Exception as e:
+            logger.error(f"Failed to get serving models: {str(e)}")
+            return []
+    
+    @staticmethod
+    def get_challenger_models(model_name, environment):
+        """Get models of the given name in a non-serving environment that are not rolled back"""
+        try:
+            query = """
+                SELECT id, model_name, model_version, model_sha256
+                FROM model_management
+                WHERE model_name = ? AND environment = ? AND rollback = 0
+                ORDER BY create_time DESC, id DESC
+            """
+            return execute_query(query, (model_name, environment), cache=True, read_target=True)
+        except Exception as e:
+            logger.error(f"Failed to get challenger models: {str(e)}")
+            return []
+    
     @staticmethod
     def get_model_errors():
         """Get model error records"""
@@ -68,25 +105,64 @@ class ModelManagementModel:
                    OR lm.exception_info IS NOT NULL
                 ORDER BY log_time DESC
             """
-            return execute_query(query)
+            return execute_query(query, read_target=True)
         except Exception as e:
             logger.error(f"Failed to get model error records: {str(e)}")
             return []
     
+    @staticmethod
+    def get_model_artifact(model_id):
+        """Get (sha256, size, path) of a model's artifact, or None"""
+        try:
+            query = """
+                SELECT model_sha256, model_size, model_path
+                FROM model_management
+                WHERE id = ?
+            """
+            result = execute_query(query, (model_id,))
+            return StoredArtifact(*result[0]) if result else None
+        except Exception as e:
+            logger.error(f"Failed to get model artifact: {str(e)}")
+            return None
+    
+    @staticmethod
+    def store_model_file(file_path, progress=None):
+        """Stream a model file into the artifact store
+        
+        Returns the StoredArtifact to pass to add_model, or None on failure.
+        """
+        try:
+            return get_artifact_store().put_file(file_path, progress=progress)
+        except Exception as e:
+            logger.error(f"Failed to store model file {file_path}: {str(e)}")
+            return None
+    
     @staticmethod
     def add_model(log_id, model_name, model_file, model_version, environment,
                  caller, approver, verified=0, rollback=0):
-        """Add new model"""
+        """Add new model
+        
+        model_file is either the model's bytes or a StoredArtifact already
+        written to the artifact store; only its digest, size and path are
+        kept in the table.
+        """
         try:
+            if isinstance(model_file, StoredArtifact):
+                artifact = model_file
+            else:
+                artifact = get_artifact_store().put_bytes(model_file)
+            
             query = """
                 INSERT INTO model_management (
-                    log_id, model_name, model_file, model_version, environment,
-                    caller, approver, verified, rollback, create_time
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    log_id, model_name, model_sha256, model_size, model_path,
+                    model_version, environment, caller, approver, verified,
+                    rollback, create_time
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """
             params = (
-                log_id, model_name, model_file, model_version, environment,
-                caller, approver, verified, rollback, date.today()
+                log_id, model_name, artifact.sha256, artifact.size, artifact.path,
+                model_version, environment, caller, approver, verified,
+                rollback, date.today()
             )
             
             success = execute_update(query, params) > 0
@@ -139,6 +215,55 @@ class ModelManagementModel:
             logger.error(f"Failed to delete model: {str(e)}")
             return False
             
+    @staticmethod
+    def get_expired_model_ids(keep):
+        """IDs of versions beyond the newest `keep` per model name
+        
+        Verified and production models are never expired.
+        """
+        try:
+            query = """
+                SELECT id FROM (
+                    SELECT
+                        id, verified, environment,
+                        ROW_NUMBER() OVER (
+                            PARTITION BY model_name ORDER BY create_time DESC, id DESC
+                        ) AS version_rank
+                    FROM model_management
+                ) ranked
+                WHERE version_rank > ? AND verified = 0 AND environment != 'production'
+                ORDER BY id
+            """
+            return [row[0] for row in execute_query(query, (keep,))]
+        except Exception as e:
+            logger.error(f"Failed to get expired models: {str(e)}")
+            return []
+    
+    @staticmethod
+    def delete_models(model_ids):
+        """Delete several models in one transaction"""
+        try:
+            query = "DELETE FROM model_management WHERE id = ?"
+            deleted = execute_many(query, [(model_id,) for model_id in model_ids])
+            logger.info(f"Deleted {deleted} models")
+            return deleted
+        except Exception as e:
+            logger.error(f"Failed to delete models: {str(e)}")
+            return 0
+    
+    @staticmethod
+    def prune_artifacts(min_age=3600):
+        """Delete stored artifacts no longer referenced by any model"""
+        try:
+            referenced = [row[0] for row in execute_query(
+                "SELECT DISTINCT model_sha256 FROM model_management")]
+            removed = get_artifact_store().prune(referenced, min_age)
+            logger.info(f"Pruned {removed} unreferenced model artifacts")
+            return removed
+        except Exception as e:
+            logger.error(f"Failed to prune model artifacts: {str(e)}")
+            return 0
+            
     @staticmethod
     def search_models(model_name=None, environment=None, verified=None):
         """Search models"""
@@ -166,7 +291,56 @@ class ModelManagementModel:
                 
             query += " ORDER BY create_time DESC"
             
-            return execute_query(query, params)
+            return execute_query(query, params, read_target=True)
         except Exception as e:
             logger.error(f"Failed to search models: {str(e)}")
             return []
+
+
+@timed
+class ShadowScoreModel:
+    @staticmethod
+    def add_scores(rows):
+        """Insert shadow scoring results
+        
+        rows: (model_name, champion_version, challenger_id, challenger_version,
+               applicant_ref, champion_score, challenger_score) tuples
+        """
+        try:
+            query = """
+                INSERT INTO shadow_scores (
+                    model_name, champion_version, challenger_id, challenger_version,
+                    applicant_ref, champion_score, challenger_score
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            """
+            return execute_many(query, rows)
+        except Exception as e:
+            logger.error(f"Failed to add shadow scores: {str(e)}")
+            return 0
+    
+    @staticmethod
+    def get_comparison(model_name=None):
+        """Compare each challenger with the champion it shadowed"""
+        try:
+            query = """
+                SELECT
+                    model_name, champion_version, challenger_version,
+                    COUNT(*) AS samples,
+                    AVG(champion_score) AS champion_avg,
+                    AVG(challenger_score) AS challenger_avg,
+                    AVG(ABS(challenger_score - champion_score)) AS mean_abs_diff,
+                    MAX(create_time) AS last_seen
+                FROM shadow_scores
+            """
+            params = []
+            if model_name:
+                query += " WHERE model_name = ?"
+                params.append(model_name)
+            query += """
+                GROUP BY model_name, champion_version, challenger_version
+                ORDER BY model_name, challenger_version
+            """
+            return execute_query(query, params, read_target=True)
+        except Exception as e:
+            logger.error(f"Failed to get shadow score comparison: {str(e)}")
+            return []
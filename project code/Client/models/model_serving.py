@@ -0,0 +1,307 @@
+"""
+In-memory cache of deserialized production models for scoring
+
+Only models in the 'production' environment that are verified and not
+rolled back are served. Artifacts are loaded from the artifact store on
+first use (or by warm() at startup) and kept in an LRU cache keyed by
+(model_name, model_version), so scoring never deserializes per request.
+Artifacts are unpickled, so only verified uploads are ever loaded.
+"""
+import logging
+import pickle
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from Client.models.artifact_store import get_artifact_store
+from Client.models.model_management_model import ModelManagementModel
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    import joblib
+    HAS_JOBLIB = True
+except ImportError:
+    HAS_JOBLIB = False
+
+try:
+    from config.settings import current_config
+except ImportError:
+    # Fallback for when config is not available
+    class MockConfig:
+        MODEL_CACHE_SIZE = 4
+        SCORING_MODEL_NAME = ''
+        RULE_SCORE_WEIGHT = 0.7
+        MODEL_SCORE_WEIGHT = 0.3
+        MODEL_BATCH_SIZE = 64
+        MODEL_BATCH_MAX_WAIT_MS = 5.0
+    current_config = MockConfig()
+
+logger = logging.getLogger('model_serving')
+
+SCORING_MODEL_NAME = current_config.SCORING_MODEL_NAME
+RULE_SCORE_WEIGHT = current_config.RULE_SCORE_WEIGHT
+MODEL_SCORE_WEIGHT = current_config.MODEL_SCORE_WEIGHT
+MODEL_BATCH_SIZE = current_config.MODEL_BATCH_SIZE
+MODEL_BATCH_MAX_WAIT_MS = current_config.MODEL_BATCH_MAX_WAIT_MS
+
+# Applicant fields fed to scoring models, in column order
+FEATURES = (
+    'loan_amount', 'credit_score', 'overdue_count', 'max_overdue_days',
+    'debt_ratio', 'has_mortgage', 'has_car_loan',
+)
+
+
+def applicant_features(applicant_data):
+    """Feature row for one applicant (booleans become 0/1, missing values 0)"""
+    return [float(applicant_data.get(name) or 0) for name in FEATURES]
+
+
+def feature_matrix(applicants):
+    """2-D float array with one row per applicant (a list of lists without NumPy)"""
+    rows = [applicant_features(a) for a in applicants]
+    if HAS_NUMPY:
+        return np.asarray(rows, dtype=np.float64).reshape(len(rows), len(FEATURES))
+    return rows
+
+
+def load_model_artifact(digest):
+    """Deserialize a stored artifact (joblib when installed, pickle otherwise)"""
+    store = get_artifact_store()
+    if HAS_JOBLIB:
+        return joblib.load(store.path_for(digest))
+    with store.open(digest) as f:
+        return pickle.load(f)
+
+
+def predict_default_probability(model, rows):
+    """Probability of default for each feature row
+
+    Classifiers with predict_proba use the last (positive) class column;
+    anything else is expected to return probabilities from predict.
+    """
+    if hasattr(model, 'predict_proba'):
+        probabilities = model.predict_proba(rows)
+        if HAS_NUMPY:
+            return np.asarray(probabilities, dtype=np.float64)[:, -1].tolist()
+        return [float(p[-1]) for p in probabilities]
+    return [float(p) for p in model.predict(rows)]
+
+
+class ModelCache:
+    """Thread-safe LRU cache of deserialized serving models"""
+
+    def __init__(self, max_entries=4):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (name, version) -> (model_id, sha256, model)
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def find_serving(model_name, model_version=None):
+        """(id, name, version, sha256) of the serving model; the newest when no version is given"""
+        for row in ModelManagementModel.get_serving_models():
+            if row[1] == model_name and (model_version is None or str(row[2]) == str(model_version)):
+                return row
+        return None
+
+    def get(self, model_name, model_version=None):
+        """Return the deserialized serving model, or None if it is not servable"""
+        row = self.find_serving(model_name, model_version)
+        if row is None:
+            return None
+        return self.load(row)
+
+    def load(self, row):
+        """Return the deserialized model for an (id, name, version, sha256) row, loading it if needed
+
+        Unlike get(), this does not check that the model is servable.
+        """
+        model_id, name, version, sha256 = row
+        key = (name, str(version))
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == sha256:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Concurrent requests for the same model wait for one load
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] == sha256:
+                    return entry[2]
+            try:
+                model = load_model_artifact(sha256)
+            except Exception as e:
+                logger.error(f"Failed to load model {name} {version}: {str(e)}")
+                return None
+            logger.info(f"Loaded model {name} {version} ({sha256[:12]})")
+
+            with self._lock:
+                self._entries[key] = (model_id, sha256, model)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+            return model
+
+    def warm(self):
+        """Load the newest serving models up to the cache size; returns how many were loaded"""
+        loaded = 0
+        seen = set()
+        for model_id, name, version, sha256 in ModelManagementModel.get_serving_models():
+            if loaded >= self.max_entries or name in seen:
+                continue
+            seen.add(name)
+            if self.get(name, version) is not None:
+                loaded += 1
+        return loaded
+
+    def invalidate_model(self, model_id):
+        """Drop the cached copy of a model after its rollback/verified state changes"""
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry[0] == model_id]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'evictions': self.evictions,
+            }
+
+
+MODEL_CACHE = ModelCache(current_config.MODEL_CACHE_SIZE)
+
+
+def get_model_cache():
+    """Get the process-wide serving model cache"""
+    return MODEL_CACHE
+
+
+def blend_scores(rule_score, model_score):
+    """Weighted average of the rule score and the model score (both 0-100)"""
+    if model_score is None:
+        return rule_score
+    total = RULE_SCORE_WEIGHT + MODEL_SCORE_WEIGHT
+    return round((RULE_SCORE_WEIGHT * rule_score + MODEL_SCORE_WEIGHT * model_score) / total, 2)
+
+
+def score_batch(applicants, model_name=None):
+    """Model scores (0-100, higher is safer) for many applicants with one model call
+
+    Returns a list aligned with applicants; entries are None without a serving model.
+    """
+    model_name = model_name or SCORING_MODEL_NAME
+    if not applicants or not model_name:
+        return [None] * len(applicants)
+    model = MODEL_CACHE.get(model_name)
+    if model is None:
+        return [None] * len(applicants)
+    try:
+        probabilities = predict_default_probability(model, feature_matrix(applicants))
+    except Exception as e:
+        logger.error(f"Model {model_name} failed to score {len(applicants)} applicants: {str(e)}")
+        return [None] * len(applicants)
+    return [round((1.0 - p) * 100, 2) for p in probabilities]
+
+
+def score_applicant(applicant_data, model_name=None):
+    """Model score (0-100, higher is safer) for one applicant, or None without a serving model"""
+    return score_batch([applicant_data], model_name)[0]
+
+
+class BatchScorer:
+    """Inference stage that groups concurrent scoring requests into one model call
+
+    A request waits at most max_wait_ms for others to join its batch, so
+    online latency stays bounded while bursts are scored together. With
+    max_wait_ms <= 0 every request is scored on the caller's thread.
+    """
+
+    def __init__(self, model_name=None, max_batch_size=None, max_wait_ms=None):
+        self.model_name = model_name
+        self.max_batch_size = max_batch_size or MODEL_BATCH_SIZE
+        self.max_wait_ms = MODEL_BATCH_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.scored = 0
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='model-batch-scorer', daemon=True)
+                self._worker.start()
+
+    def submit(self, applicant_data):
+        """Queue an applicant; the returned Future resolves to its model score"""
+        future = Future()
+        if self.max_wait_ms <= 0 or not (self.model_name or SCORING_MODEL_NAME):
+            future.set_result(self.score_many([applicant_data])[0])
+            return future
+        self._ensure_worker()
+        self._queue.put((applicant_data, future))
+        return future
+
+    def score(self, applicant_data):
+        return self.submit(applicant_data).result()
+
+    def score_many(self, applicants):
+        """Score a ready batch with one model call"""
+        scores = score_batch(applicants, self.model_name)
+        with self._lock:
+            self.batches += 1
+            self.scored += len(applicants)
+        return scores
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                scores = self.score_many([applicant for applicant, _ in batch])
+            except Exception as e:
+                logger.error(f"Batch scoring failed: {str(e)}")
+                scores = [None] * len(batch)
+            for (_, future), model_score in zip(batch, scores):
+                future.set_result(model_score)
+
+
+BATCH_SCORER = BatchScorer()
+
+
+def get_batch_scorer():
+    """Get the process-wide inference stage shared by all online requests"""
+    return BATCH_SCORER
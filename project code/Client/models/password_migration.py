@@ -0,0 +1,166 @@
+"""
+Password hash upgrades
+
+users.password may still hold plaintext seeded from users.csv, bare or
+salted sha256, or bcrypt below BCRYPT_ROUNDS. A successful login is the
+only time the password itself is known, so UserModel.authenticate hands
+such accounts to the PasswordRehasher, which hashes them again on a
+background worker and writes the hash back only if the row still holds the
+value that was verified. migrate_plaintext_passwords() hashes every
+plaintext row offline, spreading the work across processes. Values of 64
+hex characters may be a bare sha256 digest or a plaintext password that
+looks like one; only a login can tell, so they are left to the rehasher.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from Client.models.user_model import UserModel
+from Client.utils.security import PasswordManager
+
+try:
+    from config.settings import current_config
+except ImportError:
+    # Fallback for when config is not available
+    class MockConfig:
+        PASSWORD_REHASH_QUEUE_SIZE = 1000
+        PASSWORD_MIGRATION_WORKERS = 0
+        PASSWORD_MIGRATION_BATCH_SIZE = 50
+    current_config = MockConfig()
+
+logger = logging.getLogger('password_migration')
+
+
+class PasswordRehasher:
+    """Background worker that replaces outdated password hashes after login
+
+    Each username is queued at most once at a time. When the queue is full
+    the upgrade is dropped; the next login queues it again.
+    """
+
+    def __init__(self, max_pending=None):
+        self._queue = queue.Queue(maxsize=max_pending or current_config.PASSWORD_REHASH_QUEUE_SIZE)
+        self._pending = set()
+        self._worker = None
+        self._lock = threading.Lock()
+        self.rehashed = 0
+        self.skipped = 0
+        self.failed = 0
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='password-rehash', daemon=True)
+                self._worker.start()
+
+    def submit(self, username, password, stored):
+        """Queue a verified password for rehashing; returns whether it was queued"""
+        with self._lock:
+            if username in self._pending:
+                return False
+            self._pending.add(username)
+        try:
+            self._queue.put_nowait((username, password, stored))
+        except queue.Full:
+            with self._lock:
+                self._pending.discard(username)
+            logger.warning(f"Password rehash queue full, skipping upgrade for {username}")
+            return False
+        self._ensure_worker()
+        return True
+
+    def rehash(self, username, password, stored):
+        """Hash the password with current settings and store it if the row is unchanged"""
+        new_hash = PasswordManager.hash_password(password)
+        if UserModel.replace_password_hash(username, stored, new_hash):
+            logger.info(f"Upgraded {PasswordManager.hash_format(stored)} password of {username}")
+            return True
+        # The password was changed (or already upgraded) since it was verified
+        return False
+
+    def join(self):
+        """Block until every queued upgrade has been written"""
+        self._queue.join()
+
+    def stats(self):
+        with self._lock:
+            return {'pending': len(self._pending), 'rehashed': self.rehashed,
+                    'skipped': self.skipped, 'failed': self.failed}
+
+    def _run(self):
+        while True:
+            username, password, stored = self._queue.get()
+            try:
+                updated = self.rehash(username, password, stored)
+            except Exception as e:
+                logger.error(f"Password rehash failed for {username}: {str(e)}")
+                updated = None
+            with self._lock:
+                self._pending.discard(username)
+                if updated is None:
+                    self.failed += 1
+                elif updated:
+                    self.rehashed += 1
+                else:
+                    self.skipped += 1
+            self._queue.task_done()
+
+
+PASSWORD_REHASHER = PasswordRehasher()
+atexit.register(PASSWORD_REHASHER.join)
+
+
+def get_password_rehasher():
+    """Get the process-wide rehash worker used by logins"""
+    return PASSWORD_REHASHER
+
+
+def _hash_passwords(passwords, rounds):
+    """Worker process entry point: hash one batch of passwords"""
+    return [PasswordManager.hash_password(password, rounds) for password in passwords]
+
+
+def migrate_plaintext_passwords(workers=None, batch_size=None, rounds=None):
+    """Hash every plaintext users.password in parallel worker processes
+
+    Hashed values are written in one statement per batch, and only to rows
+    whose password has not changed since it was read.
+
+    Args:
+        workers: Worker processes (default PASSWORD_MIGRATION_WORKERS, or one per CPU)
+        batch_size: Passwords hashed per task (default PASSWORD_MIGRATION_BATCH_SIZE)
+        rounds: bcrypt cost (default BCRYPT_ROUNDS)
+
+    Returns:
+        dict: plaintext, migrated and skipped counts, plus deferred: rows that
+        look like bare sha256 and are upgraded at their next login instead
+    """
+    workers = workers or current_config.PASSWORD_MIGRATION_WORKERS or os.cpu_count() or 1
+    batch_size = batch_size or current_config.PASSWORD_MIGRATION_BATCH_SIZE
+    rows, deferred = [], 0
+    for user_id, password in UserModel.get_password_rows():
+        hash_format = PasswordManager.hash_format(password) if password is not None else None
+        if hash_format == 'plaintext':
+            rows.append((user_id, password))
+        elif hash_format == 'sha256':
+            deferred += 1
+    stats = {'plaintext': len(rows), 'migrated': 0, 'skipped': 0, 'deferred': deferred}
+    if not rows:
+        return stats
+
+    batches = [rows[start:start + batch_size] for start in range(0, len(rows), batch_size)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(batches))) as pool:
+        futures = {pool.submit(_hash_passwords, [password for _, password in batch], rounds): batch
+                   for batch in batches}
+        for future in as_completed(futures):
+            batch = futures[future]
+            updates = [(new_hash, user_id, password)
+                       for (user_id, password), new_hash in zip(batch, future.result())]
+            migrated = UserModel.replace_password_hashes(updates)
+            stats['migrated'] += migrated
+            stats['skipped'] += len(batch) - migrated
+    logger.info(f"Password migration ({workers} workers): {stats}")
+    return stats
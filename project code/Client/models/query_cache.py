@@ -0,0 +1,114 @@
+"""
+LRU + TTL cache for read query results, tagged by the tables each query reads
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+
+_READ_TABLES_RE = re.compile(r'\b(?:FROM|JOIN)\s+([A-Za-z_][A-Za-z0-9_]*)', re.IGNORECASE)
+_WRITE_TABLE_RE = re.compile(
+    r'^\s*(?:INSERT\s+(?:OR\s+\w+\s+)?INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)'
+    r'\s+([A-Za-z_][A-Za-z0-9_]*)',
+    re.IGNORECASE
+)
+
+
+def normalize_sql(query):
+    """Collapse whitespace so formatting differences share a cache entry"""
+    return ' '.join(query.split())
+
+
+def tables_read_by(query):
+    """Tables referenced in FROM/JOIN clauses"""
+    return frozenset(name.lower() for name in _READ_TABLES_RE.findall(query))
+
+
+def table_written_by(query):
+    """Table modified by an INSERT/UPDATE/DELETE, or None if it cannot be determined"""
+    match = _WRITE_TABLE_RE.match(query)
+    return match.group(1).lower() if match else None
+
+
+def _freeze(params):
+    if params is None:
+        return ()
+    if isinstance(params, dict):
+        return tuple(sorted(params.items()))
+    return tuple(params)
+
+
+class QueryCache:
+    """Thread-safe LRU cache with per-entry TTL and table-level invalidation"""
+
+    def __init__(self, max_entries=256, ttl=30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, tables, rows)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(query, params=None):
+        return normalize_sql(query), _freeze(params)
+
+    @property
+    def generation(self):
+        """Changes on every invalidation; pass it back to put() to avoid caching stale reads"""
+        return self._generation
+
+    def get(self, key):
+        """Return (True, rows) on a hit, (False, None) on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, list(entry[2])
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, tables, rows, generation=None):
+        """Store rows unless an invalidation happened since `generation` was read"""
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, tables, list(rows))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_tables(self, tables):
+        """Drop every entry that reads any of the given tables"""
+        tables = {t.lower() for t in tables}
+        with self._lock:
+            self._generation += 1
+            stale = [key for key, entry in self._entries.items() if entry[1] & tables]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
@@ -0,0 +1,212 @@
+"""
+Per-statement timing statistics for the data layer
+"""
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class StatementStats:
+    """Counters and latency histogram for one normalised statement"""
+
+    __slots__ = ('count', 'total_ms', 'max_ms', 'rows', 'pool_wait_ms', 'buckets', 'plan')
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.pool_wait_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.plan = None
+
+    def add(self, elapsed_ms, rows, pool_wait_ms):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.rows += rows
+        self.pool_wait_ms += pool_wait_ms
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'total_ms': self.total_ms,
+            'max_ms': self.max_ms,
+            'rows': self.rows,
+            'pool_wait_ms': self.pool_wait_ms,
+            'buckets': list(self.buckets),
+            'plan': self.plan,
+        }
+
+
+def _merge(into, delta):
+    """Add delta (a to_dict() mapping) into a stored mapping"""
+    into['count'] = into.get('count', 0) + delta['count']
+    into['total_ms'] = into.get('total_ms', 0.0) + delta['total_ms']
+    into['max_ms'] = max(into.get('max_ms', 0.0), delta['max_ms'])
+    into['rows'] = into.get('rows', 0) + delta['rows']
+    into['pool_wait_ms'] = into.get('pool_wait_ms', 0.0) + delta['pool_wait_ms']
+    buckets = into.get('buckets') or [0] * len(delta['buckets'])
+    into['buckets'] = [a + b for a, b in zip(buckets, delta['buckets'])]
+    into['plan'] = delta.get('plan') or into.get('plan')
+    return into
+
+
+def _subtract(current, saved):
+    if not saved:
+        return current
+    return {
+        'count': current['count'] - saved['count'],
+        'total_ms': current['total_ms'] - saved['total_ms'],
+        'max_ms': current['max_ms'],
+        'rows': current['rows'] - saved['rows'],
+        'pool_wait_ms': current['pool_wait_ms'] - saved['pool_wait_ms'],
+        'buckets': [a - b for a, b in zip(current['buckets'], saved['buckets'])],
+        'plan': current['plan'],
+    }
+
+
+class QueryStats:
+    """Thread-safe registry of StatementStats keyed by normalised SQL"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._statements = {}
+        self._saved = {}
+        self.pool_wait = StatementStats()
+
+    def record(self, sql, elapsed_ms, rows=0, pool_wait_ms=0.0):
+        with self._lock:
+            stats = self._statements.get(sql)
+            if stats is None:
+                stats = self._statements[sql] = StatementStats()
+            stats.add(elapsed_ms, rows, pool_wait_ms)
+
+    def record_pool_wait(self, wait_ms):
+        with self._lock:
+            self.pool_wait.add(wait_ms, 0, wait_ms)
+
+    def set_plan(self, sql, plan):
+        with self._lock:
+            if sql in self._statements:
+                self._statements[sql].plan = plan
+
+    def snapshot(self):
+        """{sql: stats dict} for every statement seen by this process"""
+        with self._lock:
+            return {sql: stats.to_dict() for sql, stats in self._statements.items()}
+
+    def top(self, n=10, key='total_ms'):
+        return top_statements(self.snapshot(), n, key)
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+            self._saved.clear()
+            self.pool_wait = StatementStats()
+
+    def save(self, path):
+        """Merge what changed since the last save into a cumulative JSON file
+
+        Several processes can share one file; each contributes only its deltas.
+        The read-merge-write runs under an exclusive lock on <path>.lock so
+        concurrent saves never lose each other's counts.
+        """
+        with self._save_lock, _file_lock(f"{path}.lock"):
+            current = self.snapshot()
+            stored = load_stats(path)
+            for sql, stats in current.items():
+                delta = _subtract(stats, self._saved.get(sql))
+                if delta['count'] > 0:
+                    _merge(stored.setdefault(sql, {}), delta)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(stored, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            self._saved = current
+
+
+@contextmanager
+def _file_lock(lock_path):
+    """Hold an exclusive inter-process lock on lock_path"""
+    with open(lock_path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def load_stats(path):
+    """Load a file written by QueryStats.save"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def top_statements(stats, n=10, key='total_ms'):
+    """The n statements with the largest value of key, as (sql, stats) pairs"""
+    return sorted(stats.items(), key=lambda item: item[1][key], reverse=True)[:n]
+
+
+def percentile_ms(buckets, fraction, max_ms=None):
+    """Approximate latency percentile from histogram bucket counts
+
+    The answer is the upper bound of the bucket holding the percentile,
+    capped at max_ms (the slowest call seen) when it is given.
+    """
+    total = sum(buckets)
+    if not total:
+        return 0.0
+    threshold = total * fraction
+    seen = 0
+    for i, count in enumerate(buckets):
+        seen += count
+        if seen >= threshold:
+            bound = float(LATENCY_BUCKETS_MS[i]) if i < len(LATENCY_BUCKETS_MS) else float('inf')
+            return min(bound, max_ms) if max_ms is not None else bound
+    return float('inf') if max_ms is None else max_ms
+
+
+def format_top_statements(stats, n=10):
+    """Render the top-n statements by total time as a text table"""
+    lines = [f"{'total ms':>12} {'calls':>8} {'avg ms':>9} {'p95 ms':>8} {'max ms':>9} "
+             f"{'rows':>10} {'pool ms':>9}  statement"]
+    for sql, s in top_statements(stats, n):
+        avg = s['total_ms'] / s['count'] if s['count'] else 0.0
+        lines.append(
+            f"{s['total_ms']:>12.1f} {s['count']:>8} {avg:>9.2f} "
+            f"{percentile_ms(s['buckets'], 0.95, s['max_ms']):>8.1f} {s['max_ms']:>9.1f} "
+            f"{s['rows']:>10} {s['pool_wait_ms']:>9.1f}  {sql[:120]}"
+        )
+        if s.get('plan'):
+            lines.extend(f"{'':>70}  | {line}" for line in s['plan'].splitlines())
+    return '\n'.join(lines)
@@ -0,0 +1,109 @@
+"""
+Model version retention and database compaction
+
+Keeps the newest MODEL_VERSION_RETENTION versions of every model name (plus
+anything verified or in production), deletes the rest in batches, removes
+artifacts nothing references any more, drops fine-grained log rollups past
+their retention and gives the freed pages back to the operating system
+with a bounded incremental vacuum.
+"""
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from Client.models import database
+from Client.models.model_management_model import ModelManagementModel
+from Client.models.model_serving import get_model_cache
+from Client.models.risk_control_model import LogRollupModel
+
+try:
+    from config.settings import current_config
+except ImportError:
+    # Fallback for when config is not available
+    class MockConfig:
+        MODEL_VERSION_RETENTION = 5
+        RETENTION_SCHEDULER_ENABLED = False
+        RETENTION_INTERVAL = 86400
+        RETENTION_BATCH_SIZE = 500
+        LOG_ROLLUP_MINUTE_RETENTION_DAYS = 7
+        LOG_ROLLUP_HOUR_RETENTION_DAYS = 90
+    current_config = MockConfig()
+
+logger = logging.getLogger('retention')
+
+
+def run_retention(keep=None, batch_size=None, vacuum=True, dry_run=False, artifact_min_age=3600):
+    """Apply the model version retention policy
+
+    Args:
+        keep: Versions to keep per model name (default MODEL_VERSION_RETENTION)
+        batch_size: Rows deleted per transaction (default RETENTION_BATCH_SIZE)
+        vacuum: Run a bounded incremental vacuum afterwards
+        dry_run: Only report what would be deleted
+        artifact_min_age: Seconds an unreferenced artifact must be old before it is removed
+
+    Returns:
+        dict: expired, deleted, artifacts_pruned, rollups_pruned and pages_released counts
+    """
+    keep = keep or current_config.MODEL_VERSION_RETENTION
+    batch_size = batch_size or current_config.RETENTION_BATCH_SIZE
+    expired = ModelManagementModel.get_expired_model_ids(keep)
+    stats = {'expired': len(expired), 'deleted': 0, 'artifacts_pruned': 0, 'rollups_pruned': 0,
+             'pages_released': 0}
+    if dry_run:
+        return stats
+
+    model_cache = get_model_cache()
+    for start in range(0, len(expired), batch_size):
+        batch = expired[start:start + batch_size]
+        stats['deleted'] += ModelManagementModel.delete_models(batch)
+        for model_id in batch:
+            model_cache.invalidate_model(model_id)
+
+    stats['artifacts_pruned'] = ModelManagementModel.prune_artifacts(artifact_min_age)
+    now = datetime.now()
+    stats['rollups_pruned'] = (
+        LogRollupModel.prune('minute', now - timedelta(days=current_config.LOG_ROLLUP_MINUTE_RETENTION_DAYS)) +
+        LogRollupModel.prune('hour', now - timedelta(days=current_config.LOG_ROLLUP_HOUR_RETENTION_DAYS))
+    )
+    if vacuum:
+        stats['pages_released'] = database.incremental_vacuum(tables=['model_management', 'log_rollups'])
+    logger.info(f"Retention (keep {keep}): {stats}")
+    return stats
+
+
+class RetentionScheduler:
+    """Run run_retention() every `interval` seconds on a daemon thread"""
+
+    def __init__(self, interval=None, **retention_options):
+        self.interval = interval or current_config.RETENTION_INTERVAL
+        self.retention_options = retention_options
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='retention', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                run_retention(**self.retention_options)
+            except Exception as e:
+                logger.error(f"Retention run failed: {str(e)}")
+
+
+def start_retention_scheduler():
+    """Start the background retention job if RETENTION_SCHEDULER_ENABLED is set"""
+    if not current_config.RETENTION_SCHEDULER_ENABLED:
+        return None
+    scheduler = RetentionScheduler()
+    scheduler.start()
+    return scheduler
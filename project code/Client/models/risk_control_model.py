@@ -1,11 +1,15 @@
-from Client.models.database import get_connection, get_db_cursor, execute_query, execute_update
+from Client.models.database import (get_connection, get_db_cursor, execute_query, execute_update, execute_many,
+                                    unit_of_work, savepoint, full_text_condition, ranked_search,
+                                    LOG_TYPE_RUNTIME, LOG_TYPE_OPERATION)
+from Client.utils.logger import timed
 import random
-from datetime import date
+from datetime import date, datetime, timedelta
 import logging
 
 # Configure logger
 logger = logging.getLogger('risk_control')
 
+@timed
 class NameListModel:
     @staticmethod
     def get_all_entries():
@@ -17,7 +21,7 @@ class NameListModel:
                 FROM name_list nl
                 JOIN rule_management rm ON nl.rule_id = rm.rule_id
             """
-            return execute_query(query)
+            return execute_query(query, cache=True, read_target=True)
         except Exception as e:
             logger.error(f"Failed to get all name list entries: {str(e)}")
             return []
@@ -38,7 +42,7 @@ class NameListModel:
                 query += " AND nl.value_type = ?"
                 params.append(value_type)
                 
-            return execute_query(query, params)
+            return execute_query(query, params, read_target=True)
         except Exception as e:
             logger.error(f"Failed to check hit: {str(e)}")
             return []
@@ -115,12 +119,13 @@ class NameListModel:
                 
             query += " ORDER BY nl.create_time DESC"
             
-            return execute_query(query, params)
+            return execute_query(query, params, read_target=True)
         except Exception as e:
             logger.error(f"Failed to search name list entries: {str(e)}")
             return []
 
 
+@timed
 class RuleModel:
     @staticmethod
     def get_all_rules():
@@ -131,7 +136,7 @@ class RuleModel:
                        is_external, priority, creator, create_time
                 FROM rule_management
             """
-            return execute_query(query)
+            return execute_query(query, cache=True, read_target=True)
         except Exception as e:
             logger.error(f"Failed to get all rules: {str(e)}")
             return []
@@ -148,7 +153,7 @@ class RuleModel:
                 FROM rule_management
                 ORDER BY priority DESC, create_time DESC
             """
-            return execute_query(query)
+            return execute_query(query, cache=True, read_target=True)
         except Exception as e:
             logger.error(f"Failed to get active rules: {str(e)}")
             return []
@@ -167,7 +172,7 @@ class RuleModel:
                 GROUP BY nl.rule_id, rm.rule_name
                 ORDER BY hit_count DESC
             """
-            return execute_query(query)
+            return execute_query(query, cache=True, read_target=True)
         except Exception as e:
             logger.error(f"Failed to get rule hit count: {str(e)}")
             return []
@@ -187,7 +192,7 @@ class RuleModel:
                 GROUP BY nl.business_line, nl.rule_id, rm.rule_name
                 ORDER BY hit_count DESC
             """
-            return execute_query(query)
+            return execute_query(query, cache=True, read_target=True)
         except Exception as e:
             logger.error(f"Failed to get rule hit count by business: {str(e)}")
             return []
@@ -267,12 +272,13 @@ class RuleModel:
                 
             query += " ORDER BY create_time DESC"
             
-            return execute_query(query, params)
+            return execute_query(query, params, read_target=True)
         except Exception as e:
             logger.error(f"Failed to search rules: {str(e)}")
             return []
 
 
+@timed
 class LogMonitoringModel:
     @staticmethod
     def get_all_logs():
@@ -284,7 +290,7 @@ class LogMonitoringModel:
                 FROM log_monitoring
                 ORDER BY create_time DESC
             """
-            return execute_query(query)
+            return execute_query(query, read_target=True)
         except Exception as e:
             logger.error(f"Failed to get all logs: {str(e)}")
             return []
@@ -304,7 +310,7 @@ class LogMonitoringModel:
                   )
                 ORDER BY create_time DESC
             """
-            return execute_query(query)
+            return execute_query(query, cache=True, read_target=True)
         except Exception as e:
             logger.error(f"Failed to get pending warnings: {str(e)}")
             return []
@@ -325,7 +331,14 @@ class LogMonitoringModel:
                 is_warning, is_done, warning_type, date.today()
             )
             
-            success = execute_update(query, params) > 0
+            with unit_of_work() as uow:
+                success = execute_update(query, params) > 0
+                if success:
+                    # Rollups are derived; failing to update them must not lose the log row
+                    with savepoint('log_rollups'):
+                        LogRollupModel.record_log(operator, error_info, exception_info,
+                                                  is_warning, is_done, warning_type)
+            success = success and (uow.joined or uow.committed)
             logger.info(f"Add log {operation} {'succeeded' if success else 'failed'}")
             return success
         except Exception as e:
@@ -338,7 +351,16 @@ class LogMonitoringModel:
         try:
             query = "UPDATE log_monitoring SET is_done = 1 WHERE log_id = ?"
             
-            success = execute_update(query, (log_id,)) > 0
+            with unit_of_work() as uow:
+                resolved = execute_query(
+                    "SELECT COUNT(*) FROM log_monitoring WHERE log_id = ? AND is_done = 0 AND is_warning = 1",
+                    (log_id,)
+                )[0][0]
+                success = execute_update(query, (log_id,)) > 0
+                if resolved:
+                    with savepoint('log_rollups'):
+                        LogRollupModel.record_resolved(resolved)
+            success = success and (uow.joined or uow.committed)
             logger.info(f"Mark log as done (ID: {log_id}) {'succeeded' if success else 'failed'}")
             return success
         except Exception as e:
@@ -350,13 +372,13 @@ class LogMonitoringModel:
         """Get logs by type"""
         try:
             query = "SELECT * FROM log_monitoring WHERE 1=1"
+            params = []
             
-            if log_type == "运行日志":
-                query += " AND operation LIKE '%运行%'"
-            elif log_type == "操作日志":
-                query += " AND operation NOT LIKE '%运行%'"
+            if log_type in LogMonitoringModel.LOG_TYPES:
+                query += " AND log_type = ?"
+                params.append(LogMonitoringModel.LOG_TYPES[log_type])
                 
-            return execute_query(query)
+            return execute_query(query, params, read_target=True)
         except Exception as e:
             logger.error(f"Failed to get logs by type: {str(e)}")
             return []
@@ -374,9 +396,27 @@ class LogMonitoringModel:
             logger.error(f"Failed to delete log: {str(e)}")
             return False
             
+    # Log type filter labels -> log_type column values (computed from operation on insert)
+    LOG_TYPES = {
+        "运行日志": LOG_TYPE_RUNTIME,
+        "Runtime logs": LOG_TYPE_RUNTIME,
+        "操作日志": LOG_TYPE_OPERATION,
+        "Operation logs": LOG_TYPE_OPERATION,
+    }
+    
+    COLUMNS = ('id', 'log_id', 'operator', 'operation', 'error_info', 'exception_info',
+               'is_warning', 'is_done', 'warning_type', 'create_time')
+    
     @staticmethod
-    def search_logs(keyword=None, log_type=None, is_done=None):
-        """Search logs"""
+    def search_logs(keyword=None, log_type=None, is_done=None, start_date=None, end_date=None,
+                    limit=None, before=None):
+        """Search logs, newest first
+        
+        All filters run in SQL. With limit, at most limit rows are returned;
+        pass the (create_time, id) of the last row as before to get the next
+        page, which reads the create_time index from that point instead of
+        skipping rows with OFFSET.
+        """
         try:
             query = """
                 SELECT id, log_id, operator, operation, error_info, exception_info,
@@ -387,22 +427,367 @@ class LogMonitoringModel:
             params = []
             
             if keyword:
-                query += " AND (operation LIKE ? OR operator LIKE ? OR error_info LIKE ?)"
-                keyword_param = f"%{keyword}%"
-                params.extend([keyword_param, keyword_param, keyword_param])
+                condition = full_text_condition('log_monitoring', keyword)
+                if condition:
+                    query += f" AND {condition[0]}"
+                    params.extend(condition[1])
+                else:
+                    query += " AND (operation LIKE ? OR operator LIKE ? OR error_info LIKE ? OR exception_info LIKE ?)"
+                    params.extend([f"%{keyword}%"] * 4)
                 
-            if log_type == "运行日志":
-                query += " AND operation LIKE '%运行%'"
-            elif log_type == "操作日志":
-                query += " AND operation NOT LIKE '%运行%'"
+            if log_type in LogMonitoringModel.LOG_TYPES:
+                query += " AND log_type = ?"
+                params.append(LogMonitoringModel.LOG_TYPES[log_type])
                 
             if is_done is not None:
                 query += " AND is_done = ?"
                 params.append(is_done)
+            
+            if start_date:
+                query += " AND create_time >= ?"
+                params.append(start_date)
+            if end_date:
+                if len(end_date) == 10:
+                    # A bare date includes the whole day (create_time carries a time)
+                    query += " AND create_time < ?"
+                    params.append((date.fromisoformat(end_date) + timedelta(days=1)).isoformat())
+                else:
+                    query += " AND create_time <= ?"
+                    params.append(end_date)
+            
+            if before:
+                query += " AND (create_time, id) < (?, ?)"
+                params.extend(before)
                 
-            query += " ORDER BY create_time DESC"
+            query += " ORDER BY create_time DESC, id DESC"
+            
+            if limit:
+                query += " LIMIT ?"
+                params.append(limit)
             
-            return execute_query(query, params)
+            return execute_query(query, params, read_target=True)
         except Exception as e:
             logger.error(f"Failed to search logs: {str(e)}")
             return []
+
+    
+    @staticmethod
+    def full_text_search(keyword, limit=50, offset=0):
+        """Logs matching keyword, best match first, one page at a time"""
+        try:
+            rows = ranked_search('log_monitoring', LogMonitoringModel.COLUMNS, keyword, limit, offset)
+            if rows is None:
+                # Keyword too short for the index: unranked, newest first
+                rows = execute_query(f"""
+                    SELECT {', '.join(LogMonitoringModel.COLUMNS)}
+                    FROM log_monitoring
+                    WHERE operation LIKE ? OR operator LIKE ? OR error_info LIKE ? OR exception_info LIKE ?
+                    ORDER BY create_time DESC, id DESC
+                    LIMIT ? OFFSET ?
+                """, [f"%{keyword}%"] * 4 + [limit, offset], read_target=True)
+            return rows
+        except Exception as e:
+            logger.error(f"Failed to search logs: {str(e)}")
+            return []
+    
+    @staticmethod
+    def get_max_log_id():
+        """Get the highest log row id (0 when there are no logs)"""
+        try:
+            result = execute_query("SELECT MAX(id) FROM log_monitoring", read_target=True)
+            return (result[0][0] or 0) if result else 0
+        except Exception as e:
+            logger.error(f"Failed to get max log id: {str(e)}")
+            return 0
+    
+    @staticmethod
+    def get_logs_after(last_id, limit=500, warnings_only=False):
+        """Get logs with a row id above last_id, oldest first (a primary key range scan)
+        
+        Reads the read target: replica lag only delays rows, since the next
+        poll picks up everything above the last id it returned.
+        """
+        try:
+            query = """
+                SELECT id, log_id, operator, operation, error_info, exception_info,
+                       is_warning, is_done, warning_type, create_time
+                FROM log_monitoring
+                WHERE id > ?
+            """
+            if warnings_only:
+                query += " AND is_warning = 1"
+            query += " ORDER BY id LIMIT ?"
+            return execute_query(query, (last_id, limit), read_target=True)
+        except Exception as e:
+            logger.error(f"Failed to get new logs: {str(e)}")
+            return []
+
+
+@timed
+class LogRollupModel:
+    """Log counts pre-aggregated into minute, hour and day buckets
+    
+    Metrics (dimension in brackets): logs, warnings [warning_type],
+    errors [operator], warnings_opened and warnings_resolved. add_log and
+    mark_as_done update them in the same transaction as the log row, so
+    dashboards read a few hundred rollup rows instead of scanning
+    log_monitoring.
+    """
+    
+    GRANULARITIES = {
+        'minute': ('%Y-%m-%d %H:%M:00', timedelta(minutes=1)),
+        'hour': ('%Y-%m-%d %H:00:00', timedelta(hours=1)),
+        'day': ('%Y-%m-%d 00:00:00', timedelta(days=1)),
+    }
+    
+    UPSERT = """
+        INSERT INTO log_rollups (granularity, metric, bucket_start, dimension, value)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (granularity, metric, bucket_start, dimension)
+        DO UPDATE SET value = log_rollups.value + excluded.value
+    """
+    
+    @staticmethod
+    def bucket_start(moment, granularity):
+        """Start of the bucket containing moment, as 'YYYY-MM-DD HH:MM:SS'"""
+        return moment.strftime(LogRollupModel.GRANULARITIES[granularity][0])
+    
+    @staticmethod
+    def _increments(counts, moment=None, granularities=None):
+        moment = moment or datetime.now()
+        return [
+            (granularity, metric, LogRollupModel.bucket_start(moment, granularity), dimension, value)
+            for granularity in (granularities or LogRollupModel.GRANULARITIES)
+            for (metric, dimension), value in counts.items()
+        ]
+    
+    @staticmethod
+    def record_log(operator, error_info="", exception_info="", is_warning=0, is_done=0,
+                   warning_type="", moment=None):
+        """Count one new log row in every granularity"""
+        try:
+            counts = {('logs', ''): 1}
+            if is_warning:
+                counts[('warnings', warning_type or '')] = 1
+                if not is_done:
+                    counts[('warnings_opened', '')] = 1
+            if error_info or exception_info:
+                counts[('errors', operator or '')] = 1
+            return execute_many(LogRollupModel.UPSERT, LogRollupModel._increments(counts, moment))
+        except Exception as e:
+            logger.error(f"Failed to update log rollups: {str(e)}")
+            return 0
+    
+    @staticmethod
+    def record_resolved(count, moment=None):
+        """Count warnings marked as done"""
+        try:
+            rows = LogRollupModel._increments({('warnings_resolved', ''): count}, moment)
+            return execute_many(LogRollupModel.UPSERT, rows)
+        except Exception as e:
+            logger.error(f"Failed to update log rollups: {str(e)}")
+            return 0
+    
+    @staticmethod
+    def _buckets(granularity, start, end):
+        step = LogRollupModel.GRANULARITIES[granularity][1]
+        moment = datetime.strptime(LogRollupModel.bucket_start(start, granularity), '%Y-%m-%d %H:%M:%S')
+        buckets = []
+        while moment <= end:
+            buckets.append(moment.strftime('%Y-%m-%d %H:%M:%S'))
+            moment += step
+        return buckets
+    
+    @staticmethod
+    def get_series(metric, granularity, start, end):
+        """Ready-to-plot series of a metric between two datetimes
+        
+        Returns {'buckets': [bucket_start, ...], 'series': {dimension: [value, ...]}}
+        with one value per bucket (0 where nothing was logged).
+        """
+        try:
+            buckets = LogRollupModel._buckets(granularity, start, end)
+            series = {}
+            if buckets:
+                rows = execute_query("""
+                    SELECT bucket_start, dimension, value
+                    FROM log_rollups
+                    WHERE granularity = ? AND metric = ? AND bucket_start >= ? AND bucket_start <= ?
+                """, (granularity, metric, buckets[0], buckets[-1]), read_target=True)
+                position = {bucket: i for i, bucket in enumerate(buckets)}
+                for bucket, dimension, value in rows:
+                    values = series.setdefault(dimension, [0] * len(buckets))
+                    values[position[str(bucket)[:19]]] += value
+            return {'buckets': buckets, 'series': series}
+        except Exception as e:
+            logger.error(f"Failed to get {metric} series: {str(e)}")
+            return {'buckets': [], 'series': {}}
+    
+    @staticmethod
+    def warnings_by_type(start, end, granularity='hour'):
+        """Warnings per bucket, one series per warning_type"""
+        return LogRollupModel.get_series('warnings', granularity, start, end)
+    
+    @staticmethod
+    def errors_by_operator(start, end, granularity='day'):
+        """Errors per bucket, one series per operator"""
+        return LogRollupModel.get_series('errors', granularity, start, end)
+    
+    @staticmethod
+    def pending_backlog(start, end, granularity='hour'):
+        """Unresolved warnings at the end of each bucket
+        
+        Works back from the current backlog by undoing the opened/resolved
+        counts of later buckets, so it only needs the rollups and one count.
+        """
+        try:
+            now = datetime.now()
+            opened = LogRollupModel.get_series('warnings_opened', granularity, start, now)
+            resolved = LogRollupModel.get_series('warnings_resolved', granularity, start, now)
+            buckets = opened['buckets']
+            net = [o - r for o, r in zip(opened['series'].get('', [0] * len(buckets)),
+                                         resolved['series'].get('', [0] * len(buckets)))]
+            backlog = execute_query(
+                "SELECT COUNT(*) FROM log_monitoring WHERE is_done = 0 AND is_warning = 1")[0][0]
+            values = [0] * len(buckets)
+            for i in range(len(buckets) - 1, -1, -1):
+                values[i] = backlog
+                backlog -= net[i]
+            end_bucket = LogRollupModel.bucket_start(end, granularity)
+            keep = [i for i, bucket in enumerate(buckets) if bucket <= end_bucket]
+            return {'buckets': [buckets[i] for i in keep], 'series': {'': [values[i] for i in keep]}}
+        except Exception as e:
+            logger.error(f"Failed to get pending backlog: {str(e)}")
+            return {'buckets': [], 'series': {}}
+    
+    @staticmethod
+    def backfill():
+        """Build day rollups for logs written before rollups were recorded
+        
+        Days before the first recorded bucket are filled in full. The first
+        day itself gets only what its live rollups are missing (logs written
+        that day before rollups were recorded), so running it again is
+        harmless. create_time has no time of day, so history gets day
+        buckets only, and warnings already done are counted as resolved on
+        the day they were raised. Returns the number of log rows counted.
+        """
+        try:
+            first = execute_query("SELECT MIN(bucket_start) FROM log_rollups WHERE granularity = 'day'")[0][0]
+            where, params, recorded = "", (), {}
+            if first:
+                first_day = str(first)[:10]
+                where, params = " WHERE create_time <= ?", (first_day,)
+                recorded = {
+                    (metric, f"{first_day} 00:00:00", dimension): value
+                    for metric, dimension, value in execute_query(
+                        "SELECT metric, dimension, value FROM log_rollups "
+                        "WHERE granularity = 'day' AND bucket_start = ?", (str(first),))
+                }
+            rows = execute_query(f"""
+                SELECT create_time, operator, warning_type, is_warning, is_done,
+                       CASE WHEN COALESCE(error_info, '') <> '' OR COALESCE(exception_info, '') <> ''
+                            THEN 1 ELSE 0 END,
+                       COUNT(*)
+                FROM log_monitoring{where}
+                GROUP BY create_time, operator, warning_type, is_warning, is_done, 6
+            """, params)
+            
+            counts = {}
+            for create_time, operator, warning_type, is_warning, is_done, is_error, count in rows:
+                day = f"{str(create_time)[:10]} 00:00:00"
+                keys = [('logs', '')]
+                if is_warning:
+                    keys += [('warnings', warning_type or ''), ('warnings_opened', '')]
+                    if is_done:
+                        keys.append(('warnings_resolved', ''))
+                if is_error:
+                    keys.append(('errors', operator or ''))
+                for metric, dimension in keys:
+                    counts[(metric, day, dimension)] = counts.get((metric, day, dimension), 0) + count
+            
+            missing = {key: value - recorded.get(key, 0) for key, value in counts.items()}
+            missing = {key: value for key, value in missing.items() if value > 0}
+            total = sum(value for (metric, _, _), value in missing.items() if metric == 'logs')
+            execute_many(LogRollupModel.UPSERT, [
+                ('day', metric, day, dimension, value)
+                for (metric, day, dimension), value in missing.items()
+            ])
+            logger.info(f"Backfilled log rollups from {total} log rows")
+            return total
+        except Exception as e:
+            logger.error(f"Failed to backfill log rollups: {str(e)}")
+            return 0
+    
+    @staticmethod
+    def prune(granularity, before):
+        """Delete rollup buckets of one granularity that start before a datetime"""
+        try:
+            return execute_update(
+                "DELETE FROM log_rollups WHERE granularity = ? AND bucket_start < ?",
+                (granularity, LogRollupModel.bucket_start(before, granularity))
+            )
+        except Exception as e:
+            logger.error(f"Failed to prune log rollups: {str(e)}")
+            return 0
+
+
+@timed
+class DriftSnapshotModel:
+    @staticmethod
+    def add_snapshots(rows):
+        """Insert histogram snapshots
+        
+        rows: (feature, window_start, is_baseline, samples, counts_json) tuples
+        """
+        try:
+            query = """
+                INSERT INTO drift_snapshots (feature, window_start, is_baseline, samples, counts)
+                VALUES (?, ?, ?, ?, ?)
+            """
+            return execute_many(query, rows)
+        except Exception as e:
+            logger.error(f"Failed to add drift snapshots: {str(e)}")
+            return 0
+    
+    @staticmethod
+    def get_window_snapshots(since):
+        """Get (feature, samples, counts_json) of live windows starting at or after since"""
+        try:
+            query = """
+                SELECT feature, samples, counts
+                FROM drift_snapshots
+                WHERE is_baseline = 0 AND window_start >= ?
+            """
+            return execute_query(query, (since,), read_target=True)
+        except Exception as e:
+            logger.error(f"Failed to get drift snapshots: {str(e)}")
+            return []
+    
+    @staticmethod
+    def get_baseline():
+        """Get (feature, samples, counts_json) of the stored baseline"""
+        try:
+            query = """
+                SELECT feature, samples, counts
+                FROM drift_snapshots
+                WHERE is_baseline = 1
+            """
+            return execute_query(query, cache=True, read_target=True)
+        except Exception as e:
+            logger.error(f"Failed to get drift baseline: {str(e)}")
+            return []
+    
+    @staticmethod
+    def replace_baseline(rows):
+        """Replace the stored baseline with (feature, samples, counts_json) rows"""
+        try:
+            with unit_of_work() as uow:
+                execute_update("DELETE FROM drift_snapshots WHERE is_baseline = 1")
+                execute_many("""
+                    INSERT INTO drift_snapshots (feature, window_start, is_baseline, samples, counts)
+                    VALUES (?, 0, 1, ?, ?)
+                """, rows)
+            return uow.joined or uow.committed
+        except Exception as e:
+            logger.error(f"Failed to replace drift baseline: {str(e)}")
+            return False
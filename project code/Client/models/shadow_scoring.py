@@ -0,0 +1,188 @@
+"""
+Shadow scoring of challenger models on live traffic
+
+Applications scored by the production (champion) model are handed to a
+bounded thread pool that scores them again with every challenger, i.e. a
+model of the same name in SHADOW_MODEL_ENVIRONMENT that is not rolled back.
+Results are buffered and written to shadow_scores in batches. The request
+path only pays for a non-blocking submit: when the pool is saturated the
+work is dropped and counted instead of queued. A daemon thread writes
+buffered results once they are SHADOW_FLUSH_INTERVAL seconds old, so light
+traffic does not leave them waiting for the next batch.
+"""
+import atexit
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from Client.models import model_serving
+from Client.models.model_management_model import ModelManagementModel, ShadowScoreModel
+
+try:
+    from config.settings import current_config
+except ImportError:
+    # Fallback for when config is not available
+    class MockConfig:
+        SHADOW_SCORING_ENABLED = False
+        SHADOW_MODEL_ENVIRONMENT = 'testing'
+        SHADOW_WORKERS = 2
+        SHADOW_MAX_PENDING = 100
+        SHADOW_WRITE_BATCH_SIZE = 200
+        SHADOW_FLUSH_INTERVAL = 5.0
+    current_config = MockConfig()
+
+logger = logging.getLogger('shadow_scoring')
+
+SHADOW_SCORING_ENABLED = current_config.SHADOW_SCORING_ENABLED
+SHADOW_MODEL_ENVIRONMENT = current_config.SHADOW_MODEL_ENVIRONMENT
+
+
+class ShadowScorer:
+    """Score challengers off the request path and record them next to the champion"""
+
+    def __init__(self, model_name=None, max_workers=None, max_pending=None,
+                 write_batch_size=None, flush_interval=None):
+        self.model_name = model_name
+        self.max_workers = max_workers or current_config.SHADOW_WORKERS
+        self.max_pending = max_pending or current_config.SHADOW_MAX_PENDING
+        self.write_batch_size = write_batch_size or current_config.SHADOW_WRITE_BATCH_SIZE
+        self.flush_interval = (current_config.SHADOW_FLUSH_INTERVAL
+                               if flush_interval is None else flush_interval)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix='shadow-scoring')
+        # Running plus queued batches; submit() never waits for a slot
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._buffer_started = None
+        self._flusher = None
+        self._closed = threading.Event()
+        self.submitted = 0
+        self.dropped = 0
+        self.scored = 0
+        self.written = 0
+        self.failed = 0
+
+    def submit(self, applicants, champion_scores):
+        """Queue a scored batch for shadow scoring; returns False if it was dropped"""
+        model_name = self.model_name or model_serving.SCORING_MODEL_NAME
+        pairs = [(a, s) for a, s in zip(applicants, champion_scores) if s is not None]
+        if not pairs or not model_name:
+            return False
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.dropped += len(pairs)
+            return False
+        try:
+            self._executor.submit(self._run, model_name, pairs)
+        except RuntimeError:
+            # Executor already shut down
+            self._slots.release()
+            with self._lock:
+                self.dropped += len(pairs)
+            return False
+        with self._lock:
+            self.submitted += len(pairs)
+        return True
+
+    def _run(self, model_name, pairs):
+        try:
+            champion = model_serving.get_model_cache().find_serving(model_name)
+            challengers = ModelManagementModel.get_challenger_models(model_name, SHADOW_MODEL_ENVIRONMENT)
+            if champion is None or not challengers:
+                return
+            applicants = [a for a, _ in pairs]
+            features = model_serving.feature_matrix(applicants)
+            rows = []
+            for challenger in challengers:
+                model = model_serving.get_model_cache().load(challenger)
+                if model is None:
+                    continue
+                probabilities = model_serving.predict_default_probability(model, features)
+                for (applicant, champion_score), p in zip(pairs, probabilities):
+                    rows.append((
+                        model_name, str(champion[2]), challenger[0], str(challenger[2]),
+                        str(applicant.get('id', '')), champion_score, round((1.0 - p) * 100, 2)
+                    ))
+            self._buffer_rows(rows)
+        except Exception as e:
+            with self._lock:
+                self.failed += len(pairs)
+            logger.error(f"Shadow scoring failed: {str(e)}")
+        finally:
+            self._slots.release()
+
+    def _buffer_rows(self, rows):
+        with self._lock:
+            self.scored += len(rows)
+            if rows and not self._buffer:
+                self._buffer_started = time.monotonic()
+            self._buffer.extend(rows)
+            due = (len(self._buffer) >= self.write_batch_size or
+                   (self._buffer and time.monotonic() - self._buffer_started >= self.flush_interval))
+            if self._buffer and self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name='shadow-flush', daemon=True)
+                self._flusher.start()
+        if due:
+            self.flush()
+
+    def _flush_loop(self):
+        """Write buffered results once the oldest has waited flush_interval"""
+        while True:
+            with self._lock:
+                started = self._buffer_started if self._buffer else None
+            wait = self.flush_interval if started is None else started + self.flush_interval - time.monotonic()
+            if self._closed.wait(max(wait, 0.01)):
+                return
+            with self._lock:
+                due = self._buffer and time.monotonic() - self._buffer_started >= self.flush_interval
+            if due:
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.error(f"Shadow score flush failed: {str(e)}")
+
+    def flush(self):
+        """Write buffered results with one batched insert"""
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+        if not rows:
+            return 0
+        written = ShadowScoreModel.add_scores(rows)
+        with self._lock:
+            self.written += max(written, 0)
+        return written
+
+    def close(self):
+        """Finish queued shadow work and write what is buffered"""
+        self._executor.shutdown(wait=True)
+        self._closed.set()
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'submitted': self.submitted,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'scored': self.scored,
+                'written': self.written,
+                'buffered': len(self._buffer),
+            }
+
+
+SHADOW_SCORER = ShadowScorer()
+atexit.register(SHADOW_SCORER.close)
+
+
+def get_shadow_scorer():
+    """Get the process-wide shadow scorer"""
+    return SHADOW_SCORER
+
+
+def shadow_score(applicants, champion_scores):
+    """Submit production-scored applications for shadow scoring when it is enabled"""
+    if not SHADOW_SCORING_ENABLED:
+        return False
+    return SHADOW_SCORER.submit(applicants, champion_scores)
@@ -1,95 +1,114 @@
 import sqlite3
-from Client.models.database import get_connection
+from Client.models.database import execute_query, execute_update, execute_many
+from Client.utils.logger import timed
+from Client.utils.security import PasswordManager
 
+@timed
 class UserModel:
     @staticmethod
     def authenticate(username, password):
-        """Authenticate a user and return their admin status."""
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT is_admin FROM users WHERE username = ? AND password = ?",
-                      (username, password))
-        result = cursor.fetchone()
-        conn.close()
+        """Authenticate a user and return their admin status.
         
-        if result is None:
+        Plaintext and outdated hashes are still accepted; after a successful
+        check they are queued to be hashed again in the background.
+        """
+        credentials = UserModel.get_credentials(username)
+        if credentials is None:
             return None
-        return bool(result[0])
+        is_admin, stored = credentials
+        if not PasswordManager.verify_password(password, stored, allow_plaintext=True):
+            return None
+        
+        UserModel.upgrade_password(username, password, stored)
+        return bool(is_admin)
+    
+    @staticmethod
+    def get_credentials(username):
+        """(is_admin, stored password) of a user, or None if there is no such user."""
+        results = execute_query("SELECT is_admin, password FROM users WHERE username = ?",
+                                (username,), read_your_writes=True)
+        if not results or results[0][1] is None:
+            return None
+        return results[0]
+    
+    @staticmethod
+    def upgrade_password(username, password, stored):
+        """Queue a verified password for rehashing if its stored format is outdated."""
+        if PasswordManager.needs_rehash(stored):
+            from Client.models.password_migration import get_password_rehasher
+            get_password_rehasher().submit(username, password, stored)
+    
+    @staticmethod
+    def get_password_rows():
+        """(id, password) of every user, for offline migration."""
+        return execute_query("SELECT id, password FROM users", read_your_writes=True)
+    
+    @staticmethod
+    def replace_password_hash(username, old_value, new_hash):
+        """Store a new hash if the row still holds old_value; returns whether it did."""
+        return execute_update("UPDATE users SET password = ? WHERE username = ? AND password = ?",
+                              (new_hash, username, old_value)) > 0
+    
+    @staticmethod
+    def replace_password_hashes(rows):
+        """Batch of (new_hash, user_id, old_value); returns how many rows were updated."""
+        return execute_many("UPDATE users SET password = ? WHERE id = ? AND password = ?", rows)
     
     @staticmethod
     def get_user_info(username):
         """Get user information by username."""
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT full_name, email, phone FROM users WHERE username = ?",
-                      (username,))
-        result = cursor.fetchone()
-        conn.close()
-        return result
+        results = execute_query("SELECT full_name, email, phone FROM users WHERE username = ?",
+                                (username,), read_target=True)
+        return results[0] if results else None
     
     @staticmethod
     def get_all_users():
         """Get all users from the database."""
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, username, is_admin, full_name, email, phone FROM users")
-        users = cursor.fetchall()
-        conn.close()
-        return users
+        return execute_query("SELECT id, username, is_admin, full_name, email, phone FROM users",
+                             read_target=True)
     
     @staticmethod
-    def add_user(username, password, is_admin, full_name, email, phone):
-        """Add a new user to the database."""
-        conn = get_connection()
-        cursor = conn.cursor()
+    def add_user(username, password_hash, is_admin, full_name, email, phone):
+        """Add a new user to the database.
+        
+        password_hash comes from PasswordManager.hash_password; callers hash
+        on the password pool so the GUI thread never runs bcrypt.
+        """
         try:
-            cursor.execute(
+            execute_update(
                 "INSERT INTO users (username, password, is_admin, full_name, email, phone) VALUES (?, ?, ?, ?, ?, ?)",
-                (username, password, is_admin, full_name, email, phone)
+                (username, password_hash, is_admin, full_name, email, phone)
             )
-            conn.commit()
             success = True
         except sqlite3.IntegrityError:
             success = False
-        conn.close()
         return success
     
     @staticmethod
-    def update_user(user_id, username, password, is_admin, full_name, email, phone):
-        """Update user information."""
-        conn = get_connection()
-        cursor = conn.cursor()
-        
+    def update_user(user_id, username, password_hash, is_admin, full_name, email, phone):
+        """Update user information (the password only when password_hash is given)."""
         # Get original username for logging
-        cursor.execute("SELECT username FROM users WHERE id = ?", (user_id,))
-        old_username = cursor.fetchone()[0]
+        old_username = execute_query("SELECT username FROM users WHERE id = ?", (user_id,))[0][0]
         
         try:
-            if password:
-                cursor.execute(
+            if password_hash:
+                execute_update(
                     "UPDATE users SET username = ?, password = ?, is_admin = ?, full_name = ?, email = ?, phone = ? WHERE id = ?",
-                    (username, password, is_admin, full_name, email, phone, user_id)
+                    (username, password_hash, is_admin, full_name, email, phone, user_id)
                 )
             else:
-                cursor.execute(
+                execute_update(
                     "UPDATE users SET username = ?, is_admin = ?, full_name = ?, email = ?, phone = ? WHERE id = ?",
                     (username, is_admin, full_name, email, phone, user_id)
                 )
-            conn.commit()
             success = True
         except sqlite3.IntegrityError:
             success = False
-        conn.close()
         return success, old_username
     
     @staticmethod
     def delete_user(user_id):
         """Delete a user from the database."""
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT username FROM users WHERE id = ?", (user_id,))
-        username = cursor.fetchone()[0]
-        cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
-        conn.commit()
-        conn.close()
+        username = execute_query("SELECT username FROM users WHERE id = ?", (user_id,))[0][0]
+        execute_update("DELETE FROM users WHERE id = ?", (user_id,))
         return username
\ No newline at end of file
@@ -0,0 +1,531 @@
+"""
+In-process metrics with Prometheus text exposition
+
+Counters, gauges and fixed-bucket histograms live in one process-wide
+registry. Recording a sample is a dict update under the metric's own lock,
+so instrumenting a hot path costs about a microsecond. The registry is
+rendered in the Prometheus text format to a file (for the node exporter
+textfile collector) or served on /metrics by API mode.
+
+Pre-forked workers each write a JSON snapshot of their registry to
+METRICS_MULTIPROC_DIR (metrics_<pid>.json, replaced atomically); collect()
+merges every snapshot in the directory, so any one process can expose the
+totals. A forked child starts from zero instead of re-counting its
+parent's samples.
+"""
+import atexit
+import bisect
+import glob
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    from config.settings import current_config
+except ImportError:
+    # Fallback for when config is not available
+    class MockConfig:
+        METRICS_MULTIPROC_DIR = ''
+        METRICS_TEXTFILE = ''
+        METRICS_FLUSH_INTERVAL = 10.0
+    current_config = MockConfig()
+
+logger = logging.getLogger('metrics')
+
+# Upper bounds in seconds; an implicit +Inf bucket follows the last one
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class _Metric:
+    """Samples of one metric keyed by label values"""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        self._children = {}
+
+    def labels(self, *values):
+        """Bound child for one label combination; cache it on hot paths"""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            child = self._children.setdefault(key, self._child_class(self, key))
+        return child
+
+    def _check_unlabelled(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name} needs labels {self.labelnames}")
+
+    def _reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def snapshot(self):
+        with self._lock:
+            samples = [[list(key), value] for key, value in self._values.items()]
+        return {'type': self.kind, 'help': self.documentation,
+                'labelnames': list(self.labelnames), 'samples': samples}
+
+
+class _Child:
+    __slots__ = ('_metric', '_key')
+
+    def __init__(self, metric, key):
+        self._metric = metric
+        self._key = key
+
+
+class _CounterChild(_Child):
+    __slots__ = ()
+
+    def inc(self, amount=1):
+        self._metric._inc(self._key, amount)
+
+
+class Counter(_Metric):
+    """Monotonically increasing total; names end in _total by convention"""
+
+    kind = 'counter'
+    _child_class = _CounterChild
+
+    def _inc(self, key, amount):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def inc(self, amount=1):
+        self._check_unlabelled()
+        self._inc((), amount)
+
+
+class _GaugeChild(_Child):
+    __slots__ = ()
+
+    def inc(self, amount=1):
+        self._metric._add(self._key, amount)
+
+    def dec(self, amount=1):
+        self._metric._add(self._key, -amount)
+
+    def set(self, value):
+        self._metric._set(self._key, value)
+
+
+class Gauge(_Metric):
+    """Value that goes up and down
+
+    multiprocess_mode decides how the values of several processes are
+    merged: 'sum' (e.g. connections held) or 'max'. Gauges of processes
+    that have exited are left out.
+    """
+
+    kind = 'gauge'
+    _child_class = _GaugeChild
+
+    def __init__(self, name, documentation, labelnames=(), multiprocess_mode='sum'):
+        super().__init__(name, documentation, labelnames)
+        if multiprocess_mode not in ('sum', 'max'):
+            raise ValueError(f"Unknown multiprocess_mode: {multiprocess_mode}")
+        self.multiprocess_mode = multiprocess_mode
+
+    def _add(self, key, amount):
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _set(self, key, value):
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1):
+        self._check_unlabelled()
+        self._add((), amount)
+
+    def dec(self, amount=1):
+        self._check_unlabelled()
+        self._add((), -amount)
+
+    def set(self, value):
+        self._check_unlabelled()
+        self._set((), value)
+
+    def snapshot(self):
+        snapshot = super().snapshot()
+        snapshot['mode'] = self.multiprocess_mode
+        return snapshot
+
+
+class _HistogramChild(_Child):
+    __slots__ = ()
+
+    def observe(self, value):
+        self._metric._observe(self._key, value)
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._metric._observe(self._key, time.perf_counter() - started)
+
+
+class Histogram(_Metric):
+    """Counts of observations per fixed bucket, plus their sum
+
+    Buckets are stored non-cumulatively ([per-bucket counts..., +Inf, sum])
+    and only summed up when rendered, so observe() is one bisect and two
+    additions.
+    """
+
+    kind = 'histogram'
+    _child_class = _HistogramChild
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+
+    def _observe(self, key, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[index] += 1
+            counts[-1] += value
+
+    def observe(self, value):
+        self._check_unlabelled()
+        self._observe((), value)
+
+    @contextmanager
+    def time(self):
+        self._check_unlabelled()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._observe((), time.perf_counter() - started)
+
+    def snapshot(self):
+        with self._lock:
+            samples = [[list(key), list(counts)] for key, counts in self._values.items()]
+        return {'type': self.kind, 'help': self.documentation,
+                'labelnames': list(self.labelnames), 'buckets': list(self.buckets),
+                'samples': samples}
+
+
+class MetricsRegistry:
+    """Named metrics of one process
+
+    counter(), gauge() and histogram() return the existing metric when the
+    name is already registered, so modules can declare what they record at
+    import time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _register(self, cls, name, documentation, labelnames, **options):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **options)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} is already registered as a different metric")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=(), multiprocess_mode='sum'):
+        return self._register(Gauge, name, documentation, labelnames,
+                              multiprocess_mode=multiprocess_mode)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def reset(self):
+        """Zero every metric"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric._reset()
+
+    def _after_fork(self):
+        # Another thread may have held a lock at fork time; start over with fresh ones
+        self._lock = threading.Lock()
+        for metric in self._metrics.values():
+            metric._lock = threading.Lock()
+            metric._values = {}
+
+    def snapshot(self):
+        """{name: {'type', 'help', 'labelnames', 'samples', ...}} of this process"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+    def dump(self, directory):
+        """Write this process's snapshot to <directory>/metrics_<pid>.json"""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"metrics_{os.getpid()}.json")
+        _write_atomic(path, json.dumps(self.snapshot()))
+        return path
+
+    def collect(self, directory=None):
+        """Snapshot merged across every process that dumped to directory
+
+        Without a directory (and no METRICS_MULTIPROC_DIR) only this
+        process's metrics are returned.
+        """
+        directory = current_config.METRICS_MULTIPROC_DIR if directory is None else directory
+        if not directory:
+            return self.snapshot()
+        self.dump(directory)
+        return merge_snapshot_files(directory)
+
+    def render(self, directory=None):
+        """Prometheus text exposition of collect()"""
+        return render_text(self.collect(directory))
+
+
+def _write_atomic(path, text):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix='.metrics-')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def merge_snapshots(snapshots):
+    """Merge (pid, snapshot) pairs: counters and histograms add up, gauges follow their mode"""
+    merged = {}
+    for pid, snapshot in snapshots:
+        alive = None
+        for name, metric in snapshot.items():
+            target = merged.get(name)
+            if target is None:
+                target = merged[name] = dict(metric, samples={})
+            elif target['type'] != metric['type']:
+                logger.warning(f"Skipping metric {name} from process {pid}: type {metric['type']}")
+                continue
+            if metric['type'] == 'gauge':
+                if alive is None:
+                    alive = pid is None or _pid_alive(pid)
+                if not alive:
+                    continue
+            samples = target['samples']
+            for labels, value in metric['samples']:
+                key = tuple(labels)
+                current = samples.get(key)
+                if current is None:
+                    samples[key] = list(value) if isinstance(value, list) else value
+                elif metric['type'] == 'histogram':
+                    if len(current) != len(value):
+                        logger.warning(f"Skipping {name} from process {pid}: bucket layout differs")
+                        continue
+                    for i, v in enumerate(value):
+                        current[i] += v
+                elif metric['type'] == 'gauge' and metric.get('mode') == 'max':
+                    samples[key] = max(current, value)
+                else:
+                    samples[key] = current + value
+    for metric in merged.values():
+        metric['samples'] = [[list(key), value] for key, value in metric['samples'].items()]
+    return merged
+
+
+def merge_snapshot_files(directory):
+    """Merge every metrics_<pid>.json in directory"""
+    snapshots = []
+    for path in sorted(glob.glob(os.path.join(directory, 'metrics_*.json'))):
+        try:
+            pid = int(os.path.basename(path)[len('metrics_'):-len('.json')])
+            with open(path, encoding='utf-8') as f:
+                snapshots.append((pid, json.load(f)))
+        except (ValueError, OSError) as e:
+            logger.warning(f"Skipping unreadable metrics file {path}: {e}")
+    return merge_snapshots(snapshots)
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        if value != value:
+            return 'NaN'
+        if value in (float('inf'), float('-inf')):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(value)
+
+
+def render_text(snapshot):
+    """Prometheus text format (version 0.0.4) for a snapshot or collect() result"""
+    lines = []
+    for name in sorted(snapshot):
+        metric = snapshot[name]
+        doc = metric['help'].replace('\\', r'\\').replace('\n', r'\n')
+        lines.append(f"# HELP {name} {doc}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        labelnames = metric['labelnames']
+        for labels, value in sorted(metric['samples'], key=lambda sample: sample[0]):
+            if metric['type'] != 'histogram':
+                lines.append(f"{name}{_format_labels(labelnames, labels)} {_format_value(value)}")
+                continue
+            cumulative = 0
+            bounds = [_format_value(float(b)) for b in metric['buckets']] + ['+Inf']
+            for bound, count in zip(bounds, value[:-1]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labelnames, labels, ('le', bound))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labelnames, labels)} {_format_value(value[-1])}")
+            lines.append(f"{name}_count{_format_labels(labelnames, labels)} {cumulative}")
+    return '\n'.join(lines) + '\n'
+
+
+def write_textfile(path, registry=None, directory=None):
+    """Write the exposition to path atomically (node exporter textfile collector)"""
+    _write_atomic(path, (registry or REGISTRY).render(directory))
+    return path
+
+
+REGISTRY = MetricsRegistry()
+
+if hasattr(os, 'register_at_fork'):
+    # Samples recorded before a pre-fork belong to the parent's file only
+    os.register_at_fork(after_in_child=REGISTRY._after_fork)
+
+
+def get_registry():
+    """Get the process-wide metrics registry"""
+    return REGISTRY
+
+
+class MetricsFlusher:
+    """Dump the registry to the shared directory and/or a text file every `interval` seconds"""
+
+    def __init__(self, directory=None, textfile=None, interval=None, registry=None):
+        self.directory = current_config.METRICS_MULTIPROC_DIR if directory is None else directory
+        self.textfile = current_config.METRICS_TEXTFILE if textfile is None else textfile
+        self.interval = interval or current_config.METRICS_FLUSH_INTERVAL
+        self.registry = registry or REGISTRY
+        self._stop = threading.Event()
+        self._thread = None
+
+    def flush(self):
+        try:
+            if self.directory:
+                self.registry.dump(self.directory)
+            if self.textfile:
+                write_textfile(self.textfile, self.registry, self.directory)
+        except OSError as e:
+            logger.error(f"Failed to write metrics: {str(e)}")
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='metrics-flush', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+
+def start_metrics_flusher():
+    """Start periodic metric dumps if METRICS_MULTIPROC_DIR or METRICS_TEXTFILE is set"""
+    if not (current_config.METRICS_MULTIPROC_DIR or current_config.METRICS_TEXTFILE):
+        return None
+    flusher = MetricsFlusher()
+    flusher.start()
+    atexit.register(flusher.stop)
+    return flusher
+
+
+HTTP_REQUESTS = REGISTRY.counter('http_requests_total', 'HTTP requests served', ('path', 'status'))
+HTTP_REQUEST_SECONDS = REGISTRY.histogram('http_request_duration_seconds', 'HTTP request latency',
+                                          ('path',))
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Serves the registry on GET /metrics"""
+
+    registry = REGISTRY
+
+    def do_GET(self):
+        started = time.perf_counter()
+        path = self.path.split('?', 1)[0]
+        if path == '/metrics':
+            status, body, content_type = 200, self.registry.render().encode('utf-8'), CONTENT_TYPE
+        else:
+            status, body, content_type = 404, b'Not found\n', 'text/plain; charset=utf-8'
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        label = path if status == 200 else 'other'
+        HTTP_REQUESTS.labels(label, status).inc()
+        HTTP_REQUEST_SECONDS.labels(label).observe(time.perf_counter() - started)
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+def start_http_server(port, host='0.0.0.0', registry=None):
+    """Serve /metrics on a daemon thread; returns the server (call shutdown() to stop)"""
+    handler = MetricsHandler
+    if registry is not None:
+        handler = type('MetricsHandler', (MetricsHandler,), {'registry': registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True)
+    thread.start()
+    logger.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
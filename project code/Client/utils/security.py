@@ -3,8 +3,14 @@ Security utilities for Financial Risk Assessment System
 Provides password hashing, input validation, and session management
 """
 import re
+import asyncio
 import hashlib
+import hmac
+import math
 import secrets
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
 import uuid
@@ -32,6 +38,8 @@ except ImportError:
         SESSION_TIMEOUT = 3600
         MAX_LOGIN_ATTEMPTS = 3
         SECRET_KEY = 'fallback-secret-key'
+        BCRYPT_ROUNDS = 12
+        PASSWORD_HASH_WORKERS = 4
     current_config = MockConfig()
 
 try:
@@ -44,14 +52,36 @@ except ImportError:
     audit_logger = logging.getLogger('audit')
 
 
+_BCRYPT_HASH = re.compile(r'^\$2[aby]\$\d{2}\$[./A-Za-z0-9]{53}$')
+_SALTED_SHA256_HASH = re.compile(r'^[0-9a-f]{64}:[0-9a-f]{64}$')
+_SHA256_HASH = re.compile(r'^[0-9a-f]{64}$')
+
+_password_executor = None
+_password_executor_lock = threading.Lock()
+
+
+def get_password_executor() -> ThreadPoolExecutor:
+    """Get the process-wide thread pool for password hashing
+    
+    bcrypt releases the GIL while it hashes, so PASSWORD_HASH_WORKERS
+    hashes run in parallel and none of them blocks the calling thread.
+    """
+    global _password_executor
+    with _password_executor_lock:
+        if _password_executor is None:
+            _password_executor = ThreadPoolExecutor(max_workers=current_config.PASSWORD_HASH_WORKERS,
+                                                    thread_name_prefix='password-hash')
+        return _password_executor
+
+
 class PasswordManager:
     """Secure password management"""
     
     @staticmethod
-    def hash_password(password: str) -> str:
-        """Hash a password using bcrypt or fallback to sha256"""
+    def hash_password(password: str, rounds: Optional[int] = None) -> str:
+        """Hash a password using bcrypt (BCRYPT_ROUNDS cost) or fallback to sha256"""
         if HAS_BCRYPT:
-            salt = bcrypt.gensalt()
+            salt = bcrypt.gensalt(rounds or current_config.BCRYPT_ROUNDS)
             hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
             return hashed.decode('utf-8')
         else:
@@ -61,25 +91,117 @@ class PasswordManager:
             return f"{salt}:{hashed}"
     
     @staticmethod
-    def verify_password(password: str, hashed: str) -> bool:
-        """Verify a password against its hash"""
+    def hash_format(hashed: str) -> str:
+        """Storage format of a password: 'bcrypt', 'sha256_salted', 'sha256' or 'plaintext'
+        
+        'sha256' is a guess: a legacy plaintext password may also be 64 hex
+        characters, so verify_password(allow_plaintext=True) checks both.
+        """
+        if _BCRYPT_HASH.match(hashed):
+            return 'bcrypt'
+        if _SALTED_SHA256_HASH.match(hashed):
+            return 'sha256_salted'
+        if _SHA256_HASH.match(hashed):
+            return 'sha256'
+        return 'plaintext'
+    
+    @staticmethod
+    def needs_rehash(hashed: str) -> bool:
+        """Whether a stored password should be hashed again with the current settings
+        
+        True for plaintext and bare sha256, for salted sha256 once bcrypt is
+        available, and for bcrypt hashes below BCRYPT_ROUNDS.
+        """
+        hash_format = PasswordManager.hash_format(hashed)
+        if hash_format == 'bcrypt':
+            return HAS_BCRYPT and int(hashed[4:6]) < current_config.BCRYPT_ROUNDS
+        if hash_format == 'sha256_salted':
+            return HAS_BCRYPT
+        return True
+    
+    @staticmethod
+    def verify_password(password: str, hashed: str, allow_plaintext: bool = False) -> bool:
+        """Verify a password against its hash
+        
+        With allow_plaintext, a stored value in no known hash format (or one
+        that only looks like a bare sha256 digest) is also compared as a
+        legacy plaintext password.
+        """
         try:
-            if HAS_BCRYPT and not ':' in hashed:
-                # bcrypt format
+            hash_format = PasswordManager.hash_format(hashed)
+            if hash_format == 'bcrypt':
+                if not HAS_BCRYPT:
+                    logger.error("Password verification error: bcrypt hash stored but bcrypt is not installed")
+                    return False
                 return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
-            else:
-                # Fallback format (salt:hash)
-                if ':' in hashed:
-                    salt, expected_hash = hashed.split(':', 1)
-                    actual_hash = hashlib.sha256((salt + password).encode('utf-8')).hexdigest()
-                    return actual_hash == expected_hash
-                else:
-                    # Simple sha256 for very old passwords
-                    return hashlib.sha256(password.encode('utf-8')).hexdigest() == hashed
+            elif hash_format == 'sha256_salted':
+                salt, expected_hash = hashed.split(':', 1)
+                actual_hash = hashlib.sha256((salt + password).encode('utf-8')).hexdigest()
+                return hmac.compare_digest(actual_hash, expected_hash)
+            elif hash_format == 'sha256':
+                # Simple sha256 for very old passwords
+                if hmac.compare_digest(hashlib.sha256(password.encode('utf-8')).hexdigest(), hashed):
+                    return True
+            if allow_plaintext and hash_format in ('sha256', 'plaintext'):
+                return hmac.compare_digest(password.encode('utf-8'), hashed.encode('utf-8'))
+            return False
         except Exception as e:
             logger.error(f"Password verification error: {e}")
             return False
     
+    @staticmethod
+    def submit_hash_password(password: str) -> Future:
+        """hash_password on the password pool; the Future resolves to the hash"""
+        return get_password_executor().submit(PasswordManager.hash_password, password)
+    
+    @staticmethod
+    def submit_verify_password(password: str, hashed: str) -> Future:
+        """verify_password on the password pool; the Future resolves to the result"""
+        return get_password_executor().submit(PasswordManager.verify_password, password, hashed)
+    
+    @staticmethod
+    async def hash_password_async(password: str) -> str:
+        """Await hash_password without blocking the event loop"""
+        return await asyncio.wrap_future(PasswordManager.submit_hash_password(password))
+    
+    @staticmethod
+    async def verify_password_async(password: str, hashed: str) -> bool:
+        """Await verify_password without blocking the event loop"""
+        return await asyncio.wrap_future(PasswordManager.submit_verify_password(password, hashed))
+    
+    @staticmethod
+    def calibrate_bcrypt_cost(target_ms: float = 250.0, min_cost: int = 10, max_cost: int = 16,
+                              probe_cost: int = 8, verify_ms=None) -> Dict[str, Any]:
+        """Pick the bcrypt cost whose verification takes about target_ms on this machine
+        
+        Each cost step doubles the work, so the cost is extrapolated from a
+        cheap probe, then measured and corrected by one step if it missed.
+        verify_ms(cost) measures one verification; it defaults to timing
+        bcrypt here. Returns {'cost', 'verify_ms', 'target_ms'}.
+        """
+        if verify_ms is None:
+            if not HAS_BCRYPT:
+                raise RuntimeError("bcrypt is required to calibrate the cost factor")
+            password = secrets.token_urlsafe(16).encode('utf-8')
+            
+            def verify_ms(cost):
+                hashed = bcrypt.hashpw(password, bcrypt.gensalt(cost))
+                started = time.perf_counter()
+                bcrypt.checkpw(password, hashed)
+                return (time.perf_counter() - started) * 1000
+        
+        probe_ms = min(verify_ms(probe_cost) for _ in range(3))
+        cost = probe_cost + round(math.log2(target_ms / max(probe_ms, 0.001)))
+        cost = max(min_cost, min(max_cost, cost))
+        measured = verify_ms(cost)
+        if measured > target_ms * 1.5 and cost > min_cost:
+            cost -= 1
+            measured = verify_ms(cost)
+        elif measured < target_ms / 1.5 and cost < max_cost:
+            cost += 1
+            measured = verify_ms(cost)
+        return {'cost': cost, 'verify_ms': measured, 'target_ms': target_ms}
+    
     @staticmethod
     def generate_secure_password(length: int = 16) -> str:
         """Generate a secure random password"""
@@ -424,6 +546,14 @@ def verify_password(password: str, hashed: str) -> bool:
     """Verify a password"""
     return PasswordManager.verify_password(password, hashed)
 
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the password pool"""
+    return await PasswordManager.hash_password_async(password)
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    """Verify a password on the password pool"""
+    return await PasswordManager.verify_password_async(password, hashed)
+
 def validate_input(input_type: str, value: str) -> Dict[str, Any]:
     """Validate input based on type"""
     validators = {
@@ -0,0 +1,260 @@
+"""
+Local request tracing with nested spans
+
+A span is opened with start_span() (or the @traced decorator) and becomes
+the parent of every span opened while it is current; the current span and
+its trace ID live in a ContextVar, so each request, thread or task has its
+own. The first span of a trace decides whether the trace is sampled
+(TRACE_SAMPLE_RATE); unsampled traces and disabled tracing get a shared
+no-op span, and @traced returns functions unwrapped when TRACING_ENABLED
+is off.
+
+Finished spans are appended to TRACE_FILE as complete ("ph": "X") events,
+one JSON object per line after an opening "[". The file loads as is in
+chrome://tracing or Perfetto, which accept an unterminated event array.
+"""
+import atexit
+import contextvars
+import functools
+import json
+import logging
+import os
+import random
+import threading
+import time
+
+try:
+    from config.settings import current_config
+except ImportError:
+    # Fallback for when config is not available
+    class MockConfig:
+        TRACING_ENABLED = False
+        TRACE_SAMPLE_RATE = 1.0
+        TRACE_FILE = 'trace.json'
+    current_config = MockConfig()
+
+logger = logging.getLogger('tracing')
+
+# Read at import: with tracing off, @traced leaves functions unwrapped
+TRACING_ENABLED = current_config.TRACING_ENABLED
+TRACE_SAMPLE_RATE = current_config.TRACE_SAMPLE_RATE
+
+# Longest attribute value written to the trace file (SQL text, mostly)
+MAX_ATTRIBUTE_LENGTH = 500
+
+# perf_counter_ns is monotonic but has no epoch; timestamps are shifted onto wall time
+_EPOCH_OFFSET_NS = time.time_ns() - time.perf_counter_ns()
+
+_current_span = contextvars.ContextVar('trace_span', default=None)
+
+
+class _NoopSpan:
+    """Stand-in when tracing is disabled or the trace is not sampled"""
+
+    __slots__ = ()
+    trace_id = None
+
+    def set(self, key, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _UnsampledRoot(_NoopSpan):
+    """Root of an unsampled trace: marks the context so nested spans are skipped"""
+
+    __slots__ = ('_token',)
+
+    def __enter__(self):
+        self._token = _current_span.set(NOOP_SPAN)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self._token)
+        return False
+
+
+class Span:
+    """One timed operation within a trace"""
+
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_id', 'attributes',
+                 'start_ns', 'end_ns', 'thread_id', '_token')
+
+    def __init__(self, name, parent=None, attributes=None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes = attributes or {}
+        self.start_ns = self.end_ns = None
+        self.thread_id = None
+        self._token = None
+
+    def set(self, key, value):
+        self.attributes[key] = value
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        self.thread_id = threading.get_native_id()
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.perf_counter_ns()
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.attributes['error'] = f"{exc_type.__name__}: {exc}"
+        EXPORTER.export(self)
+        return False
+
+    def to_event(self):
+        """Chrome trace-viewer complete event (timestamps in microseconds)"""
+        args = {'trace_id': self.trace_id, 'span_id': self.span_id}
+        if self.parent_id:
+            args['parent_id'] = self.parent_id
+        for key, value in self.attributes.items():
+            if not isinstance(value, (int, float, bool)) and value is not None:
+                value = str(value)[:MAX_ATTRIBUTE_LENGTH]
+            args[key] = value
+        return {
+            'name': self.name,
+            'cat': self.name.split('.', 1)[0],
+            'ph': 'X',
+            'ts': (self.start_ns + _EPOCH_OFFSET_NS) / 1000,
+            'dur': (self.end_ns - self.start_ns) / 1000,
+            'pid': os.getpid(),
+            'tid': self.thread_id,
+            'args': args,
+        }
+
+
+def start_span(name, **attributes):
+    """Open a span under the current one, or start a trace if there is none
+
+    Example:
+        with start_span('credit_report.export', rows=len(rows)) as span:
+            path = write_report(rows)
+            span.set('path', path)
+    """
+    if not TRACING_ENABLED:
+        return NOOP_SPAN
+    parent = _current_span.get()
+    if parent is NOOP_SPAN:
+        return NOOP_SPAN
+    if parent is None and TRACE_SAMPLE_RATE < 1.0 and random.random() >= TRACE_SAMPLE_RATE:
+        return _UnsampledRoot()
+    return Span(name, parent, attributes)
+
+
+def child_span(name, **attributes):
+    """Like start_span, but only inside an existing trace (never starts one)"""
+    if not TRACING_ENABLED:
+        return NOOP_SPAN
+    parent = _current_span.get()
+    if parent is None or parent is NOOP_SPAN:
+        return NOOP_SPAN
+    return Span(name, parent, attributes)
+
+
+def current_trace_id():
+    """Trace ID of the current span, or None outside a sampled trace"""
+    span = _current_span.get()
+    return span.trace_id if span is not None else None
+
+
+def traced(target=None, *, name=None):
+    """Run every call of the function in a span named after it
+
+    Returns the function itself when TRACING_ENABLED is off.
+    """
+    if target is None:
+        return functools.partial(traced, name=name)
+    if not TRACING_ENABLED:
+        return target
+    name = name or target.__qualname__
+
+    @functools.wraps(target)
+    def wrapper(*args, **kwargs):
+        with start_span(name):
+            return target(*args, **kwargs)
+
+    return wrapper
+
+
+class SpanExporter:
+    """Buffer finished spans and append them to a trace file
+
+    Spans are written when batch_size are buffered, every flush_interval
+    seconds from a daemon thread, and at exit.
+    """
+
+    def __init__(self, path, batch_size=256, flush_interval=1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._buffer = []
+        self._thread = None
+        self.exported = 0
+
+    def export(self, span):
+        with self._lock:
+            self._buffer.append(span)
+            full = len(self._buffer) >= self.batch_size
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='trace-export', daemon=True)
+                self._thread.start()
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Write buffered spans; returns how many were written"""
+        with self._lock:
+            spans, self._buffer = self._buffer, []
+        if not spans:
+            return 0
+        lines = ''.join(json.dumps(span.to_event(), separators=(',', ':')) + ',\n' for span in spans)
+        try:
+            with self._write_lock:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    if f.tell() == 0:
+                        f.write('[\n')
+                    f.write(lines)
+        except OSError as e:
+            logger.error(f"Failed to write trace spans: {str(e)}")
+            return 0
+        self.exported += len(spans)
+        return len(spans)
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+
+EXPORTER = SpanExporter(current_config.TRACE_FILE)
+atexit.register(EXPORTER.flush)
+
+
+def get_span_exporter():
+    """Get the process-wide span exporter"""
+    return EXPORTER
+
+
+def load_trace(path):
+    """Events of a trace file written by SpanExporter"""
+    with open(path, encoding='utf-8') as f:
+        text = f.read().strip().rstrip(',')
+    if not text:
+        return []
+    if not text.endswith(']'):
+        text += ']'
+    return json.loads(text)
@@ -1,15 +1,18 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                             QLineEdit, QPushButton, QRadioButton, QFormLayout,
-                            QGroupBox, QMessageBox)
+                            QGroupBox, QMessageBox, QProgressBar)
 from PyQt5.QtCore import Qt, pyqtSignal
 
 class LoginWindow(QWidget):
     login_success = pyqtSignal(str, bool)
+    # Emitted from the password pool thread; delivered on the GUI thread
+    login_finished = pyqtSignal(str, str, bool, object)
 
     def __init__(self, controller):
         super().__init__()
         self.controller = controller
         self.initUI()
+        self.login_finished.connect(self.on_login_finished)
 
     def initUI(self):
         self.setWindowTitle('User Management System - Login')
@@ -43,9 +46,16 @@ class LoginWindow(QWidget):
         self.login_button = QPushButton('Login')
         self.login_button.clicked.connect(self.login)
 
+        # Busy indicator while the password is checked off the GUI thread
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.hide()
+
         layout.addLayout(form_layout)
         layout.addWidget(role_group)
         layout.addWidget(self.login_button)
+        layout.addWidget(self.progress_bar)
 
         self.setLayout(layout)
 
@@ -58,8 +68,26 @@ class LoginWindow(QWidget):
             QMessageBox.warning(self, 'Warning', 'Username and password cannot be empty!')
             return
 
-        # Use controller to handle login
-        result = self.controller.login(username, password, is_admin)
+        # Check the password on the hashing pool so the window stays responsive
+        self.set_busy(True)
+        future = self.controller.submit_login(username, password, is_admin)
+        future.add_done_callback(lambda f: self.login_finished.emit(username, password, is_admin, f))
+
+    def set_busy(self, busy):
+        for widget in (self.username_input, self.password_input, self.user_radio,
+                       self.admin_radio, self.login_button):
+            widget.setEnabled(not busy)
+        self.login_button.setText('Signing in...' if busy else 'Login')
+        self.progress_bar.setVisible(busy)
+
+    def on_login_finished(self, username, password, is_admin, future):
+        self.set_busy(False)
+        try:
+            credentials, verified = future.result()
+            result = self.controller.finish_login(username, password, is_admin, credentials, verified)
+        except Exception as e:
+            QMessageBox.critical(self, 'Login Failed', f'Login error: {str(e)}')
+            return
         if result:
             self.login_success.emit(username, is_admin)
             self.close()
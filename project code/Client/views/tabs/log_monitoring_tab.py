@@ -3,13 +3,50 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                            QGroupBox, QMessageBox, QTableWidget, QTableWidgetItem,
                            QHeaderView, QComboBox, QSpinBox, QTabWidget, QDialog, QCheckBox, QDialogButtonBox,
                            QTextEdit, QDateEdit)
-from PyQt5.QtCore import Qt, QDate
+from PyQt5.QtCore import Qt, QDate, QThread, QTimer, pyqtSignal
 from PyQt5.QtGui import QColor
+from Client.models.log_tail import LogTailer, LOG_TAIL_MAX_ROWS
+
+class LogTailWorker(QThread):
+    """Run one tail poll off the GUI thread
+    
+    Results carry the tailer they came from, so a poll that finishes after
+    the tail was restarted can be recognised and dropped.
+    """
+    polled = pyqtSignal(object, list)
+    
+    def __init__(self, tailer):
+        super().__init__()
+        self.tailer = tailer
+    
+    def run(self):
+        try:
+            self.polled.emit(self.tailer, self.tailer.poll())
+        except Exception as e:
+            print(f"Error polling new logs: {e}")
+            self.polled.emit(self.tailer, [])
 
 class LogMonitoringTab(QWidget):
+    PAGE_SIZE = 50
+    
+    # LogMonitoringModel row index -> table column
+    MODEL_TO_UI_MAP = {
+        1: 1,  # log_id -> Log ID
+        9: 2,  # create_time -> Create time
+        2: 3,  # operator -> Operator
+        3: 4,  # operation -> Operation
+        4: 5,  # error_info -> Error message
+        5: 6,  # exception_info -> Exception info
+        6: 7,  # is_warning -> Is warning
+        7: 8,  # is_done -> Is processed
+        8: 9,  # warning_type -> Warning type
+    }
+    
     def __init__(self, controller):
         super().__init__()
         self.controller = controller
+        self.tailer = None
+        self.tail_worker = None
         self.initUI()
     
     def initUI(self):
@@ -112,6 +149,13 @@ class LogMonitoringTab(QWidget):
         self.log_type_combo.setFixedWidth(120)
         filter_layout.addWidget(self.log_type_combo)
         
+        # Processing status
+        filter_layout.addWidget(QLabel("Status:"))
+        self.status_combo = QComboBox()
+        self.status_combo.addItems(["Please select", "Unprocessed", "Processed"])
+        self.status_combo.setFixedWidth(110)
+        filter_layout.addWidget(self.status_combo)
+        
         
         # Add checkbox to enable date filter
         self.enable_date_filter = QCheckBox("Enable date filter")
@@ -144,7 +188,7 @@ class LogMonitoringTab(QWidget):
         
         # Search button
         self.search_button = QPushButton("Search")
-        self.search_button.clicked.connect(self.load_logs)
+        self.search_button.clicked.connect(self.search_logs)
         filter_layout.addWidget(self.search_button)
         filter_layout.addStretch()
         
@@ -152,13 +196,21 @@ class LogMonitoringTab(QWidget):
         button_layout = QHBoxLayout()
         
         self.refresh_logs_button = QPushButton("Refresh logs")
-        self.refresh_logs_button.clicked.connect(self.load_logs)
+        self.refresh_logs_button.clicked.connect(self.search_logs)
         
         self.mark_done_button = QPushButton("Mark as processed")
         self.mark_done_button.clicked.connect(self.mark_as_done)
         
+        # Live tail: append new rows as they are written instead of reloading
+        self.live_tail_checkbox = QCheckBox("Live tail")
+        self.live_tail_checkbox.stateChanged.connect(self.toggle_live_tail)
+        self.tail_timer = QTimer(self)
+        self.tail_timer.setSingleShot(True)
+        self.tail_timer.timeout.connect(self.poll_new_logs)
+        
         button_layout.addWidget(self.mark_done_button)
         button_layout.addWidget(self.refresh_logs_button)
+        button_layout.addWidget(self.live_tail_checkbox)
         button_layout.addStretch()
         
         # Status info box
@@ -226,6 +278,16 @@ class LogMonitoringTab(QWidget):
                 btn.setStyleSheet("background-color: white; color: #333; border: 1px solid #ddd;")
             pagination_layout.addWidget(btn)
         
+        self.prev_page_btn.clicked.connect(lambda: self.go_to_page(self.current_page - 1))
+        self.next_page_btn.clicked.connect(lambda: self.go_to_page(self.current_page + 1))
+        for btn in [self.page_1_btn, self.page_2_btn, self.page_3_btn]:
+            btn.clicked.connect(lambda _, b=btn: self.go_to_page(int(b.text())))
+        
+        # Keyset pagination: page_cursors[n] is the (create_time, id) the page n + 1 starts after
+        self.current_page = 1
+        self.page_cursors = [None]
+        self.has_next_page = False
+        
         pagination_layout.addStretch()
         
         # Add all layouts to main layout
@@ -249,204 +311,177 @@ class LogMonitoringTab(QWidget):
         else:
             self.date_filter_widget.setStyleSheet("color: #999999;")
     
+    def search_logs(self):
+        """Apply the current filters, starting again from the first page"""
+        # Tail rows are unfiltered, so a filtered or paged view stops the tail
+        self.live_tail_checkbox.setChecked(False)
+        self.current_page = 1
+        self.page_cursors = [None]
+        self.load_logs()
+    
+    def go_to_page(self, page):
+        """Show a page that has been reached before, or the next one"""
+        if page < 1 or page > len(self.page_cursors) or page == self.current_page:
+            return
+        self.live_tail_checkbox.setChecked(False)
+        self.current_page = page
+        self.load_logs()
+    
     def load_logs(self):
-        """Load log data"""
+        """Load one page of log data; filtering and paging happen in the database
+        
+        Returns the rows shown.
+        """
         self.log_table.setRowCount(0)
         
         # Get filter conditions
-        keyword = self.keyword_input.text()
-        log_type = self.log_type_combo.currentText()
-        use_date_filter = self.enable_date_filter.isChecked()
+        filters = {
+            'keyword': self.keyword_input.text().strip() or None,
+            'log_type': self.log_type_combo.currentText(),
+            'is_done': {"Unprocessed": 0, "Processed": 1}.get(self.status_combo.currentText()),
+        }
         
         # Get date range (only used when date filter is enabled)
-        start_date = None
-        end_date = None
-        
-        if use_date_filter:
-            start_date = self.start_date.date().toString("yyyy-MM-dd")
-            end_date = self.end_date.date().toString("yyyy-MM-dd")
+        if self.enable_date_filter.isChecked():
+            filters['start_date'] = self.start_date.date().toString("yyyy-MM-dd")
+            filters['end_date'] = self.end_date.date().toString("yyyy-MM-dd")
         
-        # Get all logs from LogModel (this is currently the only available method)
         try:
-            if hasattr(self.controller, 'get_all_logs'):
-                logs = self.controller.get_all_logs()
+            # One row more than a page tells whether there is a next page
+            filters['limit'] = self.PAGE_SIZE + 1
+            filters['before'] = self.page_cursors[self.current_page - 1]
+            if hasattr(self.controller, 'search_logs'):
+                logs = self.controller.search_logs(**filters)
             else:
                 # If controller doesn't have this method, try to get directly from model
-                from Client.models.log_model import LogModel
-                logs = LogModel.get_all_logs()
-                
+                from Client.models.risk_control_model import LogMonitoringModel
+                logs = LogMonitoringModel.search_logs(**filters)
+            
+            self.has_next_page = len(logs) > self.PAGE_SIZE
+            logs = logs[:self.PAGE_SIZE]
+            if self.has_next_page and len(self.page_cursors) == self.current_page:
+                last = logs[-1]
+                self.page_cursors.append((last[9], last[0]))
+            self.update_pagination()
+            
             if logs:
-                # Map model returned columns to UI expected structure
-                # LogModel.get_all_logs() returns: [id, timestamp, username, action]
-                
-                # Filter by keyword
-                if keyword:
-                    logs = [log for log in logs if keyword.lower() in str(log).lower()]
-                    
-                # Filter by log type
-                if log_type == "Runtime logs":
-                    # Assume action field is at index 3
-                    logs = [log for log in logs if any(op in str(log[3]).lower() for op in ["run", "start", "login", "system"])]
-                elif log_type == "Operation logs":
-                    logs = [log for log in logs if any(op in str(log[3]).lower() for op in ["modify", "delete", "add", "export"])]
-                
-                # Since model doesn't have is_done field, can't filter by processing status
-                # If really need to filter by this, model needs to be updated to return this field
-                
-                # Filter by date range
-                if use_date_filter:
-                    filtered_logs = []
-                    for log in logs:
-                        # Assume timestamp is at index 1
-                        timestamp_str = str(log[1]) if len(log) > 1 else ""
-                        # Try to extract date part
-                        if " " in timestamp_str:
-                            log_date = timestamp_str.split(" ")[0]
-                        else:
-                            log_date = timestamp_str
-                        
-                        # Only keep logs within range
-                        if start_date <= log_date <= end_date:
-                            filtered_logs.append(log)
-                    logs = filtered_logs
-                    
-                # Only show valid data  
-                if logs and len(logs) > 0:
-                    self.fill_logs_table(logs)
-                    print(f"Loaded {len(logs)} logs")
-                    return
-                else:
-                    print("No matching logs after filtering")
+                self.fill_logs_table(logs)
+                print(f"Loaded {len(logs)} logs (page {self.current_page})")
             else:
-                print("No logs retrieved")
+                print("No matching logs")
+            return logs
                 
         except Exception as e:
             print(f"Error loading logs: {e}")
             import traceback
             traceback.print_exc()
-    def _build_date_range_query(self, start_date, end_date, log_type=None, status=None, keyword=None):
-        """Build SQL query with date range"""
-        # Basic query
-        sql = "SELECT * FROM logs WHERE 1=1"
-        params = []
-        
-        # Add date range condition (if date filter is enabled)
-        if start_date and end_date:
-            sql += " AND create_time >= ? AND create_time < ?"
-            params.extend([start_date, end_date])
-        
-        # Add log type condition
-        if log_type and log_type != "Please select":
-            if log_type == "Runtime logs":
-                sql += " AND (operation LIKE '%run%' OR operation LIKE '%start%' OR operation LIKE '%login%' OR operation LIKE '%system%')"
-            elif log_type == "Operation logs":
-                sql += " AND (operation LIKE '%modify%' OR operation LIKE '%delete%' OR operation LIKE '%add%' OR operation LIKE '%export%')"
-        
-        # Add status condition
-        if status and status != "Please select":
-            if status == "Unprocessed":
-                sql += " AND is_done = 0"
-            elif status == "Processed":
-                sql += " AND is_done = 1"
-        
-        # Add keyword condition
-        if keyword:
-            # Search keyword in multiple fields
-            sql += " AND (log_id LIKE ? OR operator LIKE ? OR operation LIKE ? OR error_info LIKE ? OR exception_info LIKE ? OR warning_type LIKE ?)"
-            keyword_param = f"%{keyword}%"
-            params.extend([keyword_param] * 6)  # Add same parameter for 6 fields
-        
-        # Add sorting
-        sql += " ORDER BY create_time DESC"
-        
-        return {"query": sql, "params": params}
+            return []
     
-    def _filter_logs_by_date(self, logs, start_date, end_date):
-        """Filter logs by date range in memory"""
-        # If date filter is not enabled, return all logs
-        if not start_date or not end_date:
-            return logs
-            
-        filtered_logs = []
-        
-        for log in logs:
-            # Assume date field is at index 9 (according to table column order)
-            try:
-                log_date_str = str(log[2]) if len(log) > 2 else ""
-                # Try to extract date part (assuming format is "YYYY-MM-DD HH:MM:SS")
-                if " " in log_date_str:
-                    log_date = log_date_str.split(" ")[0]
-                else:
-                    log_date = log_date_str
-                
-                # Check if date is within range
-                if start_date <= log_date <= end_date:
-                    filtered_logs.append(log)
-            except Exception as e:
-                print(f"Error filtering date: {e}")
-                # If error occurs, keep this log
-                filtered_logs.append(log)
-        
-        return filtered_logs
+    def update_pagination(self):
+        """Number the page buttons around the current page"""
+        first = max(1, self.current_page - 1)
+        reachable = len(self.page_cursors)
+        for offset, btn in enumerate([self.page_1_btn, self.page_2_btn, self.page_3_btn]):
+            page = first + offset
+            btn.setText(str(page))
+            btn.setEnabled(page <= reachable)
+            if page == self.current_page:
+                btn.setStyleSheet("background-color: #3e89fa; color: white;")
+            else:
+                btn.setStyleSheet("background-color: white; color: #333; border: 1px solid #ddd;")
+        self.prev_page_btn.setEnabled(self.current_page > 1)
+        self.next_page_btn.setEnabled(self.has_next_page)
 
     def fill_logs_table(self, logs):
         """Fill table with actual log data"""
         self.log_table.setRowCount(0)  # Clear existing rows
         
-        column_count = self.log_table.columnCount()
-        
-        # Define mapping - from model columns to UI columns
-        # LogModel returns: [id, timestamp, username, action]
+        # LogMonitoringModel returns: [id, log_id, operator, operation, error_info,
+        #         exception_info, is_warning, is_done, warning_type, create_time]
         # UI shows: ["", "Log ID", "Create time", "Operator", "Operation", "Error message", 
         #         "Exception info", "Is warning", "Is processed", "Warning type"]
         
-        model_to_ui_map = {
-            0: 1,  # id -> Log ID
-            1: 2,  # timestamp -> Create time
-            2: 3,  # username -> Operator
-            3: 4,  # action -> Operation
-        }
-        
         for row_num, log in enumerate(logs):
             self.log_table.insertRow(row_num)
-            
-            # Add checkbox column
-            checkbox = QTableWidgetItem()
-            checkbox.setFlags(Qt.ItemIsUserCheckable | Qt.ItemIsEnabled)
-            checkbox.setCheckState(Qt.Unchecked)
-            self.log_table.setItem(row_num, 0, checkbox)
-            
-            # Safe get function
-            def safe_get(log, index, default=""):
-                try:
-                    if index < len(log):
-                        return log[index]
-                    return default
-                except:
-                    return default
-            
-            # Fill data columns
-            for model_col, ui_col in model_to_ui_map.items():
-                cell_data = safe_get(log, model_col)
-                item = QTableWidgetItem(str(cell_data))
-                item.setTextAlignment(Qt.AlignCenter)
-                self.log_table.setItem(row_num, ui_col, item)
-            
-            # Fill blank columns since model doesn't have this data
-            for col in range(5, column_count):
-                if col == 7:  # Is warning - default shows "No"
-                    item = QTableWidgetItem("No")
-                    item.setBackground(QColor(248, 248, 248))
-                    item.setForeground(QColor(108, 117, 125))
-                elif col == 8:  # Is processed - default shows "No"
-                    item = QTableWidgetItem("No")
+            self._set_log_row(row_num, log)
+    
+    def _set_log_row(self, row_num, log):
+        """Fill one table row from a LogMonitoringModel row"""
+        # Add checkbox column
+        checkbox = QTableWidgetItem()
+        checkbox.setFlags(Qt.ItemIsUserCheckable | Qt.ItemIsEnabled)
+        checkbox.setCheckState(Qt.Unchecked)
+        self.log_table.setItem(row_num, 0, checkbox)
+        
+        # Fill data columns
+        for model_col, ui_col in self.MODEL_TO_UI_MAP.items():
+            cell_data = log[model_col]
+            if ui_col in (7, 8):
+                item = QTableWidgetItem("Yes" if cell_data else "No")
+                if cell_data:
+                    item.setBackground(QColor(240, 255, 240))
+                    item.setForeground(QColor(40, 167, 69))
+                else:
                     item.setBackground(QColor(248, 248, 248))
                     item.setForeground(QColor(108, 117, 125))
-                else:
-                    item = QTableWidgetItem("")
-                
-                item.setTextAlignment(Qt.AlignCenter)
-                self.log_table.setItem(row_num, col, item)
+            else:
+                item = QTableWidgetItem("" if cell_data is None else str(cell_data))
+            item.setTextAlignment(Qt.AlignCenter)
+            self.log_table.setItem(row_num, ui_col, item)
+    
+    def clear_filters(self):
+        """Reset every filter control to show all logs"""
+        self.keyword_input.clear()
+        self.log_type_combo.setCurrentIndex(0)
+        self.status_combo.setCurrentIndex(0)
+        self.enable_date_filter.setChecked(False)
+    
+    def toggle_live_tail(self, state):
+        """Start or stop polling for new logs
+        
+        Tail rows are not filtered, so the view is reset to the first,
+        unfiltered page before tailing starts.
+        """
+        if state == Qt.Checked:
+            tailer = LogTailer()
+            self.clear_filters()
+            self.current_page = 1
+            self.page_cursors = [None]
+            logs = self.load_logs()
+            # Rows written while the page loaded are already shown
+            tailer.last_id = max([tailer.last_id] + [log[0] for log in logs])
+            self.tailer = tailer
+            self.tail_timer.start(int(self.tailer.interval * 1000))
+        else:
+            self.tail_timer.stop()
+            self.tailer = None
+    
+    def poll_new_logs(self):
+        """Fetch rows newer than the last one seen on a worker thread"""
+        if self.tailer is None or (self.tail_worker is not None and self.tail_worker.isRunning()):
+            # A poll still in flight re-arms the timer when it returns
+            return
+        self.tail_worker = LogTailWorker(self.tailer)
+        self.tail_worker.polled.connect(self.append_new_logs)
+        self.tail_worker.start()
+    
+    def append_new_logs(self, tailer, logs):
+        """Insert new rows at the top, keeping at most LOG_TAIL_MAX_ROWS"""
+        if self.tailer is None:
+            return
+        if tailer is not self.tailer:
+            # Poll from a tail session that has since been stopped; start this session's first poll
+            self.tail_timer.start(int(self.tailer.interval * 1000))
+            return
+        self.log_table.setUpdatesEnabled(False)
+        for log in logs[-LOG_TAIL_MAX_ROWS:]:
+            self.log_table.insertRow(0)
+            self._set_log_row(0, log)
+        while self.log_table.rowCount() > LOG_TAIL_MAX_ROWS:
+            self.log_table.removeRow(self.log_table.rowCount() - 1)
+        self.log_table.setUpdatesEnabled(True)
+        # Backs off while idle, polls again at once after a full batch
+        self.tail_timer.start(int(self.tailer.interval * 1000))
 
     def on_log_selected(self):
         """Handle log selection event, show details"""
@@ -1,17 +1,39 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                            QLineEdit, QPushButton, QFormLayout, QFrame,
                            QGroupBox, QMessageBox, QTableWidget, QTableWidgetItem,
-                           QHeaderView, QComboBox, QFileDialog)
-from PyQt5.QtCore import Qt
+                           QHeaderView, QComboBox, QFileDialog, QProgressBar)
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from PyQt5.QtGui import QColor, QFont
 import os
 
+class ModelUploadWorker(QThread):
+    """Stream a model file into the artifact store off the GUI thread"""
+    progress = pyqtSignal(int)
+    finished_upload = pyqtSignal(object)
+    
+    def __init__(self, controller, file_path):
+        super().__init__()
+        self.controller = controller
+        self.file_path = file_path
+        self._last_percent = -1
+    
+    def _report(self, written, total):
+        percent = int(written * 100 / total) if total else 100
+        # Emit once per percent, not once per chunk
+        if percent != self._last_percent:
+            self._last_percent = percent
+            self.progress.emit(percent)
+    
+    def run(self):
+        self.finished_upload.emit(self.controller.upload_model_file(self.file_path, self._report))
+
 class ModelManagementTab(QWidget):
     def __init__(self, controller):
         super().__init__()
         self.controller = controller
-        self.model_file_data = None
+        self.model_artifact = None
         self.model_file_name = ""
+        self.upload_worker = None
         self.initUI()
     
     def initUI(self):
@@ -224,7 +246,12 @@ class ModelManagementTab(QWidget):
         self.file_select_button.setObjectName("secondaryButton")
         self.file_select_button.clicked.connect(self.select_model_file)
         
+        self.upload_progress = QProgressBar()
+        self.upload_progress.setRange(0, 100)
+        self.upload_progress.setVisible(False)
+        
         file_layout.addWidget(self.file_path_label)
+        file_layout.addWidget(self.upload_progress)
         file_layout.addWidget(self.file_select_button)
         
         form_layout.addRow("Model File:", file_layout)
@@ -468,17 +495,46 @@ class ModelManagementTab(QWidget):
         file_path, _ = file_dialog.getOpenFileName(self, "Select Model File", "", "All Files (*)")
         
         if file_path:
-            # Read file as binary
-            try:
-                with open(file_path, 'rb') as file:
-                    self.model_file_data = file.read()
-                self.model_file_name = os.path.basename(file_path)
-                self.file_path_label.setText(self.model_file_name)
-            except Exception as e:
-                QMessageBox.warning(self, 'Error', f'Failed to read file: {str(e)}')
-                self.model_file_data = None
-                self.model_file_name = ""
-                self.file_path_label.setText('No file selected')
+            # Stream the file into the artifact store in chunks on a worker thread
+            self.model_artifact = None
+            self.model_file_name = os.path.basename(file_path)
+            self.file_path_label.setText(self.model_file_name)
+            self.upload_progress.setValue(0)
+            self.upload_progress.setVisible(True)
+            self.file_select_button.setEnabled(False)
+            self.add_model_button.setEnabled(False)
+            
+            self.upload_worker = ModelUploadWorker(self.controller, file_path)
+            self.upload_worker.progress.connect(self.upload_progress.setValue)
+            self.upload_worker.finished_upload.connect(self.on_upload_finished)
+            # finished_upload fires inside run(); keep the thread object until run() has returned
+            self.upload_worker.finished.connect(self.release_upload_worker)
+            self.upload_worker.start()
+    
+    def release_upload_worker(self):
+        """Drop the upload thread once it has stopped running"""
+        worker = self.sender()
+        if worker is not None:
+            worker.wait()
+        if self.upload_worker is worker:
+            self.upload_worker = None
+    
+    def on_upload_finished(self, artifact):
+        """Handle the end of a model file upload"""
+        self.upload_progress.setVisible(False)
+        self.file_select_button.setEnabled(True)
+        self.add_model_button.setEnabled(True)
+        
+        if artifact is None:
+            QMessageBox.warning(self, 'Error', f'Failed to read file: {self.model_file_name}')
+            self.model_file_name = ""
+            self.file_path_label.setText('No file selected')
+            return
+        
+        self.model_artifact = artifact
+        self.file_path_label.setText(
+            f"{self.model_file_name} ({artifact.size / (1024 * 1024):.1f} MB, sha256 {artifact.sha256[:12]})"
+        )
     
     def add_model(self):
         """Add new model"""
@@ -491,12 +547,12 @@ class ModelManagementTab(QWidget):
             QMessageBox.warning(self, 'Warning', 'Model name, version, and approver cannot be empty!')
             return
             
-        if not self.model_file_data:
+        if not self.model_artifact:
             QMessageBox.warning(self, 'Warning', 'Please select a model file!')
             return
         
         success = self.controller.add_model(
-            model_name, self.model_file_data, model_version, 
+            model_name, self.model_artifact, model_version, 
             environment, approver
         )
         
@@ -505,7 +561,7 @@ class ModelManagementTab(QWidget):
             self.model_name_input.clear()
             self.model_version_input.clear()
             self.approver_input.clear()
-            self.model_file_data = None
+            self.model_artifact = None
             self.model_file_name = ""
             self.file_path_label.setText('No file selected')
             self.load_models()
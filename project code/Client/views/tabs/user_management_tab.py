@@ -2,14 +2,18 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                            QLineEdit, QPushButton, QFormLayout, QFrame,
                            QGroupBox, QMessageBox, QTableWidget, QTableWidgetItem,
                            QHeaderView, QRadioButton, QButtonGroup, QComboBox)
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QColor, QFont
 
 class UserManagementTab(QWidget):
+    # Emitted from the password pool thread; delivered on the GUI thread
+    password_hashed = pyqtSignal(object, object)
+
     def __init__(self, controller):
         super().__init__()
         self.controller = controller
         self.initUI()
+        self.password_hashed.connect(self.on_password_hashed)
 
     def initUI(self):
         self.setStyleSheet("""
@@ -430,7 +434,12 @@ class UserManagementTab(QWidget):
             QMessageBox.warning(self, 'Warning', 'Username and password cannot be empty!')
             return
 
-        result = self.controller.add_user(username, password, is_admin, full_name, email, phone)
+        self.hash_then(password, lambda password_hash: self.finish_add_user(
+            username, password, is_admin, full_name, email, phone, password_hash))
+
+    def finish_add_user(self, username, password, is_admin, full_name, email, phone, password_hash):
+        result = self.controller.add_user(username, password, is_admin, full_name, email, phone,
+                                          password_hash=password_hash)
         
         if result:
             QMessageBox.information(self, 'Success', 'User added successfully!')
@@ -460,7 +469,12 @@ class UserManagementTab(QWidget):
             QMessageBox.warning(self, 'Warning', 'Username cannot be empty!')
             return
 
-        result = self.controller.update_user(user_id, username, password, is_admin, full_name, email, phone)
+        self.hash_then(password, lambda password_hash: self.finish_update_user(
+            user_id, username, password, is_admin, full_name, email, phone, password_hash))
+
+    def finish_update_user(self, user_id, username, password, is_admin, full_name, email, phone, password_hash):
+        result = self.controller.update_user(user_id, username, password, is_admin, full_name, email, phone,
+                                             password_hash=password_hash)
         
         if result:
             QMessageBox.information(self, 'Success', 'User information updated successfully!')
@@ -473,6 +487,25 @@ class UserManagementTab(QWidget):
         else:
             QMessageBox.warning(self, 'Warning', 'Username already exists!')
 
+    def hash_then(self, password, callback):
+        """Hash password on the password pool, then call callback(password_hash) on the GUI thread"""
+        self.set_busy(True)
+        future = self.controller.submit_password_hash(password)
+        future.add_done_callback(lambda f: self.password_hashed.emit(callback, f))
+
+    def set_busy(self, busy):
+        for button in (self.add_button, self.update_button, self.delete_button):
+            button.setEnabled(not busy)
+
+    def on_password_hashed(self, callback, future):
+        self.set_busy(False)
+        try:
+            password_hash = future.result()
+        except Exception as e:
+            QMessageBox.critical(self, 'Error', f'Password hashing failed: {str(e)}')
+            return
+        callback(password_hash)
+
     def delete_user(self):
         user_id = self.user_id_input.text()
         if not user_id:
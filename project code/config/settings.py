@@ -22,6 +22,8 @@ class Config:
     # Database configuration
     DB_TYPE = os.getenv('DB_TYPE', 'sqlite')  # 'sqlite' or 'postgres'
     DB_NAME = os.getenv('DB_NAME', 'user_management.db')
+    DB_READ_NAME = os.getenv('DB_READ_NAME', '')  # SQLite file for reads ('' = primary)
+    SQLITE_REPLICA_SYNC_DELAY = float(os.getenv('SQLITE_REPLICA_SYNC_DELAY', 0.5))  # Max lag of DB_READ_NAME after a commit
     
     # PostgreSQL configuration (for production)
     PG_HOST = os.getenv('PG_HOST', 'localhost')
@@ -31,10 +33,24 @@ class Config:
     PG_PASSWORD = os.getenv('PG_PASSWORD', 'postgres')
     PG_SSLMODE = os.getenv('PG_SSLMODE', 'prefer')
     
+    # PostgreSQL read replica ('' = read from the primary)
+    PG_READ_HOST = os.getenv('PG_READ_HOST', '')
+    PG_READ_PORT = int(os.getenv('PG_READ_PORT', 5432))
+    
     # Connection pool settings
     MAX_POOL_SIZE = int(os.getenv('MAX_POOL_SIZE', 5))
     POOL_TIMEOUT = int(os.getenv('POOL_TIMEOUT', 30))
     
+    # Query result cache
+    QUERY_CACHE_ENABLED = os.getenv('QUERY_CACHE_ENABLED', 'True').lower() == 'true'
+    QUERY_CACHE_SIZE = int(os.getenv('QUERY_CACHE_SIZE', 256))
+    QUERY_CACHE_TTL = float(os.getenv('QUERY_CACHE_TTL', 30))  # seconds
+    
+    # Statement timing and slow query log
+    QUERY_STATS_ENABLED = os.getenv('QUERY_STATS_ENABLED', 'True').lower() == 'true'
+    SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', 200))
+    QUERY_STATS_FILE = os.getenv('QUERY_STATS_FILE', 'query_stats.json')
+    
     # Window size defaults
     LOGIN_WINDOW_SIZE = (350, 250)
     USER_INFO_WINDOW_SIZE = (600, 500)
@@ -61,12 +77,35 @@ class Config:
     PASSWORD_MIN_LENGTH = int(os.getenv('PASSWORD_MIN_LENGTH', 8))
     SESSION_TIMEOUT = int(os.getenv('SESSION_TIMEOUT', 3600))  # seconds
     MAX_LOGIN_ATTEMPTS = int(os.getenv('MAX_LOGIN_ATTEMPTS', 3))
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))  # bcrypt cost; see the calibrate-bcrypt command
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 4))  # Threads hashing/verifying passwords
+    PASSWORD_REHASH_QUEUE_SIZE = int(os.getenv('PASSWORD_REHASH_QUEUE_SIZE', 1000))  # Logins awaiting a hash upgrade
+    PASSWORD_MIGRATION_WORKERS = int(os.getenv('PASSWORD_MIGRATION_WORKERS', 0))  # 0 = one process per CPU
+    PASSWORD_MIGRATION_BATCH_SIZE = int(os.getenv('PASSWORD_MIGRATION_BATCH_SIZE', 50))
     
     # Logging configuration
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
     LOG_FILE = os.getenv('LOG_FILE', 'financial_risk_system.log')
     LOG_MAX_SIZE = int(os.getenv('LOG_MAX_SIZE', 10485760))  # 10MB
     LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', 5))
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+    LOG_QUEUE_OVERFLOW = os.getenv('LOG_QUEUE_OVERFLOW', 'drop')  # drop or block
+    AUDIT_LOG_FILE = os.getenv('AUDIT_LOG_FILE', 'audit.log')
+    AUDIT_FSYNC_EVERY = int(os.getenv('AUDIT_FSYNC_EVERY', 100))  # records per group commit; 0 = no fsync
+    AUDIT_FSYNC_INTERVAL_MS = int(os.getenv('AUDIT_FSYNC_INTERVAL_MS', 50))
+    AUDIT_HASH_CHAIN = os.getenv('AUDIT_HASH_CHAIN', 'False').lower() == 'true'
+    LOG_TAIL_MIN_INTERVAL_MS = int(os.getenv('LOG_TAIL_MIN_INTERVAL_MS', 500))
+    LOG_TAIL_MAX_INTERVAL_MS = int(os.getenv('LOG_TAIL_MAX_INTERVAL_MS', 10000))
+    LOG_TAIL_BATCH_SIZE = int(os.getenv('LOG_TAIL_BATCH_SIZE', 500))
+    LOG_TAIL_MAX_ROWS = int(os.getenv('LOG_TAIL_MAX_ROWS', 1000))  # rows kept in the live view
+    LOG_ROLLUP_MINUTE_RETENTION_DAYS = int(os.getenv('LOG_ROLLUP_MINUTE_RETENTION_DAYS', 7))
+    LOG_ROLLUP_HOUR_RETENTION_DAYS = int(os.getenv('LOG_ROLLUP_HOUR_RETENTION_DAYS', 90))
+    INSTRUMENTATION_ENABLED = os.getenv('INSTRUMENTATION_ENABLED', 'True').lower() == 'true'  # False = no @timed wrappers
+    TIMING_SAMPLE_RATE = float(os.getenv('TIMING_SAMPLE_RATE', 1.0))  # Fraction of @timed calls measured
+    SLOW_CALL_THRESHOLD_MS = float(os.getenv('SLOW_CALL_THRESHOLD_MS', 500))  # Log @timed calls slower than this (0 = off)
+    TRACING_ENABLED = os.getenv('TRACING_ENABLED', 'False').lower() == 'true'  # False = no spans, no wrappers
+    TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', 1.0))  # Fraction of traces recorded
+    TRACE_FILE = os.getenv('TRACE_FILE', 'trace.json')  # Chrome trace-viewer events, one per line
     
     # Risk assessment settings
     RISK_THRESHOLD_LOW = float(os.getenv('RISK_THRESHOLD_LOW', 0.3))
@@ -76,12 +115,38 @@ class Config:
     # Model management settings
     MODEL_STORAGE_PATH = os.getenv('MODEL_STORAGE_PATH', './models')
     MODEL_VERSION_RETENTION = int(os.getenv('MODEL_VERSION_RETENTION', 5))
+    RETENTION_SCHEDULER_ENABLED = os.getenv('RETENTION_SCHEDULER_ENABLED', 'False').lower() == 'true'
+    RETENTION_INTERVAL = int(os.getenv('RETENTION_INTERVAL', 86400))  # Seconds between retention runs
+    RETENTION_BATCH_SIZE = int(os.getenv('RETENTION_BATCH_SIZE', 500))  # Model rows deleted per transaction
+    VACUUM_STEP_PAGES = int(os.getenv('VACUUM_STEP_PAGES', 1000))  # Pages released per incremental vacuum step
+    VACUUM_MAX_STEPS = int(os.getenv('VACUUM_MAX_STEPS', 100))
+    MODEL_CACHE_SIZE = int(os.getenv('MODEL_CACHE_SIZE', 4))  # Deserialized models kept in memory
+    SCORING_MODEL_NAME = os.getenv('SCORING_MODEL_NAME', '')  # Production model blended into loan scores ('' = rules only)
+    RULE_SCORE_WEIGHT = float(os.getenv('RULE_SCORE_WEIGHT', 0.7))  # Weight of the rule score in the blended score
+    MODEL_SCORE_WEIGHT = float(os.getenv('MODEL_SCORE_WEIGHT', 0.3))  # Weight of the model score in the blended score
+    MODEL_BATCH_SIZE = int(os.getenv('MODEL_BATCH_SIZE', 64))  # Applications per model call
+    MODEL_BATCH_MAX_WAIT_MS = float(os.getenv('MODEL_BATCH_MAX_WAIT_MS', 5))  # Max wait to fill a batch (0 = no batching)
+    DRIFT_MONITORING_ENABLED = os.getenv('DRIFT_MONITORING_ENABLED', 'True').lower() == 'true'
+    DRIFT_WINDOW_SECONDS = int(os.getenv('DRIFT_WINDOW_SECONDS', 3600))  # Width of one histogram window
+    DRIFT_WINDOWS = int(os.getenv('DRIFT_WINDOWS', 24))  # Windows in the rolling comparison
+    DRIFT_PSI_THRESHOLD = float(os.getenv('DRIFT_PSI_THRESHOLD', 0.2))
+    DRIFT_KS_THRESHOLD = float(os.getenv('DRIFT_KS_THRESHOLD', 0.1))
+    DRIFT_MIN_SAMPLES = int(os.getenv('DRIFT_MIN_SAMPLES', 100))  # Samples needed before drift is judged
+    SHADOW_SCORING_ENABLED = os.getenv('SHADOW_SCORING_ENABLED', 'False').lower() == 'true'
+    SHADOW_MODEL_ENVIRONMENT = os.getenv('SHADOW_MODEL_ENVIRONMENT', 'testing')  # Challengers are scored from this environment
+    SHADOW_WORKERS = int(os.getenv('SHADOW_WORKERS', 2))
+    SHADOW_MAX_PENDING = int(os.getenv('SHADOW_MAX_PENDING', 100))  # Batches queued before shadow work is dropped
+    SHADOW_WRITE_BATCH_SIZE = int(os.getenv('SHADOW_WRITE_BATCH_SIZE', 200))
+    SHADOW_FLUSH_INTERVAL = float(os.getenv('SHADOW_FLUSH_INTERVAL', 5))  # Seconds before a partial batch is written
     
     # API settings
     API_ENABLED = os.getenv('API_ENABLED', 'False').lower() == 'true'
     API_HOST = os.getenv('API_HOST', '0.0.0.0')
     API_PORT = int(os.getenv('API_PORT', 8080))
     API_WORKERS = int(os.getenv('API_WORKERS', 1))
+    METRICS_MULTIPROC_DIR = os.getenv('METRICS_MULTIPROC_DIR', '')  # Shared snapshot directory for pre-forked workers
+    METRICS_TEXTFILE = os.getenv('METRICS_TEXTFILE', '')  # Prometheus text file rewritten every flush ('' = off)
+    METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 10))  # Seconds between metric dumps
     
     # Email settings for notifications
     EMAIL_ENABLED = os.getenv('EMAIL_ENABLED', 'False').lower() == 'true'
@@ -1,7 +1,11 @@
 import sys
 import random
+import threading
 from PyQt5.QtWidgets import QApplication, QMessageBox
 from Client.models.database import init_database
+from Client.models.model_serving import get_model_cache
+from Client.models.retention import start_retention_scheduler
+from Client.utils.metrics import start_metrics_flusher
 from Client.controllers.admin_controller import AdminController
 from Client.controllers.user_controller import UserController
 from Client.controllers.risk_control_controller import RiskControlController
@@ -21,6 +25,15 @@ class App(QApplication):
             QMessageBox.critical(None, '数据库错误', f'数据库初始化失败: {str(e)}')
             sys.exit(1)
         
+        # 后台预热生产模型缓存，不阻塞界面启动
+        threading.Thread(target=get_model_cache().warm, daemon=True).start()
+        
+        # 按 RETENTION_INTERVAL 定期清理旧模型版本并压缩数据库
+        self.retention_scheduler = start_retention_scheduler()
+        
+        # 设置 METRICS_MULTIPROC_DIR / METRICS_TEXTFILE 时定期导出指标
+        self.metrics_flusher = start_metrics_flusher()
+        
         # 初始化控制器
         self.admin_controller = AdminController()
         self.user_controller = UserController()
@@ -215,18 +215,27 @@ class ApplicationLauncher:
             return 1
     
     def run_api_mode(self) -> int:
-        """Launch the API server (if implemented)"""
+        """Launch the API server (currently only the /metrics endpoint)"""
         self._log("Starting Financial Risk Assessment System (API Mode)")
         
         try:
-            # TODO: Implement API server launch
-            self._log("API mode not yet implemented", 'warning')
-            return 1
+            from Client.utils.metrics import start_http_server, start_metrics_flusher
+            host = getattr(current_config, 'API_HOST', '0.0.0.0')
+            port = getattr(current_config, 'API_PORT', 8080)
+            server = start_http_server(port, host)
+            start_metrics_flusher()
+            self._log(f"Serving metrics on http://{host}:{port}/metrics (Ctrl+C to stop)")
+            try:
+                while True:
+                    time.sleep(3600)
+            except KeyboardInterrupt:
+                server.shutdown()
+            return 0
         except Exception as e:
             self._log(f"API server error: {e}", 'error')
             return 1
     
-    def run_cli_mode(self, command: str) -> int:
+    def run_cli_mode(self, command: str, options: Any = None) -> int:
         """Run CLI commands"""
         self._log(f"Running CLI command: {command}")
         
@@ -236,6 +245,29 @@ class ApplicationLauncher:
             return self._run_migrations()
         elif command == 'backup':
             return self._create_backup()
+        elif command == 'restore':
+            return self._restore_data(getattr(options, 'csv_path', None) or './CSV')
+        elif command == 'top-queries':
+            return self._show_top_queries(getattr(options, 'top', None) or 10)
+        elif command == 'drift':
+            return self._show_drift(getattr(options, 'set_baseline', False))
+        elif command == 'bench-logging':
+            return self._benchmark_logging(getattr(options, 'records', None) or 10000)
+        elif command == 'rollup-backfill':
+            return self._backfill_rollups()
+        elif command == 'tail':
+            return self._tail_warnings()
+        elif command == 'calibrate-bcrypt':
+            return self._calibrate_bcrypt(getattr(options, 'target_ms', None) or 250.0)
+        elif command == 'migrate-passwords':
+            return self._migrate_passwords(getattr(options, 'workers', None))
+        elif command == 'metrics':
+            return self._write_metrics(getattr(options, 'output', None))
+        elif command == 'verify-audit':
+            return self._verify_audit()
+        elif command == 'retention':
+            return self._run_retention(getattr(options, 'keep', None),
+                                       getattr(options, 'dry_run', False))
         else:
             self._log(f"Unknown CLI command: {command}", 'error')
             return 1
@@ -265,6 +297,194 @@ class ApplicationLauncher:
             self._log(f"Migration failed: {e}", 'error')
             return 1
     
+    def _restore_data(self, csv_path: str) -> int:
+        """Replace the contents of the exported tables with CSV exports"""
+        try:
+            from Client.models.database import init_database, bulk_load_tables
+            init_database()
+            stats = bulk_load_tables(csv_path, replace=True)
+            if not stats:
+                self._log(f"No CSV exports found in {csv_path}", 'error')
+                return 1
+            for table, table_stats in stats.items():
+                print(f"  {table:<20} {table_stats['rows']:>10} rows  "
+                      f"{table_stats['seconds']:8.3f}s  {table_stats['rows_per_sec']:>12.0f} rows/s")
+            self._log(f"Restored {len(stats)} tables from {csv_path}")
+            return 0
+        except Exception as e:
+            self._log(f"Restore failed: {e}", 'error')
+            return 1
+    
+    def _show_top_queries(self, limit: int) -> int:
+        """Print the statements with the highest total time"""
+        try:
+            from Client.models.database import QUERY_STATS_FILE
+            from Client.models.query_stats import load_stats, format_top_statements
+            stats = load_stats(QUERY_STATS_FILE)
+            if not stats:
+                self._log(f"No query statistics recorded in {QUERY_STATS_FILE}", 'warning')
+                return 1
+            print(format_top_statements(stats, limit))
+            return 0
+        except Exception as e:
+            self._log(f"Could not read query statistics: {e}", 'error')
+            return 1
+    
+    def _run_retention(self, keep: int = None, dry_run: bool = False) -> int:
+        """Delete old model versions, prune artifacts and compact the database"""
+        try:
+            from Client.models.database import init_database
+            from Client.models.retention import run_retention
+            init_database()
+            stats = run_retention(keep=keep, dry_run=dry_run)
+            action = "would delete" if dry_run else "deleted"
+            print(f"  {stats['expired']} expired model versions, {stats['deleted']} {action}")
+            print(f"  {stats['artifacts_pruned']} unreferenced artifacts removed")
+            print(f"  {stats['rollups_pruned']} expired log rollup buckets removed")
+            print(f"  {stats['pages_released']} database pages released")
+            return 0
+        except Exception as e:
+            self._log(f"Retention failed: {e}", 'error')
+            return 1
+    
+    def _show_drift(self, set_baseline: bool = False) -> int:
+        """Print PSI/KS of recent persisted windows against the drift baseline"""
+        try:
+            from Client.models.database import init_database
+            from Client.models.drift_monitor import drift_report_from_snapshots, get_drift_monitor
+            init_database()
+            report, current = drift_report_from_snapshots()
+            if set_baseline:
+                if not current:
+                    self._log("No drift snapshots recorded yet", 'warning')
+                    return 1
+                get_drift_monitor().set_baseline(current)
+                self._log(f"Stored drift baseline for {len(current)} features")
+                return 0
+            if not report:
+                self._log("No drift baseline or snapshots to compare", 'warning')
+                return 1
+            print(f"  {'feature':<18} {'PSI':>8} {'KS':>8} {'samples':>10}")
+            for feature, stats in report.items():
+                print(f"  {feature:<18} {stats['psi']:>8.3f} {stats['ks']:>8.3f} {stats['samples']:>10}")
+            return 0
+        except Exception as e:
+            self._log(f"Drift report failed: {e}", 'error')
+            return 1
+    
+    def _benchmark_logging(self, records: int) -> int:
+        """Print the per-record cost of log redaction and audit throughput"""
+        try:
+            import tempfile
+            from Client.utils.logger import benchmark_audit_writer, benchmark_security_filter
+            for size in (200, 1000, 4000):
+                cost = benchmark_security_filter(records, size)
+                print(f"  {size:>6} byte messages  {cost:8.2f} us/record  {1e6 / cost:>10.0f} records/s")
+            with tempfile.TemporaryDirectory() as tmp:
+                rate = benchmark_audit_writer(os.path.join(tmp, 'audit.log'), records)
+            print(f"  durable audit writes (group commit, hash chain)  {rate:>10.0f} records/s")
+            return 0
+        except Exception as e:
+            self._log(f"Logging benchmark failed: {e}", 'error')
+            return 1
+    
+    def _backfill_rollups(self) -> int:
+        """Build day rollups for logs written before rollups were recorded"""
+        try:
+            from Client.models.database import init_database
+            from Client.models.risk_control_model import LogRollupModel
+            init_database()
+            rows = LogRollupModel.backfill()
+            self._log(f"Backfilled log rollups from {rows} log rows")
+            return 0
+        except Exception as e:
+            self._log(f"Rollup backfill failed: {e}", 'error')
+            return 1
+    
+    def _tail_warnings(self) -> int:
+        """Stream new warning logs to stdout until interrupted"""
+        try:
+            from Client.models.database import init_database
+            from Client.models.log_tail import LogTailer
+            init_database()
+            tailer = LogTailer(warnings_only=True)
+            self._log(f"Following warnings after log row {tailer.last_id} (Ctrl+C to stop)")
+            
+            def print_rows(rows):
+                for row in rows:
+                    print(f"{row[9]}  [{row[8] or 'warning'}]  {row[2]}: {row[3]}"
+                          + (f" - {row[4]}" if row[4] else ""), flush=True)
+            
+            tailer.follow(print_rows)
+            return 0
+        except KeyboardInterrupt:
+            return 0
+        except Exception as e:
+            self._log(f"Log tail failed: {e}", 'error')
+            return 1
+    
+    def _calibrate_bcrypt(self, target_ms: float) -> int:
+        """Suggest the BCRYPT_ROUNDS whose verification takes about target_ms here"""
+        try:
+            from Client.utils.security import PasswordManager
+            result = PasswordManager.calibrate_bcrypt_cost(target_ms)
+            print(f"  cost {result['cost']}: {result['verify_ms']:.0f} ms per verification "
+                  f"(target {target_ms:.0f} ms)")
+            print(f"  set BCRYPT_ROUNDS={result['cost']}")
+            return 0
+        except Exception as e:
+            self._log(f"bcrypt calibration failed: {e}", 'error')
+            return 1
+    
+    def _migrate_passwords(self, workers: int = None) -> int:
+        """Hash every plaintext password in users across worker processes"""
+        try:
+            from Client.models.password_migration import migrate_plaintext_passwords
+            stats = migrate_plaintext_passwords(workers)
+            self._log(f"Hashed {stats['migrated']} of {stats['plaintext']} plaintext passwords "
+                      f"({stats['skipped']} changed while migrating, {stats['deferred']} "
+                      f"bare sha256 or hex-like left for login)")
+            return 0
+        except Exception as e:
+            self._log(f"Password migration failed: {e}", 'error')
+            return 1
+    
+    def _write_metrics(self, output: str = None) -> int:
+        """Print the Prometheus exposition (merged across workers) or write it to a file"""
+        try:
+            from Client.utils.metrics import get_registry, write_textfile
+            if output:
+                write_textfile(output)
+                self._log(f"Wrote metrics to {output}")
+            else:
+                print(get_registry().render(), end='')
+            return 0
+        except Exception as e:
+            self._log(f"Metrics export failed: {e}", 'error')
+            return 1
+    
+    def _verify_audit(self) -> int:
+        """Check the audit hash chain across rotated files, oldest first"""
+        try:
+            from Client.utils.logger import GENESIS_HASH, verify_audit_chain
+            base = getattr(current_config, 'AUDIT_LOG_FILE', 'audit.log')
+            backups = getattr(current_config, 'LOG_BACKUP_COUNT', 5)
+            paths = [f"{base}.{i}" for i in range(backups, 0, -1)] + [base]
+            prev_hash, total = GENESIS_HASH, 0
+            for path in paths:
+                if not os.path.exists(path):
+                    continue
+                ok, records, prev_hash, bad_line = verify_audit_chain(path, prev_hash)
+                total += records
+                if not ok:
+                    self._log(f"Audit chain broken in {path} at line {bad_line}", 'error')
+                    return 1
+            self._log(f"Audit chain intact ({total} records)")
+            return 0
+        except Exception as e:
+            self._log(f"Audit verification failed: {e}", 'error')
+            return 1
+    
     def _create_backup(self) -> int:
         """Create system backup"""
         try:
@@ -298,6 +518,17 @@ Examples:
   python run.py                    # Launch GUI application
   python run.py --mode api         # Launch API server
   python run.py --mode cli test    # Run tests
+  python run.py --mode cli --command restore --csv-path ./CSV  # Replace tables with CSV exports
+  python run.py --mode cli --command top-queries --top 20      # Slowest statements
+  python run.py --mode cli --command retention --keep 3        # Prune old model versions
+  python run.py --mode cli --command drift [--set-baseline]    # Score/input drift vs. baseline
+  python run.py --mode cli --command bench-logging             # Log redaction and audit write cost
+  python run.py --mode cli --command verify-audit              # Check the audit log hash chain
+  python run.py --mode cli --command tail                      # Stream new warnings to stdout
+  python run.py --mode cli --command rollup-backfill           # Build log rollups for existing logs
+  python run.py --mode cli --command metrics --output m.prom   # Prometheus text from all workers
+  python run.py --mode cli --command calibrate-bcrypt --target-ms 250  # Pick BCRYPT_ROUNDS
+  python run.py --mode cli --command migrate-passwords --workers 8     # Hash plaintext passwords
   python run.py --check-only       # Check system requirements only
   python run.py --install-deps     # Install missing dependencies
         """
@@ -315,6 +546,58 @@ Examples:
         help='CLI command to run (for cli mode)'
     )
     
+    parser.add_argument(
+        '--csv-path',
+        help='Directory of CSV exports (for the restore command)'
+    )
+    
+    parser.add_argument(
+        '--top',
+        type=int,
+        help='Number of statements to show (for the top-queries command)'
+    )
+    
+    parser.add_argument(
+        '--keep',
+        type=int,
+        help='Model versions to keep per name (for the retention command)'
+    )
+    
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Report without deleting (for the retention command)'
+    )
+    
+    parser.add_argument(
+        '--set-baseline',
+        action='store_true',
+        help='Store recent windows as the drift baseline (for the drift command)'
+    )
+    
+    parser.add_argument(
+        '--records',
+        type=int,
+        help='Records per message size (for the bench-logging command)'
+    )
+    
+    parser.add_argument(
+        '--target-ms',
+        type=float,
+        help='Target verification time (for the calibrate-bcrypt command)'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help='Worker processes (for the migrate-passwords command)'
+    )
+    
+    parser.add_argument(
+        '--output',
+        help='File to write to instead of stdout (for the metrics command)'
+    )
+    
     parser.add_argument(
         '--check-only',
         action='store_true',
@@ -397,7 +680,7 @@ Examples:
         if not args.command:
             print("CLI mode requires --command argument")
             return 1
-        return launcher.run_cli_mode(args.command)
+        return launcher.run_cli_mode(args.command, args)
     
     return 0
 
@@ -75,6 +75,7 @@ setup(
         "monitoring": [
             "prometheus-client>=0.15",
             "grafana-api>=1.0",
+            "orjson>=3.9",
         ],
     },
     entry_points={
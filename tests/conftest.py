@@ -0,0 +1,33 @@
+"""
+Shared fixtures for the test suite
+"""
+import pytest
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project code'))
+
+from Client.models import database, artifact_store, model_serving
+from Client.models.query_cache import QueryCache
+from Client.models.query_stats import QueryStats
+
+
+@pytest.fixture
+def sqlite_db(tmp_path, monkeypatch):
+    """Point the database layer at a fresh SQLite file"""
+    for conn in database.CONNECTION_POOL + database.READ_CONNECTION_POOL:
+        conn.close()
+    monkeypatch.setattr(database, 'CONNECTION_POOL', [])
+    monkeypatch.setattr(database, 'READ_CONNECTION_POOL', [])
+    monkeypatch.setattr(database, 'DB_TYPE', 'sqlite')
+    monkeypatch.setattr(database, 'SQLITE_DB_PATH', str(tmp_path / 'test.db'))
+    monkeypatch.setattr(database, 'SQLITE_READ_DB_PATH', None)
+    monkeypatch.setattr(database, 'QUERY_CACHE', QueryCache(max_entries=64, ttl=60))
+    monkeypatch.setattr(database, 'QUERY_STATS', QueryStats())
+    monkeypatch.setattr(database, 'QUERY_STATS_FILE', str(tmp_path / 'query_stats.json'))
+    monkeypatch.setattr(artifact_store.current_config, 'MODEL_STORAGE_PATH', str(tmp_path / 'models'))
+    monkeypatch.setattr(model_serving, 'MODEL_CACHE', model_serving.ModelCache(max_entries=2))
+    yield tmp_path
+    for conn in database.CONNECTION_POOL + database.READ_CONNECTION_POOL:
+        conn.close()
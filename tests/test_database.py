@@ -0,0 +1,709 @@
+"""
+Tests for the database layer
+"""
+import pytest
+import asyncio
+import hashlib
+import sqlite3
+import time
+import threading
+import sys
+import os
+from datetime import date
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project code'))
+
+from Client.models import database, artifact_store
+from Client.models.query_cache import QueryCache, tables_read_by, table_written_by
+from Client.models.query_stats import QueryStats, load_stats, percentile_ms
+
+CSV_PATH = os.path.join(os.path.dirname(__file__), '..', 'project code', 'CSV')
+
+
+class TestBulkLoader:
+    """Test CSV bulk loading"""
+
+    def test_init_database_seeds_every_table(self, sqlite_db):
+        """Test that init_database loads each seed table once"""
+        database.init_database(CSV_PATH)
+
+        for table, filename in database.SEED_TABLES.items():
+            with open(os.path.join(CSV_PATH, filename), encoding='utf-8') as f:
+                expected = sum(1 for line in f if line.strip()) - 1
+            count = database.execute_query(f"SELECT COUNT(*) FROM {table}")[0][0]
+            assert count == expected, table
+
+    def test_columns_are_parsed_by_type(self, sqlite_db):
+        """Test per-column type conversion"""
+        database.init_database(CSV_PATH)
+
+        row = database.execute_query(
+            "SELECT typeof(verified), typeof(model_size), create_time FROM model_management WHERE id = 1"
+        )[0]
+        assert row[0] == 'integer'
+        assert row[1] == 'integer'
+        # 2025/4/12 in the CSV is normalised to an ISO date
+        assert row[2] == date(2025, 4, 12).isoformat()
+
+    def test_bulk_load_reports_throughput(self, sqlite_db, tmp_path):
+        """Test per-table load statistics"""
+        database.init_database()
+        csv_file = tmp_path / 'rules.csv'
+        lines = ['id,rule_id,log_id,rule_name,rule_expression,is_external,priority,creator,create_time']
+        lines += [f'{i},{i},{i},Rule {i},value > {i},0,High,admin,2025-04-12' for i in range(1, 2501)]
+        csv_file.write_text('\n'.join(lines), encoding='utf-8')
+
+        stats = database.bulk_load_tables(str(tmp_path), {'rule_management': 'rules.csv'},
+                                          batch_size=1000)
+
+        assert stats['rule_management']['rows'] == 2500
+        assert stats['rule_management']['rows_per_sec'] > 0
+        assert database.execute_query("SELECT COUNT(*) FROM rule_management")[0][0] == 2500
+
+    def test_failed_load_rolls_back(self, sqlite_db, tmp_path):
+        """Test that a failing table leaves no partial data behind"""
+        database.init_database()
+        (tmp_path / 'good.csv').write_text(
+            'username,password,is_admin\nalice,x,0\n', encoding='utf-8')
+        (tmp_path / 'bad.csv').write_text(
+            'username,action\n,Login\n', encoding='utf-8')
+
+        with pytest.raises(Exception):
+            database.bulk_load_tables(str(tmp_path), {'users': 'good.csv', 'logs': 'bad.csv'})
+
+        assert database.execute_query("SELECT COUNT(*) FROM users")[0][0] == 0
+
+    def test_conflicting_ids_fail_unless_replacing(self, sqlite_db):
+        """Test loading over seeded rows raises, and replace=True swaps the contents"""
+        database.init_database(CSV_PATH)
+        users = database.execute_query("SELECT COUNT(*) FROM users")[0][0]
+
+        with pytest.raises(sqlite3.IntegrityError):
+            database.bulk_load_tables(CSV_PATH, {'users': 'users.csv'})
+        assert database.bulk_load_tables(CSV_PATH, {'users': 'users.csv'}, replace=True)['users']['rows'] == users
+        assert database.execute_query("SELECT COUNT(*) FROM users")[0][0] == users
+
+    def test_replacing_logs_rebuilds_rollups_and_search(self, sqlite_db, tmp_path):
+        """Test a restore of log_monitoring leaves no stale rollups or index entries"""
+        from Client.models.risk_control_model import LogMonitoringModel
+        database.init_database(CSV_PATH)
+        LogMonitoringModel.add_log(log_id=7001, operator='system', operation='obsolete job')
+        (tmp_path / 'log_monitoring.csv').write_text(
+            'id,log_id,operator,operation,error_info,exception_info,is_warning,is_done,warning_type,create_time\n'
+            '1,1,admin,restored job,,,1,0,Input Error,2025-04-12\n'
+            '2,2,admin,restored job,,,0,1,None,2025-04-13\n', encoding='utf-8')
+
+        database.bulk_load_tables(str(tmp_path), {'log_monitoring': 'log_monitoring.csv'}, replace=True)
+
+        assert LogMonitoringModel.search_logs(keyword='obsolete') == []
+        assert len(LogMonitoringModel.search_logs(keyword='restored')) == 2
+        rollups = database.execute_query(
+            "SELECT bucket_start, value FROM log_rollups WHERE metric = 'logs' ORDER BY bucket_start")
+        assert [(str(start)[:10], value) for start, value in rollups] == [('2025-04-12', 1), ('2025-04-13', 1)]
+
+    def test_rejects_unsafe_identifiers(self, sqlite_db, tmp_path):
+        """Test that CSV headers cannot inject SQL"""
+        database.init_database()
+        (tmp_path / 'evil.csv').write_text(
+            'username) VALUES (1); DROP TABLE users; --\nx\n', encoding='utf-8')
+
+        with pytest.raises(ValueError):
+            database.bulk_load_tables(str(tmp_path), {'users': 'evil.csv'})
+
+
+class TestReadWriteSplitting:
+    """Test routing reads to a separate read target"""
+
+    @pytest.fixture
+    def replica(self, sqlite_db, monkeypatch):
+        monkeypatch.setattr(database, 'SQLITE_READ_DB_PATH', str(sqlite_db / 'replica.db'))
+        # Keep the read file stale until a test syncs it
+        monkeypatch.setattr(database, 'SQLITE_REPLICA_SYNC_DELAY', 3600)
+        database.init_database(CSV_PATH)
+        yield sqlite_db
+        if database._replica_sync_timer is not None:
+            database._replica_sync_timer.cancel()
+            database._replica_sync_timer = None
+
+    def test_reads_use_read_target_and_writes_use_primary(self, replica):
+        """Test that a write is only visible on the replica after it syncs"""
+        database.execute_update("UPDATE users SET phone = ? WHERE username = ?", ('999', 'admin'))
+
+        query = "SELECT phone FROM users WHERE username = ?"
+        assert database.execute_query(query, ('admin',), read_target=True) != [('999',)]
+        assert database.execute_query(query, ('admin',)) == [('999',)]
+        assert database.execute_query(query, ('admin',), read_target=True, read_your_writes=True) == [('999',)]
+
+        database.sync_sqlite_replica()
+        assert database.execute_query(query, ('admin',), read_target=True) == [('999',)]
+
+    def test_read_your_writes_context_routes_model_reads(self, replica):
+        """Test the per-call override for model read methods"""
+        from Client.models.risk_control_model import RuleModel
+        database.execute_update("UPDATE rule_management SET rule_name = ? WHERE id = 1", ('Renamed',))
+
+        assert RuleModel.search_rules(rule_id=1)[0][3] == 'Risk Rule 1'
+        with database.read_your_writes():
+            assert RuleModel.search_rules(rule_id=1)[0][3] == 'Renamed'
+
+    def test_user_log_and_tail_reads_use_read_target(self, replica):
+        """Test UserModel/LogModel getters and the live-tail queries read the replica"""
+        from Client.models.user_model import UserModel
+        from Client.models.log_model import LogModel
+        from Client.models.risk_control_model import LogMonitoringModel
+        users, logs = len(UserModel.get_all_users()), len(LogModel.get_all_logs())
+        last_id = LogMonitoringModel.get_max_log_id()
+        database.execute_update("UPDATE users SET phone = ? WHERE username = ?", ('999', 'admin'))
+        assert UserModel.add_user('carol', 'x' * 64, 0, 'Carol', 'carol@example.com', '1')
+        LogModel.add_log('admin', 'Add user', 'carol')
+        LogMonitoringModel.add_log(log_id=7001, operator='system', operation='run job')
+
+        assert UserModel.get_user_info('admin')[2] != '999'
+        assert len(UserModel.get_all_users()) == users
+        assert len(LogModel.get_all_logs()) == logs
+        assert LogMonitoringModel.get_max_log_id() == last_id
+        assert LogMonitoringModel.get_logs_after(last_id) == []
+
+        database.sync_sqlite_replica()
+        assert UserModel.get_user_info('admin')[2] == '999'
+        assert len(UserModel.get_all_users()) == users + 1
+        new_log = LogModel.get_all_logs()[0]
+        assert LogModel.get_log_details(new_log[0]) == 'carol'
+        assert [row[1] for row in LogMonitoringModel.get_logs_after(last_id)] == [7001]
+
+    def test_replica_is_refreshed_after_commits(self, replica, monkeypatch):
+        """Test the read file catches up with the primary after a write"""
+        from Client.models.risk_control_model import RuleModel
+        monkeypatch.setattr(database, 'SQLITE_REPLICA_SYNC_DELAY', 0)
+        with database.unit_of_work():
+            database.execute_update("UPDATE rule_management SET rule_name = ? WHERE id = 1", ('Renamed',))
+        assert RuleModel.search_rules(rule_id=1)[0][3] == 'Renamed'
+
+    def test_read_target_is_read_only(self, replica):
+        """Test that read connections cannot write"""
+        with pytest.raises(Exception):
+            with database.get_db_cursor(readonly=True) as cursor:
+                cursor.execute("DELETE FROM users")
+        assert database.execute_query("SELECT COUNT(*) FROM users", read_your_writes=True)[0][0] > 0
+
+    def test_without_read_target_reads_hit_primary(self, sqlite_db):
+        """Test that routing is a no-op when no read target is configured"""
+        database.init_database(CSV_PATH)
+        database.execute_update("UPDATE users SET phone = ? WHERE username = ?", ('1', 'admin'))
+        assert database.execute_query("SELECT phone FROM users WHERE username = 'admin'") == [('1',)]
+        assert database.READ_CONNECTION_POOL == []
+
+
+class TestQueryCache:
+    """Test the query result cache"""
+
+    def test_lru_eviction_and_ttl(self, monkeypatch):
+        """Test LRU ordering and expiry"""
+        cache = QueryCache(max_entries=2, ttl=10)
+        cache.put('a', frozenset(['t']), [(1,)])
+        cache.put('b', frozenset(['t']), [(2,)])
+        assert cache.get('a') == (True, [(1,)])
+        cache.put('c', frozenset(['t']), [(3,)])
+        assert cache.get('b') == (False, None)  # least recently used
+        assert cache.stats()['evictions'] == 1
+
+        now = time.monotonic()
+        monkeypatch.setattr(time, 'monotonic', lambda: now + 11)
+        assert cache.get('a') == (False, None)
+
+    def test_table_extraction(self):
+        """Test read/write table tagging"""
+        assert tables_read_by(
+            "SELECT * FROM name_list nl JOIN rule_management rm ON nl.rule_id = rm.rule_id"
+        ) == {'name_list', 'rule_management'}
+        assert table_written_by("  UPDATE log_monitoring SET is_done = 1") == 'log_monitoring'
+        assert table_written_by("INSERT INTO name_list (value) VALUES (?)") == 'name_list'
+        assert table_written_by("DELETE FROM rule_management WHERE id = ?") == 'rule_management'
+
+    def test_cached_reads_invalidated_by_update(self, sqlite_db):
+        """Test hit/miss counting and table-level invalidation"""
+        from Client.models.risk_control_model import RuleModel
+        database.init_database(CSV_PATH)
+
+        first = RuleModel.get_all_rules()
+        assert RuleModel.get_all_rules() == first
+        stats = database.get_query_cache_stats()
+        assert (stats['hits'], stats['misses']) == (1, 1)
+
+        # Writes to an unrelated table keep the entry
+        database.execute_update("UPDATE users SET phone = '1'")
+        RuleModel.get_all_rules()
+        assert database.get_query_cache_stats()['hits'] == 2
+
+        database.execute_update("DELETE FROM rule_management WHERE id = 1")
+        assert len(RuleModel.get_all_rules()) == len(first) - 1
+
+    def test_user_and_log_writes_invalidate(self, sqlite_db):
+        """Test UserModel and LogModel writes drop cached reads of their tables"""
+        from Client.models.user_model import UserModel
+        from Client.models.log_model import LogModel
+        database.init_database(CSV_PATH)
+        users = "SELECT COUNT(*) FROM users"
+        logs = "SELECT COUNT(*) FROM logs"
+        user_count = database.execute_query(users, cache=True)[0][0]
+        log_count = database.execute_query(logs, cache=True)[0][0]
+
+        assert UserModel.add_user('carol', 'x' * 64, 0, 'Carol', 'carol@example.com', '1')
+        LogModel.add_log('admin', 'Add user', 'carol')
+        assert database.execute_query(users, cache=True)[0][0] == user_count + 1
+        assert database.execute_query(logs, cache=True)[0][0] == log_count + 1
+
+    def test_writes_from_other_connections_detected(self, sqlite_db):
+        """Test that PRAGMA data_version catches writes outside execute_update"""
+        from Client.models.risk_control_model import RuleModel
+        database.init_database(CSV_PATH)
+        before = RuleModel.get_all_rules()
+
+        other = sqlite3.connect(database.SQLITE_DB_PATH)
+        other.execute("DELETE FROM rule_management")
+        other.commit()
+        other.close()
+
+        assert before and RuleModel.get_all_rules() == []
+
+
+class TestQueryStats:
+    """Test per-statement timing and the slow query log"""
+
+    def test_statements_are_timed(self, sqlite_db):
+        """Test latency, row and pool wait recording"""
+        database.init_database(CSV_PATH)
+        for _ in range(3):
+            database.execute_query("SELECT id FROM users WHERE is_admin = ?", (0,))
+
+        sql, stats = [item for item in database.get_query_stats(50)
+                      if item[0] == "SELECT id FROM users WHERE is_admin = ?"][0]
+        assert stats['count'] == 3
+        assert stats['rows'] > 0 and stats['rows'] % 3 == 0
+        assert sum(stats['buckets']) == 3
+        assert database.QUERY_STATS.pool_wait.count >= 3
+
+    def test_slow_statements_capture_plan_once(self, sqlite_db, monkeypatch, caplog):
+        """Test slow query logging with a single EXPLAIN per statement"""
+        database.init_database(CSV_PATH)
+        monkeypatch.setattr(database, 'SLOW_QUERY_THRESHOLD_MS', 0)
+        monkeypatch.setattr(database, '_EXPLAINED', set())
+
+        with caplog.at_level('WARNING', logger='database.slow'):
+            for _ in range(3):
+                database.execute_query("SELECT * FROM name_list WHERE value = ?", ('John Doe',))
+            database._explain_executor.submit(lambda: None).result()
+
+        sql = "SELECT * FROM name_list WHERE value = ?"
+        slow_lines = [r for r in caplog.records if r.getMessage().startswith('Slow statement')
+                      and sql in r.getMessage()]
+        plan_lines = [r for r in caplog.records if r.getMessage().startswith('Query plan')
+                      and sql in r.getMessage()]
+        assert len(slow_lines) == 3
+        assert len(plan_lines) == 1
+        assert 'SCAN' in dict(database.get_query_stats(50))[sql]['plan']
+
+    def test_stats_file_accumulates_deltas(self, sqlite_db):
+        """Test that repeated saves do not double count"""
+        database.init_database()
+        database.execute_query("SELECT COUNT(*) FROM users")
+        database.dump_query_stats()
+        database.execute_query("SELECT COUNT(*) FROM users")
+        database.dump_query_stats()
+
+        stored = load_stats(database.QUERY_STATS_FILE)
+        assert stored["SELECT COUNT(*) FROM users"]['count'] == 2
+
+
+    def test_concurrent_saves_keep_every_count(self, tmp_path):
+        """Test saves from several registries sharing one file are all counted"""
+        path = str(tmp_path / 'stats.json')
+        registries = [QueryStats() for _ in range(4)]
+
+        def work(registry):
+            for _ in range(25):
+                registry.record("SELECT 1", 1.0)
+                registry.save(path)
+
+        threads = [threading.Thread(target=work, args=(registry,)) for registry in registries]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert load_stats(path)["SELECT 1"]['count'] == 100
+
+    def test_percentile_never_exceeds_max(self):
+        """Test p95 is capped at the slowest call instead of the bucket bound"""
+        buckets = [0] * 13
+        buckets[2] = 10
+        assert percentile_ms(buckets, 0.95) == 5.0
+        assert percentile_ms(buckets, 0.95, max_ms=2.4) == 2.4
+
+
+class TestAsyncFacade:
+    """Test the asyncio data-access facade"""
+
+    def test_async_query_and_update(self, sqlite_db):
+        """Test async execute_query / execute_update"""
+        from Client.models import async_database
+        database.init_database(CSV_PATH)
+
+        async def scenario():
+            updated = await async_database.execute_update(
+                "UPDATE users SET phone = ? WHERE username = ?", ('123', 'admin'))
+            rows = await async_database.execute_query(
+                "SELECT phone FROM users WHERE username = ?", ('admin',))
+            await async_database.shutdown_async_databases()
+            return updated, rows
+
+        updated, rows = asyncio.run(scenario())
+        assert updated == 1
+        assert rows == [('123',)]
+
+    def test_async_writes_invalidate_cached_reads(self, sqlite_db, monkeypatch):
+        """Test writes skip the native driver and drop cached reads of their table"""
+        from Client.models import async_database
+        database.init_database(CSV_PATH)
+        monkeypatch.setattr(async_database.AsyncDatabase, 'uses_native_driver', property(lambda self: True))
+        query = "SELECT phone FROM users WHERE username = 'admin'"
+        database.execute_query(query, cache=True)
+
+        async def scenario():
+            await async_database.execute_update(
+                "UPDATE users SET phone = ? WHERE username = ?", ('456', 'admin'))
+            await async_database.shutdown_async_databases()
+
+        asyncio.run(scenario())
+        assert database.execute_query(query, cache=True) == [('456',)]
+
+    def test_concurrent_model_calls_are_bounded(self, sqlite_db):
+        """Test that model calls run concurrently on a pool no larger than MAX_POOL_SIZE"""
+        from Client.models import async_database
+        database.init_database(CSV_PATH)
+
+        async def scenario():
+            db = async_database.get_async_database()
+            results = await asyncio.gather(
+                *(async_database.async_rules.get_all_rules() for _ in range(20)))
+            workers = db.max_workers
+            await async_database.shutdown_async_databases()
+            return results, workers
+
+        results, workers = asyncio.run(scenario())
+        assert workers == database.MAX_POOL_SIZE
+        assert all(r == results[0] for r in results)
+        assert len(database.CONNECTION_POOL) <= database.MAX_POOL_SIZE
+
+    def test_placeholder_translation(self):
+        """Test ?/%s rewriting for the native PostgreSQL driver"""
+        from Client.models.async_database import _to_asyncpg_query
+        assert _to_asyncpg_query("SELECT * FROM t WHERE a = ? AND b = %s") == \
+            "SELECT * FROM t WHERE a = $1 AND b = $2"
+
+
+class TestUnitOfWork:
+    """Test controller operations grouped into one transaction"""
+
+    def _counts(self):
+        return (database.execute_query("SELECT COUNT(*) FROM log_monitoring")[0][0],
+                database.execute_query("SELECT COUNT(*) FROM name_list")[0][0])
+
+    def test_log_and_entry_commit_together(self, sqlite_db):
+        """Test one checkout and one commit for a log + entry write"""
+        from Client.controllers.risk_control_controller import RiskControlController
+        database.init_database(CSV_PATH)
+        logs, entries = self._counts()
+
+        before = database.QUERY_STATS.pool_wait.count
+        assert RiskControlController('admin').add_name_list_entry(
+            1, 1, 1, 1, 1, 1, 'Jane Roe', 1)
+        assert database.QUERY_STATS.pool_wait.count == before + 1
+        assert self._counts() == (logs + 1, entries + 1)
+
+    def test_failed_entry_rolls_back_log(self, sqlite_db):
+        """Test that a failing model call undoes the whole unit"""
+        from Client.controllers.risk_control_controller import RiskControlController
+        database.init_database(CSV_PATH)
+        counts = self._counts()
+
+        # value is NOT NULL; the model swallows the error and returns False
+        assert not RiskControlController('admin').add_name_list_entry(
+            1, 1, 1, 1, 1, 1, None, 1)
+        assert self._counts() == counts
+
+    def test_nested_units_join_outer(self, sqlite_db):
+        """Test that an inner unit commits with the outer one"""
+        database.init_database()
+        with pytest.raises(RuntimeError):
+            with database.unit_of_work() as outer:
+                with database.unit_of_work() as inner:
+                    assert inner.joined and not outer.joined
+                    assert inner.conn is outer.conn
+                    database.execute_update("UPDATE users SET phone = '9'")
+                raise RuntimeError("abort")
+        assert not outer.committed
+        assert database.execute_query("SELECT COUNT(*) FROM users WHERE phone = '9'")[0][0] == 0
+
+    def test_mark_log_as_done_reports_success(self, sqlite_db):
+        """Test model writes joined to a controller unit report their own success"""
+        from Client.controllers.risk_control_controller import RiskControlController
+        database.init_database(CSV_PATH)
+        database.execute_update(
+            "INSERT INTO log_monitoring (log_id, operator, operation, is_warning, is_done, warning_type, create_time) "
+            "VALUES (4242, 'system', 'check', 1, 0, 'Test', '2025-03-01')")
+
+        assert RiskControlController('admin').mark_log_as_done(4242)
+        assert database.execute_query(
+            "SELECT is_done FROM log_monitoring WHERE log_id = 4242", read_your_writes=True) == [(1,)]
+
+    def test_failed_savepoint_keeps_the_unit(self, sqlite_db):
+        """Test a failure inside a savepoint only undoes the savepoint"""
+        database.init_database(CSV_PATH)
+        with database.unit_of_work() as uow:
+            database.execute_update("UPDATE users SET phone = '7'")
+            with database.savepoint():
+                with pytest.raises(Exception):
+                    database.execute_update("INSERT INTO missing_table VALUES (1)")
+        assert uow.committed
+        assert database.execute_query("SELECT COUNT(*) FROM users WHERE phone = '7'")[0][0] > 0
+
+    def test_cache_invalidated_after_commit(self, sqlite_db):
+        """Test that cached reads see the unit's writes once it commits"""
+        from Client.models.risk_control_model import RuleModel
+        database.init_database(CSV_PATH)
+        rules = RuleModel.get_all_rules()
+
+        with database.unit_of_work() as uow:
+            database.execute_update("DELETE FROM rule_management WHERE id = 1")
+        assert uow.committed
+        assert len(RuleModel.get_all_rules()) == len(rules) - 1
+
+
+class TestArtifactStore:
+    """Test content-addressed model artifact storage"""
+
+    def test_identical_uploads_are_stored_once(self, tmp_path):
+        """Test SHA-256 naming and deduplication"""
+        store = artifact_store.ArtifactStore(tmp_path / 'models')
+        first = store.put_bytes(b'model weights')
+        second = store.put_file(str(_write(tmp_path / 'copy.bin', b'model weights')))
+
+        assert first == second
+        assert first.sha256 == hashlib.sha256(b'model weights').hexdigest()
+        assert first.path == f"{first.sha256[:2]}/{first.sha256}"
+        assert store.read_bytes(first.sha256) == b'model weights'
+        stored = [p for p in (tmp_path / 'models').rglob('*') if p.is_file()]
+        assert len(stored) == 1
+
+    def test_file_upload_streams_in_chunks(self, tmp_path):
+        """Test chunked hashing with progress reporting"""
+        data = os.urandom(10 * 1024 + 1)
+        source = _write(tmp_path / 'model.bin', data)
+        calls = []
+
+        artifact = artifact_store.ArtifactStore(tmp_path / 'models').put_file(
+            str(source), chunk_size=1024, progress=lambda done, total: calls.append((done, total)))
+
+        assert artifact.sha256 == hashlib.sha256(data).hexdigest()
+        assert len(calls) == 11
+        assert calls[0] == (1024, len(data))
+        assert calls[-1] == (len(data), len(data))
+        assert not list((tmp_path / 'models').glob('.upload-*'))
+
+    def test_models_reference_artifacts_by_digest(self, sqlite_db):
+        """Test that the table keeps only digest, size and path"""
+        from Client.models.model_management_model import ModelManagementModel
+        database.init_database()
+
+        for version in ('1', '2'):
+            assert ModelManagementModel.add_model(
+                1, 'Model X', b'\x00' * 1024, version, 'testing', 'admin', 'manager')
+
+        with database.get_db_cursor() as cursor:
+            assert 'model_file' not in database.get_column_types(cursor, 'model_management')
+        rows = database.execute_query("SELECT DISTINCT model_sha256, model_size FROM model_management")
+        assert rows == [(hashlib.sha256(b'\x00' * 1024).hexdigest(), 1024)]
+
+        artifact = ModelManagementModel.get_model_artifact(1)
+        store = artifact_store.get_artifact_store()
+        assert store.read_bytes(artifact.sha256) == b'\x00' * 1024
+        for row in ModelManagementModel.get_unverified_models():
+            assert not any(isinstance(value, bytes) for value in row)
+
+    def test_seeded_models_have_their_artifacts(self, sqlite_db):
+        """Test a fresh install stores every artifact the seed CSV refers to"""
+        from Client.models.model_management_model import ModelManagementModel
+        database.init_database(CSV_PATH)
+
+        store = artifact_store.get_artifact_store()
+        digests = {row[0] for row in database.execute_query("SELECT model_sha256 FROM model_management")}
+        assert digests and all(store.exists(digest) for digest in digests)
+        artifact = ModelManagementModel.get_model_artifact(1)
+        assert store.read_bytes(artifact.sha256) == b'filedata'
+
+    def test_legacy_blob_column_is_migrated(self, sqlite_db):
+        """Test that init_database moves existing BLOBs into the store"""
+        from Client.models.model_management_model import ModelManagementModel
+        conn = sqlite3.connect(database.SQLITE_DB_PATH)
+        conn.execute("""CREATE TABLE model_management (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, log_id INTEGER NOT NULL,
+            model_name TEXT NOT NULL, model_file BLOB NOT NULL, model_version TEXT NOT NULL,
+            environment TEXT NOT NULL, caller TEXT NOT NULL, approver TEXT NOT NULL,
+            verified INTEGER NOT NULL, rollback INTEGER NOT NULL, create_time DATE NOT NULL)""")
+        conn.execute("INSERT INTO model_management VALUES "
+                     "(1, 1, 'Old', x'cafe', '1', 'production', 'admin', 'manager', 1, 0, '2025-04-12')")
+        conn.commit()
+        conn.close()
+
+        database.init_database()
+
+        artifact = ModelManagementModel.get_model_artifact(1)
+        assert artifact.size == 2
+        assert artifact_store.get_artifact_store().read_bytes(artifact.sha256) == b'\xca\xfe'
+
+
+class TestLogSearch:
+    """Test filtered, paged log queries"""
+
+    def _seed(self):
+        rows = [
+            (i, 'admin' if i % 2 else 'system', 'run job' if i % 3 == 0 else f'delete rule {i}',
+             '', '', 0, i % 2, '', f"2025-04-{1 + i % 20:02d} {i % 24:02d}:30:00")
+            for i in range(120)
+        ]
+        database.execute_many("""
+            INSERT INTO log_monitoring (log_id, operator, operation, error_info, exception_info,
+                                        is_warning, is_done, warning_type, create_time)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        return rows
+
+    def test_pages_follow_newest_first_order(self, sqlite_db):
+        """Test keyset pages cover every row exactly once"""
+        from Client.models.risk_control_model import LogMonitoringModel
+        database.init_database()
+        self._seed()
+        expected = LogMonitoringModel.search_logs()
+
+        seen, before = [], None
+        while True:
+            page = LogMonitoringModel.search_logs(limit=50, before=before)
+            seen.extend(page)
+            if len(page) < 50:
+                break
+            before = (page[-1][9], page[-1][0])
+        assert seen == expected
+        assert len(seen) == 120
+
+    def test_filters_run_in_sql(self, sqlite_db):
+        """Test keyword, type, status and date filters together"""
+        from Client.models.risk_control_model import LogMonitoringModel
+        database.init_database()
+        rows = self._seed()
+
+        logs = LogMonitoringModel.search_logs(keyword='admin', log_type='Runtime logs', is_done=1,
+                                              start_date='2025-04-05', end_date='2025-04-10')
+        expected = {r[0] for r in rows
+                    if r[1] == 'admin' and r[2] == 'run job' and r[6] == 1 and '2025-04-05' <= r[8][:10] <= '2025-04-10'}
+        assert expected
+        assert {log[1] for log in logs} == expected
+
+    def test_end_date_includes_the_whole_day(self, sqlite_db):
+        """Test a bare end date keeps rows logged later that day"""
+        from Client.models.risk_control_model import LogMonitoringModel
+        database.init_database()
+        rows = self._seed()
+
+        logs = LogMonitoringModel.search_logs(start_date='2025-04-10', end_date='2025-04-10')
+        expected = {r[0] for r in rows if r[8].startswith('2025-04-10')}
+        assert expected
+        assert {log[1] for log in logs} == expected
+
+    def test_first_page_reads_index_without_sorting(self, sqlite_db):
+        """Test the page query walks the create_time index instead of sorting every row"""
+        database.init_database()
+        for is_done, index in ((None, 'idx_log_monitoring_create_time'), (0, 'idx_log_monitoring_done_time')):
+            query = "SELECT id FROM log_monitoring WHERE 1=1"
+            params = []
+            if is_done is not None:
+                query += " AND is_done = ?"
+                params.append(is_done)
+            query += " AND (create_time, id) < (?, ?) ORDER BY create_time DESC, id DESC LIMIT 51"
+            conn = sqlite3.connect(database.SQLITE_DB_PATH)
+            plan = ' '.join(row[3] for row in conn.execute(
+                "EXPLAIN QUERY PLAN " + query, params + ['2025-04-10', 5]))
+            conn.close()
+            assert index in plan
+            assert 'TEMP B-TREE' not in plan
+
+    def test_full_text_index_follows_writes(self, sqlite_db):
+        """Test triggers keep the index in sync and substrings (incl. Chinese) match"""
+        from Client.models.risk_control_model import LogMonitoringModel
+        database.init_database()
+        self._seed()
+        LogMonitoringModel.add_log(log_id=7001, operator='system', operation='模型运行失败',
+                                   error_info='timeout contacting bureau')
+
+        assert [log[1] for log in LogMonitoringModel.search_logs(keyword='运行失败')] == [7001]
+        assert [log[1] for log in LogMonitoringModel.search_logs(keyword='CONTACTING')] == [7001]
+
+        database.execute_update("UPDATE log_monitoring SET error_info = 'ok' WHERE log_id = 7001")
+        assert LogMonitoringModel.search_logs(keyword='contacting') == []
+        database.execute_update("DELETE FROM log_monitoring WHERE log_id = 7001")
+        assert LogMonitoringModel.search_logs(keyword='运行失败') == []
+        # Too short for trigrams: answered with LIKE instead
+        assert len(LogMonitoringModel.search_logs(keyword='12')) == 1
+
+    def test_ranked_search_pages(self, sqlite_db):
+        """Test ranked results come back a page at a time without duplicates"""
+        from Client.models.risk_control_model import LogMonitoringModel
+        from Client.models.log_model import LogModel
+        database.init_database()
+        self._seed()
+        first = LogMonitoringModel.full_text_search('delete rule', limit=30)
+        second = LogMonitoringModel.full_text_search('delete rule', limit=30, offset=30)
+        assert len(first) == 30
+        assert not {log[0] for log in first} & {log[0] for log in second}
+        assert len(first) + len(second) + len(LogMonitoringModel.full_text_search(
+            'delete rule', limit=100, offset=60)) == 80
+
+        LogModel.add_log('alice', 'Export', 'exported the quarterly credit report')
+        assert [row[2] for row in LogModel.search_logs('quarterly')] == ['alice']
+
+    def test_postgres_search_uses_driver_placeholders(self, monkeypatch):
+        """Test the tsvector condition and ranked query use psycopg2's %s"""
+        monkeypatch.setattr(database, 'DB_TYPE', 'postgresql')
+        queries = []
+        monkeypatch.setattr(database, 'execute_query', lambda query, params, **kwargs: queries.append(query))
+
+        condition, params = database.full_text_condition('log_monitoring', 'rule')
+        assert "plainto_tsquery('simple', %s)" in condition and params == ['rule']
+        database.ranked_search('log_monitoring', ('id',), 'rule')
+        assert '?' not in queries[0] and queries[0].count('%s') == 4
+
+    def test_log_type_is_an_indexed_column(self, sqlite_db):
+        """Test the type is computed on insert and filtered through its index"""
+        from Client.models.risk_control_model import LogMonitoringModel
+        database.init_database()
+        rows = self._seed()
+        LogMonitoringModel.add_log(log_id=7002, operator='system', operation='系统运行检查')
+
+        runtime = LogMonitoringModel.search_logs(log_type='运行日志')
+        assert len(runtime) == sum(1 for r in rows if r[2] == 'run job') + 1
+        assert len(LogMonitoringModel.search_logs(log_type='Operation logs')) == 120 + 1 - len(runtime)
+        conn = sqlite3.connect(database.SQLITE_DB_PATH)
+        plan = ' '.join(row[3] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM log_monitoring WHERE log_type = 'runtime' "
+            "ORDER BY create_time DESC, id DESC LIMIT 51"))
+        conn.close()
+        assert 'idx_log_monitoring_type' in plan
+
+
+def _write(path, data):
+    path.write_bytes(data)
+    return path
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,107 @@
+"""
+Tests for streaming drift monitoring
+"""
+import pytest
+import threading
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project code'))
+
+from Client.models import database, drift_monitor
+from Client.models.risk_control_model import DriftSnapshotModel
+
+
+class TestDriftStatistics:
+    """Test PSI and KS over fixed bins"""
+
+    def test_identical_distributions_do_not_drift(self):
+        """Test that equal histograms give zero PSI and KS"""
+        counts = [5, 10, 20, 10, 5]
+        assert drift_monitor.population_stability_index(counts, counts) == 0.0
+        assert drift_monitor.ks_statistic(counts, counts) == 0.0
+
+    def test_shifted_distribution_drifts(self):
+        """Test PSI/KS on a shifted distribution, including empty bins"""
+        baseline = [0, 10, 80, 10, 0]
+        shifted = [10, 80, 10, 0, 0]
+        assert drift_monitor.population_stability_index(shifted, baseline) > 0.2
+        assert drift_monitor.ks_statistic(shifted, baseline) == pytest.approx(0.8)
+
+    def test_values_fall_into_fixed_bins(self):
+        """Test bin placement including underflow and overflow"""
+        assert drift_monitor.bin_index('credit_score', 300) == 0
+        assert drift_monitor.bin_index('credit_score', 350) == 0
+        assert drift_monitor.bin_index('credit_score', 351) == 1
+        assert drift_monitor.bin_index('credit_score', 900) == len(drift_monitor.BIN_EDGES['credit_score'])
+
+
+class TestDriftMonitor:
+    """Test rolling windows, snapshots and warnings"""
+
+    def test_window_rollover_persists_and_warns(self, sqlite_db):
+        """Test baseline comparison and log_monitoring warnings"""
+        database.init_database()
+        monitor = drift_monitor.DriftMonitor(window_seconds=60, windows=1, min_samples=50)
+        for _ in range(100):
+            monitor.observe({'credit_score': 720, 'debt_ratio': 0.3}, 85, now=10)
+        assert monitor.set_baseline()
+
+        for _ in range(100):
+            monitor.observe({'credit_score': 520, 'debt_ratio': 0.3}, 35, now=70)
+        monitor.close()
+        drifting = monitor.check()
+
+        assert set(drifting) == {'credit_score', 'score'}
+        assert monitor.report()['debt_ratio']['psi'] == 0.0
+        warnings = database.execute_query(
+            "SELECT operation FROM log_monitoring WHERE warning_type = 'Data drift'")
+        assert sorted(w[0] for w in warnings) == ['Drift detected: credit_score', 'Drift detected: score']
+        # The closed window was written once per feature
+        assert len(DriftSnapshotModel.get_window_snapshots(0)) == len(drift_monitor.BIN_EDGES)
+
+    def test_concurrent_checks_alert_once_with_distinct_ids(self, sqlite_db):
+        """Test racing checks raise one warning per feature, each with its own log id"""
+        database.init_database()
+        monitor = drift_monitor.DriftMonitor(window_seconds=60, windows=1, min_samples=50)
+        for _ in range(100):
+            monitor.observe({'credit_score': 720, 'debt_ratio': 0.3}, 85, now=10)
+        assert monitor.set_baseline()
+        for _ in range(100):
+            monitor.observe({'credit_score': 520, 'debt_ratio': 0.3}, 35, now=70)
+        monitor.close()
+
+        threads = [threading.Thread(target=monitor.check) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        log_ids = [row[0] for row in database.execute_query(
+            "SELECT log_id FROM log_monitoring WHERE warning_type = 'Data drift'")]
+        assert len(log_ids) == 2
+        assert len(set(log_ids)) == 2
+
+    def test_report_from_persisted_snapshots(self, sqlite_db):
+        """Test the on-demand report used by other processes"""
+        database.init_database()
+        monitor = drift_monitor.DriftMonitor(window_seconds=60, windows=5)
+        for minute in range(3):
+            for _ in range(10):
+                monitor.observe({'credit_score': 700}, 80, now=minute * 60)
+        # Rolling over already queued the two closed windows; the open one is persisted on demand
+        monitor.close()
+        assert monitor.persist() == 0
+        assert monitor.persist(120) == 1
+        assert monitor.persist(120) == 0
+        monitor.set_baseline()
+
+        report, current = drift_monitor.drift_report_from_snapshots(windows=5, window_seconds=60, now=180)
+
+        assert current['credit_score'][drift_monitor.bin_index('credit_score', 700)] == 30
+        assert report['credit_score']['psi'] == pytest.approx(0.0)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,98 @@
+"""
+Tests for time-bucketed log rollups
+"""
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project code'))
+
+from Client.models import database
+from Client.models.risk_control_model import LogMonitoringModel, LogRollupModel
+
+
+class TestLogRollups:
+    """Test incremental rollups, series and backfill"""
+
+    def test_add_log_updates_every_granularity(self, sqlite_db):
+        """Test one log row is counted in its minute, hour and day buckets"""
+        database.init_database()
+        LogMonitoringModel.add_log(1, 'system', 'Drift detected', error_info='PSI=0.4',
+                                   is_warning=1, warning_type='Data drift')
+        LogMonitoringModel.add_log(2, 'alice', 'Add rule')
+
+        now = datetime.now()
+        for granularity in ('minute', 'hour', 'day'):
+            series = LogRollupModel.get_series('logs', granularity, now, now)
+            assert series['series'] == {'': [2]}
+        assert LogRollupModel.warnings_by_type(now, now)['series'] == {'Data drift': [1]}
+        assert LogRollupModel.errors_by_operator(now, now)['series'] == {'system': [1]}
+
+    def test_series_are_zero_filled(self):
+        """Test buckets without rollups are plotted as zero"""
+        start = datetime(2025, 4, 1, 9, 30)
+        assert LogRollupModel._buckets('hour', start, start + timedelta(hours=2)) == [
+            '2025-04-01 09:00:00', '2025-04-01 10:00:00', '2025-04-01 11:00:00']
+
+    def test_pending_backlog_over_time(self, sqlite_db):
+        """Test the backlog rises with new warnings and falls when they are done"""
+        database.init_database()
+        earlier = datetime.now() - timedelta(hours=2)
+        # Two warnings raised two hours ago (rollups written as of then)
+        for log_id in (10, 11):
+            database.execute_update(
+                "INSERT INTO log_monitoring (log_id, operator, operation, is_warning, is_done, warning_type, create_time) "
+                "VALUES (?, 'system', 'check', 1, 0, 'Test', ?)", (log_id, earlier.date()))
+            LogRollupModel.record_log('system', is_warning=1, warning_type='Test', moment=earlier)
+        LogMonitoringModel.add_log(12, 'system', 'check', is_warning=1, warning_type='Test')
+        assert LogMonitoringModel.mark_as_done(10)
+
+        backlog = LogRollupModel.pending_backlog(earlier, datetime.now())
+        assert backlog['series'][''] == [2, 2, 2]
+
+    def test_backfill_only_fills_older_days(self, sqlite_db):
+        """Test history gets day buckets once and live buckets are left alone"""
+        database.init_database()
+        rows = [(i, 'bob', 'old', 'boom' if i % 2 else '', 1, i % 3 == 0, 'Legacy', f'2025-03-0{1 + i % 3}')
+                for i in range(9)]
+        database.execute_many(
+            "INSERT INTO log_monitoring (log_id, operator, operation, error_info, is_warning, is_done, "
+            "warning_type, create_time) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        LogMonitoringModel.add_log(100, 'alice', 'today')
+
+        assert LogRollupModel.backfill() == 9
+        assert LogRollupModel.backfill() == 0
+
+        start, end = datetime(2025, 3, 1), datetime(2025, 3, 3)
+        assert LogRollupModel.get_series('logs', 'day', start, end)['series'] == {'': [3, 3, 3]}
+        assert LogRollupModel.errors_by_operator(start, end)['series'] == {'bob': [1, 2, 1]}
+        today = datetime.now()
+        assert LogRollupModel.get_series('logs', 'day', today, today)['series'] == {'': [1]}
+
+    def test_backfill_counts_logs_from_before_the_first_bucket(self, sqlite_db):
+        """Test logs written on the first rollup day before rollups started are counted once"""
+        database.init_database()
+        database.execute_update(
+            "INSERT INTO log_monitoring (log_id, operator, operation, is_warning, is_done, warning_type, create_time) "
+            "VALUES (1, 'bob', 'old', 0, 1, '', ?)", (datetime.now().date(),))
+        LogMonitoringModel.add_log(2, 'alice', 'today')
+
+        assert LogRollupModel.backfill() == 1
+        assert LogRollupModel.backfill() == 0
+        today = datetime.now()
+        assert LogRollupModel.get_series('logs', 'day', today, today)['series'] == {'': [2]}
+
+    def test_rollup_failure_keeps_the_log_row(self, sqlite_db, monkeypatch):
+        """Test a failed rollup update does not roll back the log insert"""
+        database.init_database()
+        monkeypatch.setattr(LogRollupModel, 'UPSERT', "INSERT INTO missing_table VALUES (?, ?, ?, ?, ?)")
+
+        assert LogMonitoringModel.add_log(3, 'alice', 'Add rule')
+        assert database.execute_query("SELECT COUNT(*) FROM log_monitoring WHERE log_id = 3",
+                                      read_your_writes=True)[0][0] == 1
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,74 @@
+"""
+Tests for incremental log polling
+"""
+import pytest
+import threading
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project code'))
+
+from Client.models import database
+from Client.models.log_tail import LogTailer
+from Client.models.risk_control_model import LogMonitoringModel
+
+
+def add_logs(count, is_warning=0):
+    for i in range(count):
+        LogMonitoringModel.add_log(log_id=i, operator='system', operation=f"event {i}",
+                                   is_warning=is_warning, warning_type="Test" if is_warning else "")
+
+
+class TestLogTailer:
+    """Test polling for rows above the last seen id"""
+
+    def test_only_new_rows_are_returned(self, sqlite_db):
+        """Test existing rows are skipped and each new row is returned once"""
+        database.init_database()
+        add_logs(5)
+        tailer = LogTailer(batch_size=3)
+        assert tailer.poll() == []
+
+        add_logs(4)
+        first = tailer.poll()
+        assert [row[3] for row in first] == ['event 0', 'event 1', 'event 2']
+        assert tailer.interval == 0
+        second = tailer.poll()
+        assert [row[3] for row in second] == ['event 3']
+        assert tailer.interval == tailer.min_interval
+        assert tailer.poll() == []
+
+    def test_backoff_while_idle(self, sqlite_db):
+        """Test the interval doubles up to the maximum and resets on new rows"""
+        database.init_database()
+        tailer = LogTailer(min_interval_ms=100, max_interval_ms=500)
+        intervals = []
+        for _ in range(4):
+            tailer.poll()
+            intervals.append(tailer.interval)
+        assert intervals == [0.2, 0.4, 0.5, 0.5]
+        add_logs(1)
+        tailer.poll()
+        assert tailer.interval == 0.1
+
+    def test_follow_streams_warnings(self, sqlite_db):
+        """Test follow() only reports warnings and stops on request"""
+        database.init_database()
+        tailer = LogTailer(warnings_only=True, min_interval_ms=10, max_interval_ms=10)
+        add_logs(3)
+        add_logs(2, is_warning=1)
+        received = []
+        stop = threading.Event()
+
+        def collect(rows):
+            received.extend(rows)
+            stop.set()
+
+        tailer.follow(collect, stop)
+        assert len(received) == 2
+        assert all(row[6] == 1 for row in received)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,236 @@
+"""
+Tests for the queued logging pipeline
+"""
+import logging
+import queue
+import time
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project code'))
+
+from Client.utils import logger as logger_module
+from Client.utils.logger import (
+    BoundedQueueHandler, GroupCommitFileHandler, JSONFormatter, LogQueue, SecurityFilter,
+    timed, timing, verify_audit_chain
+)
+from Client.utils.metrics import get_registry
+
+
+class CollectingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+
+
+def make_record(msg, level=logging.INFO, args=None):
+    return logging.LogRecord('test', level, __file__, 1, msg, args, None)
+
+
+class TestLogQueue:
+    """Test the bounded queue handler and its listener"""
+
+    def test_full_queue_drops_and_counts(self):
+        """Test the drop policy never blocks the caller"""
+        handler = BoundedQueueHandler(queue.Queue(2), overflow='drop')
+        for i in range(5):
+            handler.handle(make_record(f"message {i}"))
+        assert handler.queue.qsize() == 2
+        assert handler.dropped == 3
+
+    def test_message_rendered_on_caller(self):
+        """Test arguments are merged before the record crosses threads"""
+        handler = BoundedQueueHandler(queue.Queue(1))
+        handler.handle(make_record("user %s", args=('alice',)))
+        record = handler.queue.get_nowait()
+        assert record.msg == "user alice"
+        assert record.args is None
+
+    def test_stop_flushes_queued_records(self):
+        """Test shutdown writes out every queued record"""
+        target = CollectingHandler()
+        log_queue = LogQueue([target], maxsize=100, overflow='block')
+        for i in range(50):
+            log_queue.handler.handle(make_record(f"message {i}"))
+        log_queue.stop()
+        assert target.messages == [f"message {i}" for i in range(50)]
+        # Stopping twice is harmless
+        log_queue.stop()
+
+
+class TestSecurityFilter:
+    """Test redaction of values after sensitive keys"""
+
+    def test_redacts_only_values(self):
+        """Test the rest of the line survives redaction"""
+        redact = SecurityFilter.redact
+        assert redact("login ok password=hunter2 from 10.0.0.1") == "login ok password=[FILTERED] from 10.0.0.1"
+        assert redact('{"api_key": "abc def", "user": "bob"}') == '{"api_key": "[FILTERED]", "user": "bob"}'
+        assert redact("Authorization: Bearer eyJ.x.y") == "Authorization: Bearer [FILTERED]"
+        assert redact("accessToken=1 monkey=2") == "accessToken=[FILTERED] monkey=2"
+
+    def test_plain_text_untouched(self):
+        """Test messages that only mention a key are kept"""
+        message = "password reset requested by author bob"
+        assert SecurityFilter.redact(message) is message
+
+    def test_filters_args_and_extra_fields(self):
+        """Test %-args and extra= fields are covered"""
+        record = make_record("login %s token=%s", args=('alice', 's3cr3t'))
+        record.session_token = 's3cr3t'
+        record.detail = 'secret: xyz'
+        record.user_id = 'alice'
+        assert SecurityFilter().filter(record)
+        assert record.getMessage() == "login alice token=[FILTERED]"
+        assert record.session_token == '[FILTERED]'
+        assert record.detail == 'secret: [FILTERED]'
+        assert record.user_id == 'alice'
+
+
+class TestGroupCommitFileHandler:
+    """Test batched audit writes and the hash chain"""
+
+    def make_handler(self, path, **options):
+        handler = GroupCommitFileHandler(str(path), hash_chain=True, **options)
+        handler.setFormatter(JSONFormatter())
+        return handler
+
+    def test_records_written_in_groups(self, tmp_path):
+        """Test a full group is committed and the rest waits for flush"""
+        path = tmp_path / 'audit.log'
+        handler = self.make_handler(path, fsync_every=10, fsync_interval_ms=60000)
+        for i in range(25):
+            handler.handle(make_record(f"action {i}"))
+        assert handler.commits == 2
+        assert len(path.read_text().splitlines()) == 20
+        handler.close()
+        assert len(path.read_text().splitlines()) == 25
+
+    def test_interval_commits_partial_group(self, tmp_path):
+        """Test a lone record is committed after fsync_interval_ms"""
+        path = tmp_path / 'audit.log'
+        handler = self.make_handler(path, fsync_every=100, fsync_interval_ms=10)
+        handler.handle(make_record("lonely"))
+        for _ in range(100):
+            if path.read_text():
+                break
+            time.sleep(0.01)
+        assert 'lonely' in path.read_text()
+        handler.close()
+
+    def test_hash_chain_detects_tampering(self, tmp_path):
+        """Test the chain verifies, continues after reopening and breaks on edits"""
+        path = tmp_path / 'audit.log'
+        handler = self.make_handler(path, fsync_every=5)
+        for i in range(7):
+            handler.handle(make_record(f"action {i}"))
+        handler.close()
+        handler = self.make_handler(path, fsync_every=5)
+        handler.handle(make_record("after restart"))
+        handler.close()
+
+        ok, records, last_hash, bad_line = verify_audit_chain(str(path))
+        assert ok and records == 8 and bad_line is None
+
+        lines = path.read_text().splitlines()
+        lines[3] = lines[3].replace('action 3', 'action 9')
+        path.write_text('\n'.join(lines) + '\n')
+        ok, records, _, bad_line = verify_audit_chain(str(path))
+        assert not ok
+        assert records == 3 and bad_line == 4
+
+    def test_audit_loggers_share_one_writer(self, tmp_path, monkeypatch):
+        """Test every AuditLogger goes through one queue and commit thread"""
+        path = tmp_path / 'audit.log'
+        monkeypatch.setattr(logger_module.current_config, 'AUDIT_LOG_FILE', str(path), raising=False)
+        monkeypatch.setattr(logger_module, '_AUDIT_QUEUE', None)
+        first = logger_module.AuditLogger('audit.shared')
+        second = logger_module.AuditLogger('audit.shared')
+        other = logger_module.AuditLogger('audit.other')
+        assert first.log_queue is second.log_queue is other.log_queue
+        assert first.logger.handlers.count(first.log_queue.handler) == 1
+
+        first.log_user_action('1', 'login')
+        other.log_security_event('lockout', 'too many attempts')
+        first.log_queue.stop()
+        for handler in first.log_queue.handlers:
+            handler.close()
+        first.logger.removeHandler(first.log_queue.handler)
+        other.logger.removeHandler(other.log_queue.handler)
+        assert len(path.read_text().splitlines()) == 2
+
+
+if __name__ == '__main__':
+    import pytest
+    pytest.main([__file__])
+
+
+def timed_count(name):
+    for labels, counts in get_registry().snapshot()['function_duration_seconds']['samples']:
+        if labels == [name]:
+            return sum(counts[:-1])
+    return 0
+
+
+class TestTimed:
+    """Test call timing into function_duration_seconds"""
+
+    def test_function_and_block_are_timed(self):
+        """Test every call and block is observed under its name"""
+        @timed
+        def work(x):
+            return x * 2
+
+        name = work.__qualname__
+        assert work(2) == 4 and work(3) == 6
+        assert timed_count(name) == 2
+        with timing('test.block'):
+            pass
+        assert timed_count('test.block') == 1
+
+    def test_class_public_methods_are_wrapped(self):
+        """Test static, class and instance methods are timed and private ones left alone"""
+        @timed
+        class Model:
+            @staticmethod
+            def fetch():
+                return 'rows'
+
+            @classmethod
+            def build(cls):
+                return cls.__name__
+
+            def count(self):
+                return 1
+
+            def _helper(self):
+                return 2
+
+        assert Model.fetch() == 'rows' and Model.build() == 'Model' and Model().count() == 1
+        assert Model()._helper() == 2
+        assert timed_count('Model.fetch') == timed_count('Model.build') == timed_count('Model.count') == 1
+        assert not getattr(Model._helper, '__timed__', False)
+
+    def test_sample_rate_and_slow_calls(self, monkeypatch):
+        """Test unsampled calls are not observed and slow calls are logged"""
+        slow = []
+        monkeypatch.setattr(logger_module, '_log_slow_call', lambda name, elapsed: slow.append(name))
+        skipped = timed(lambda: None, name='test.unsampled', sample_rate=0.0)
+        sleeper = timed(lambda: time.sleep(0.002), name='test.slow', slow_ms=1)
+        skipped()
+        sleeper()
+        assert timed_count('test.unsampled') == 0
+        assert slow == ['test.slow']
+
+    def test_disabled_instrumentation_leaves_target_unwrapped(self, monkeypatch):
+        """Test the kill switch returns the original function"""
+        monkeypatch.setattr(logger_module, 'INSTRUMENTATION_ENABLED', False)
+
+        def work():
+            return 1
+
+        assert timed(work) is work
@@ -0,0 +1,171 @@
+"""
+Tests for the metrics registry and Prometheus exposition
+"""
+import pytest
+import json
+import threading
+import urllib.request
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project code'))
+
+from Client.models import database
+from Client.utils import metrics
+from Client.utils.metrics import MetricsRegistry, render_text, merge_snapshot_files
+
+
+class TestMetricsRegistry:
+    """Test recording and rendering samples"""
+
+    def test_counter_gauge_and_histogram_render(self):
+        """Test the text format of each metric type"""
+        registry = MetricsRegistry()
+        logins = registry.counter('login_attempts_total', 'Login attempts', ('result',))
+        logins.labels('success').inc()
+        logins.labels('success').inc(2)
+        registry.gauge('idle', 'Idle connections').set(3)
+        latency = registry.histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 7):
+            latency.observe(value)
+
+        text = registry.render(directory='')
+        assert '# TYPE login_attempts_total counter' in text
+        assert 'login_attempts_total{result="success"} 3' in text
+        assert 'idle 3' in text
+        assert 'latency_seconds_bucket{le="0.1"} 2' in text
+        assert 'latency_seconds_bucket{le="1.0"} 3' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 4' in text
+        assert 'latency_seconds_count 4' in text
+        assert 'latency_seconds_sum 7.65' in text
+
+    def test_registration_is_idempotent(self):
+        """Test declaring a metric twice returns the same object and conflicts are rejected"""
+        registry = MetricsRegistry()
+        counter = registry.counter('events_total', 'Events')
+        assert registry.counter('events_total', 'Events') is counter
+        with pytest.raises(ValueError):
+            registry.gauge('events_total', 'Events')
+        with pytest.raises(ValueError):
+            counter.inc(-1)
+        with pytest.raises(ValueError):
+            registry.counter('labelled_total', 'Labelled', ('kind',)).inc()
+
+    def test_label_values_are_escaped(self):
+        """Test quotes, backslashes and newlines in label values"""
+        registry = MetricsRegistry()
+        registry.counter('checks_total', 'Checks', ('value',)).labels('a"b\\c\nd').inc()
+        assert 'checks_total{value="a\\"b\\\\c\\nd"} 1' in registry.render(directory='')
+
+    def test_concurrent_increments_are_not_lost(self):
+        """Test many threads incrementing one counter"""
+        registry = MetricsRegistry()
+        counter = registry.counter('hits_total', 'Hits')
+
+        def work():
+            for _ in range(10000):
+                counter.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert registry.snapshot()['hits_total']['samples'] == [[[], 80000]]
+
+
+class TestMultiprocess:
+    """Test merging snapshots written by several processes"""
+
+    def test_snapshot_files_are_merged(self, tmp_path):
+        """Test counters and histograms add up and gauges follow their mode"""
+        for pid, count, connections in ((os.getpid(), 2, 1), (os.getppid(), 3, 4)):
+            registry = MetricsRegistry()
+            registry.counter('requests_total', 'Requests', ('path',)).labels('/metrics').inc(count)
+            registry.gauge('connections', 'Held').set(connections)
+            registry.gauge('peak', 'Peak', multiprocess_mode='max').set(connections)
+            registry.histogram('latency_seconds', 'Latency', buckets=(1.0,)).observe(count)
+            with open(tmp_path / f"metrics_{pid}.json", 'w') as f:
+                json.dump(registry.snapshot(), f)
+
+        text = render_text(merge_snapshot_files(str(tmp_path)))
+        assert 'requests_total{path="/metrics"} 5' in text
+        assert 'connections 5' in text
+        assert 'peak 4' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 2' in text
+        assert 'latency_seconds_sum 5.0' in text
+
+    def test_gauges_of_exited_processes_are_dropped(self, tmp_path):
+        """Test a dead worker's counters are kept but its gauges are not"""
+        registry = MetricsRegistry()
+        registry.counter('requests_total', 'Requests').inc(7)
+        registry.gauge('connections', 'Held').set(2)
+        dead_pid = 2 ** 22 + 1
+        with open(tmp_path / f"metrics_{dead_pid}.json", 'w') as f:
+            json.dump(registry.snapshot(), f)
+
+        merged = merge_snapshot_files(str(tmp_path))
+        assert merged['requests_total']['samples'] == [[[], 7]]
+        assert merged['connections']['samples'] == []
+
+    @pytest.mark.skipif(not hasattr(os, 'fork'), reason="requires fork")
+    def test_forked_child_starts_from_zero(self, tmp_path):
+        """Test a pre-forked worker does not re-count its parent's samples"""
+        counter = metrics.get_registry().counter('fork_test_total', 'Fork test')
+        counter.inc(5)
+        pid = os.fork()
+        if pid == 0:
+            counter.inc()
+            metrics.get_registry().dump(str(tmp_path))
+            os._exit(0)
+        os.waitpid(pid, 0)
+        with open(tmp_path / f"metrics_{pid}.json") as f:
+            assert json.load(f)['fork_test_total']['samples'] == [[[], 1]]
+
+
+class TestExposition:
+    """Test the text file and HTTP endpoint"""
+
+    def test_write_textfile(self, tmp_path):
+        """Test the file is written in full"""
+        registry = MetricsRegistry()
+        registry.counter('events_total', 'Events').inc()
+        path = metrics.write_textfile(str(tmp_path / 'metrics.prom'), registry, directory='')
+        with open(path) as f:
+            assert 'events_total 1' in f.read()
+
+    def test_http_endpoint(self):
+        """Test /metrics is served and other paths are 404"""
+        registry = MetricsRegistry()
+        registry.counter('events_total', 'Events').inc()
+        server = metrics.start_http_server(0, '127.0.0.1', registry)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}"
+            with urllib.request.urlopen(f"{url}/metrics") as response:
+                assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+                assert 'events_total 1' in response.read().decode('utf-8')
+            with pytest.raises(urllib.error.HTTPError):
+                urllib.request.urlopen(f"{url}/other")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class TestInstrumentation:
+    """Test metrics recorded by the application"""
+
+    def test_pool_metrics(self, sqlite_db):
+        """Test connections opened and pool waits are recorded per target"""
+        def samples(name):
+            return dict((tuple(labels), value) for labels, value
+                        in metrics.get_registry().snapshot()[name]['samples'])
+
+        database.execute_query("SELECT 1")
+        opened = samples('db_connections_opened_total')[('primary',)]
+        waits = sum(samples('db_pool_wait_seconds')[('primary',)][:-1])
+
+        database.execute_query("SELECT 1")
+        assert samples('db_connections_opened_total')[('primary',)] == opened
+        assert sum(samples('db_pool_wait_seconds')[('primary',)][:-1]) == waits + 1
+        assert samples('db_pool_idle_connections')[('primary',)] == 1
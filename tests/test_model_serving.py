@@ -0,0 +1,225 @@
+"""
+Tests for the model serving cache
+"""
+import pickle
+import pytest
+import threading
+import time
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project code'))
+
+from Client.models import database, model_serving, shadow_scoring
+from Client.models.model_management_model import ModelManagementModel, ShadowScoreModel
+
+
+class ThresholdModel:
+    """Picklable stand-in for a trained classifier"""
+
+    loads = 0
+    calls = 0
+
+    def __init__(self, probability):
+        self.probability = probability
+
+    def __setstate__(self, state):
+        ThresholdModel.loads += 1
+        self.__dict__.update(state)
+
+    def predict_proba(self, rows):
+        ThresholdModel.calls += 1
+        return [[1 - self.probability, self.probability] for _ in rows]
+
+
+def _add_model(name, version, probability, environment='production', verified=1, rollback=0):
+    ModelManagementModel.add_model(
+        1, name, pickle.dumps(ThresholdModel(probability)), version, environment,
+        'admin', 'manager', verified=verified, rollback=rollback)
+    return database.execute_query("SELECT MAX(id) FROM model_management")[0][0]
+
+
+class TestModelCache:
+    """Test lazy loading, LRU eviction and invalidation"""
+
+    def test_only_verified_production_models_are_served(self, sqlite_db):
+        """Test the serving filter and newest-version default"""
+        database.init_database()
+        _add_model('pd', '1', 0.1)
+        _add_model('pd', '2', 0.2)
+        _add_model('pd', '3', 0.3, verified=0)
+        _add_model('staging', '1', 0.5, environment='testing')
+
+        cache = model_serving.get_model_cache()
+        assert cache.get('pd').probability == 0.2
+        assert cache.get('pd', '1').probability == 0.1
+        assert cache.get('pd', '3') is None
+        assert cache.get('staging') is None
+
+    def test_models_are_deserialized_once(self, sqlite_db):
+        """Test that repeated scoring reuses the cached model"""
+        database.init_database()
+        _add_model('pd', '1', 0.25)
+        ThresholdModel.loads = 0
+
+        scores = [model_serving.score_applicant({'credit_score': 700}, 'pd') for _ in range(5)]
+
+        assert scores == [75.0] * 5
+        assert ThresholdModel.loads == 1
+        assert model_serving.get_model_cache().stats()['hits'] == 4
+
+    def test_lru_eviction_and_warm(self, sqlite_db):
+        """Test warming at startup and eviction beyond max_entries"""
+        database.init_database()
+        for name in ('a', 'b', 'c'):
+            _add_model(name, '1', 0.1)
+
+        cache = model_serving.get_model_cache()
+        assert cache.warm() == 2
+        cache.get('a')
+        assert cache.stats()['entries'] == 2
+        assert cache.stats()['evictions'] == 1
+
+    def test_rollback_invalidates_served_model(self, sqlite_db):
+        """Test that a rollback through the controller stops serving the model"""
+        from Client.controllers.model_management_controller import ModelManagementController
+        database.init_database()
+        model_id = _add_model('pd', '1', 0.1)
+        cache = model_serving.get_model_cache()
+        assert cache.get('pd') is not None
+
+        assert ModelManagementController('admin').toggle_rollback(model_id, True)
+
+        assert cache.stats()['entries'] == 0
+        assert cache.get('pd') is None
+        assert model_serving.score_applicant({}, 'pd') is None
+
+
+class TestBatchInference:
+    """Test the batched model inference stage"""
+
+    def test_batch_is_scored_with_one_model_call(self, sqlite_db):
+        """Test that score_batch builds one feature matrix per batch"""
+        database.init_database()
+        _add_model('pd', '1', 0.4)
+        ThresholdModel.calls = 0
+
+        scores = model_serving.score_batch([{'credit_score': s} for s in range(50)], 'pd')
+
+        assert scores == [60.0] * 50
+        assert ThresholdModel.calls == 1
+
+    def test_concurrent_requests_share_a_batch(self, sqlite_db):
+        """Test that requests arriving within max_wait_ms are scored together"""
+        database.init_database()
+        _add_model('pd', '1', 0.1)
+        scorer = model_serving.BatchScorer('pd', max_batch_size=8, max_wait_ms=200)
+        scorer.score({})  # load the model outside the measured batches
+        ThresholdModel.calls = 0
+
+        results = [None] * 8
+        def request(i):
+            results[i] = scorer.score({'credit_score': 600 + i})
+        threads = [threading.Thread(target=request, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert results == [90.0] * 8
+        assert ThresholdModel.calls == 1
+        assert scorer.scored == 9
+
+    def test_no_batching_without_wait_or_model(self, sqlite_db):
+        """Test that max_wait_ms=0 and a missing model score inline"""
+        database.init_database()
+        assert model_serving.BatchScorer('missing', max_wait_ms=0).score({}) is None
+        assert model_serving.BatchScorer(None).score({}) is None
+
+    def test_scores_are_blended_by_weight(self, monkeypatch):
+        """Test the configurable rule/model weights"""
+        monkeypatch.setattr(model_serving, 'RULE_SCORE_WEIGHT', 3)
+        monkeypatch.setattr(model_serving, 'MODEL_SCORE_WEIGHT', 1)
+        assert model_serving.blend_scores(80, 40) == 70.0
+        assert model_serving.blend_scores(80, None) == 80
+
+    def test_controller_scores_applications_in_one_batch(self, sqlite_db, monkeypatch):
+        """Test RiskControlController.evaluate_loan_applications"""
+        from Client.controllers.risk_control_controller import RiskControlController
+        database.init_database()
+        _add_model('pd', '1', 0.0)
+        monkeypatch.setattr(model_serving, 'SCORING_MODEL_NAME', 'pd')
+        ThresholdModel.calls = 0
+        applicants = [{
+            'name': f'Applicant {i}', 'id': str(i), 'loan_purpose': 'Consumer Loan',
+            'loan_amount': 1000, 'credit_score': 700, 'overdue_count': 0,
+            'max_overdue_days': 0, 'debt_ratio': 0.1, 'has_mortgage': False, 'has_car_loan': False,
+        } for i in range(3)]
+
+        results = RiskControlController('admin').evaluate_loan_applications(applicants)
+
+        assert ThresholdModel.calls == 1
+        assert [r['model_score'] for r in results] == [100.0] * 3
+        assert all(r['approved'] for r in results)
+
+
+class TestShadowScoring:
+    """Test challenger scoring off the request path"""
+
+    def test_challengers_are_recorded_next_to_champion(self, sqlite_db):
+        """Test batched writes of champion/challenger score pairs"""
+        database.init_database()
+        _add_model('pd', '1', 0.2)
+        _add_model('pd', '2', 0.5, environment='testing', verified=0)
+        _add_model('pd', '3', 0.9, environment='testing', verified=0, rollback=1)
+        scorer = shadow_scoring.ShadowScorer('pd', write_batch_size=1000)
+
+        applicants = [{'id': str(i), 'credit_score': 700} for i in range(4)]
+        assert scorer.submit(applicants, model_serving.score_batch(applicants, 'pd'))
+        assert scorer.submit(applicants[:1], [None]) is False
+        scorer.close()
+
+        assert scorer.stats()['written'] == 4
+        comparison = ShadowScoreModel.get_comparison('pd')
+        assert len(comparison) == 1
+        name, champion_version, challenger_version, samples, champion_avg, challenger_avg, diff, _ = comparison[0]
+        assert (champion_version, challenger_version, samples) == ('1', '2', 4)
+        assert (champion_avg, challenger_avg, diff) == (80.0, 50.0, 30.0)
+
+    def test_idle_buffer_is_flushed_after_interval(self, sqlite_db):
+        """Test buffered results are written without another submit or close"""
+        database.init_database()
+        _add_model('pd', '1', 0.2)
+        _add_model('pd', '2', 0.5, environment='testing', verified=0)
+        scorer = shadow_scoring.ShadowScorer('pd', write_batch_size=1000, flush_interval=0.05)
+
+        applicants = [{'id': str(i), 'credit_score': 700} for i in range(2)]
+        assert scorer.submit(applicants, model_serving.score_batch(applicants, 'pd'))
+        for _ in range(200):
+            if scorer.stats()['written']:
+                break
+            time.sleep(0.01)
+        assert scorer.stats()['written'] == 2
+        scorer.close()
+
+    def test_saturated_pool_drops_work(self, sqlite_db, monkeypatch):
+        """Test that submit never blocks and counts dropped applications"""
+        database.init_database()
+        _add_model('pd', '1', 0.2)
+        release = threading.Event()
+        monkeypatch.setattr(shadow_scoring.ModelManagementModel, 'get_challenger_models',
+                            lambda *args: release.wait(5) and [])
+        scorer = shadow_scoring.ShadowScorer('pd', max_workers=1, max_pending=1)
+
+        assert scorer.submit([{'id': '1'}], [80.0])
+        assert not scorer.submit([{'id': '2'}, {'id': '3'}], [80.0, 70.0])
+        release.set()
+        scorer.close()
+
+        stats = scorer.stats()
+        assert (stats['submitted'], stats['dropped']) == (1, 2)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,145 @@
+"""
+Tests for login-time password hash upgrades and the offline migration
+"""
+import pytest
+import hashlib
+import threading
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project code'))
+
+from Client.models import database, password_migration
+from Client.models.password_migration import PasswordRehasher, migrate_plaintext_passwords
+from Client.models.user_model import UserModel
+from Client.utils.security import PasswordManager
+
+CSV_PATH = os.path.join(os.path.dirname(__file__), '..', 'project code', 'CSV')
+
+
+@pytest.fixture
+def users_db(sqlite_db, monkeypatch):
+    """Seed users (plaintext passwords) from the CSV exports with a fresh rehasher"""
+    database.init_database(CSV_PATH)
+    rehasher = PasswordRehasher()
+    monkeypatch.setattr(password_migration, 'PASSWORD_REHASHER', rehasher)
+    yield rehasher
+    # Finish queued upgrades before the next test points the database elsewhere
+    rehasher.join()
+
+
+def stored_password(username):
+    return database.execute_query("SELECT password FROM users WHERE username = ?",
+                                  (username,), read_your_writes=True)[0][0]
+
+
+class TestLoginRehash:
+    """Test outdated passwords are upgraded after a successful login"""
+
+    def test_plaintext_login_is_upgraded(self, users_db):
+        """Test a plaintext row still logs in and is replaced by a hash"""
+        assert UserModel.authenticate('admin', 'wrong') is None
+        assert stored_password('admin') == 'adminpass'
+
+        assert UserModel.authenticate('admin', 'adminpass') is True
+        users_db.join()
+        stored = stored_password('admin')
+        assert PasswordManager.hash_format(stored) != 'plaintext'
+        assert not PasswordManager.needs_rehash(stored)
+        assert users_db.stats()['rehashed'] == 1
+
+        assert UserModel.authenticate('admin', 'adminpass') is True
+        assert UserModel.authenticate('admin', 'wrong') is None
+        users_db.join()
+        assert stored_password('admin') == stored
+
+    def test_legacy_sha256_is_upgraded(self, users_db):
+        """Test a bare sha256 hash is accepted once and then replaced"""
+        legacy = hashlib.sha256(b'user2pass').hexdigest()
+        database.execute_update("UPDATE users SET password = ? WHERE username = ?", (legacy, 'user2'))
+
+        assert UserModel.authenticate('user2', 'user2pass') is False
+        users_db.join()
+        assert PasswordManager.hash_format(stored_password('user2')) != 'sha256'
+
+    def test_hex_like_plaintext_is_upgraded(self, users_db):
+        """Test a plaintext password that looks like a sha256 digest still logs in"""
+        hex_password = hashlib.sha256(b'seed').hexdigest()
+        database.execute_update("UPDATE users SET password = ? WHERE username = ?", (hex_password, 'user3'))
+        assert migrate_plaintext_passwords(workers=1)['deferred'] == 1
+
+        assert UserModel.authenticate('user3', hex_password) is False
+        users_db.join()
+        assert PasswordManager.verify_password(hex_password, stored_password('user3'))
+
+    def test_new_passwords_are_hashed_on_the_pool(self, users_db):
+        """Test the user controller stores hashes, never the password"""
+        from Client.controllers.user_controller import UserController
+        controller = UserController('admin')
+        future = controller.submit_password_hash('Secret123!')
+        assert controller.add_user('carol', 'Secret123!', 0, 'Carol', 'c@example.com', '1',
+                                   password_hash=future.result(timeout=30))
+        assert PasswordManager.verify_password('Secret123!', stored_password('carol'))
+
+        user_id = database.execute_query("SELECT id FROM users WHERE username = 'carol'")[0][0]
+        assert controller.update_user(user_id, 'carol', 'Other456!', 0, 'Carol', 'c@example.com', '1')
+        assert PasswordManager.verify_password('Other456!', stored_password('carol'))
+        assert controller.update_user(user_id, 'carol', '', 1, 'Carol', 'c@example.com', '1')
+        assert PasswordManager.verify_password('Other456!', stored_password('carol'))
+
+    def test_changed_password_is_not_overwritten(self, users_db):
+        """Test the upgrade is skipped if the row changed after verification"""
+        database.execute_update("UPDATE users SET password = ? WHERE username = ?", ('changed', 'user3'))
+        assert users_db.rehash('user3', 'user3pass', 'user3pass') is False
+        assert stored_password('user3') == 'changed'
+
+    def test_hash_formats(self):
+        """Test format detection and which formats need a rehash"""
+        assert PasswordManager.hash_format('adminpass') == 'plaintext'
+        assert PasswordManager.hash_format(hashlib.sha256(b'x').hexdigest()) == 'sha256'
+        assert PasswordManager.hash_format(PasswordManager.hash_password('x')) in ('bcrypt', 'sha256_salted')
+        assert PasswordManager.needs_rehash('adminpass')
+        assert not PasswordManager.verify_password('adminpass', 'adminpass')
+        assert PasswordManager.verify_password('adminpass', 'adminpass', allow_plaintext=True)
+
+
+class TestSubmitLogin:
+    """Test only the password check of a GUI login runs on the password pool"""
+
+    def test_database_work_stays_on_the_calling_thread(self, users_db, monkeypatch):
+        """Test credentials are read and the login logged outside the pool"""
+        from Client.controllers.admin_controller import AdminController
+        threads = []
+        get_db_cursor = database.get_db_cursor
+
+        def recording_cursor(*args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return get_db_cursor(*args, **kwargs)
+
+        monkeypatch.setattr(database, 'get_db_cursor', recording_cursor)
+
+        controller = AdminController()
+        future = controller.submit_login('admin', 'adminpass', True)
+        credentials, verified = future.result(timeout=30)
+        assert verified and credentials[0] == 1
+        assert controller.finish_login('admin', 'adminpass', True, credentials, verified)
+        assert not controller.finish_login('admin', 'wrong', True, *controller.submit_login(
+            'admin', 'wrong', True).result(timeout=30))
+        assert threads and not any(name.startswith('password-hash') for name in threads)
+        assert controller.login('user2', 'user2pass', False)
+        assert not controller.login('user2', 'user2pass', True)
+
+
+class TestMigration:
+    """Test the offline plaintext migration"""
+
+    def test_all_plaintext_rows_are_hashed(self, users_db):
+        """Test every row is hashed across processes and logins still work"""
+        plaintext = len(UserModel.get_password_rows())
+        stats = migrate_plaintext_passwords(workers=2, batch_size=2)
+        assert stats == {'plaintext': plaintext, 'migrated': plaintext, 'skipped': 0, 'deferred': 0}
+        assert all(PasswordManager.hash_format(password) != 'plaintext'
+                   for _, password in UserModel.get_password_rows())
+        assert UserModel.authenticate('user2', 'user2pass') is False
+        assert migrate_plaintext_passwords(workers=2)['plaintext'] == 0
@@ -0,0 +1,70 @@
+"""
+Tests for model version retention and database compaction
+"""
+import pytest
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project code'))
+
+from Client.models import database, artifact_store
+from Client.models.model_management_model import ModelManagementModel
+from Client.models.retention import run_retention
+
+
+def _add_version(name, version, environment='testing', verified=0):
+    ModelManagementModel.add_model(
+        1, name, f'{name}-{version}'.encode(), version, environment, 'admin', 'manager',
+        verified=verified)
+
+
+def _freelist_count():
+    return database.execute_query("PRAGMA freelist_count")[0][0]
+
+
+class TestRetention:
+    """Test the retention policy and incremental vacuum"""
+
+    def test_keeps_newest_verified_and_production(self, sqlite_db):
+        """Test which versions survive and that their artifacts are kept"""
+        database.init_database()
+        _add_version('pd', '1', environment='production')
+        _add_version('pd', '2', verified=1)
+        for version in ('3', '4', '5', '6'):
+            _add_version('pd', version)
+        _add_version('fraud', '1')
+
+        assert run_retention(keep=2, dry_run=True)['deleted'] == 0
+        stats = run_retention(keep=2, artifact_min_age=0)
+
+        assert stats['expired'] == stats['deleted'] == 2
+        assert stats['artifacts_pruned'] == 2
+        remaining = database.execute_query(
+            "SELECT model_name, model_version FROM model_management ORDER BY model_name, model_version")
+        assert remaining == [('fraud', '1'), ('pd', '1'), ('pd', '2'), ('pd', '5'), ('pd', '6')]
+        store = artifact_store.get_artifact_store()
+        for model_id, in database.execute_query("SELECT id FROM model_management"):
+            assert store.exists(ModelManagementModel.get_model_artifact(model_id).sha256)
+
+    def test_incremental_vacuum_is_bounded(self, sqlite_db):
+        """Test that each run releases at most max_steps * step_pages pages"""
+        database.init_database()
+        assert database.execute_query("PRAGMA auto_vacuum")[0][0] == 2
+        rows = [('pd', '1', i, '2', str(i), 50.0, 60.0) for i in range(20000)]
+        database.execute_many(
+            "INSERT INTO shadow_scores (model_name, champion_version, challenger_id, "
+            "challenger_version, applicant_ref, champion_score, challenger_score) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        database.execute_update("DELETE FROM shadow_scores")
+        free_pages = _freelist_count()
+        assert free_pages > 30
+
+        assert database.incremental_vacuum(step_pages=10, max_steps=3, pause=0) == 30
+        assert _freelist_count() == free_pages - 30
+        database.incremental_vacuum(step_pages=1000, pause=0)
+        assert _freelist_count() == 0
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
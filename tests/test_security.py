@@ -2,6 +2,7 @@
 Tests for security utilities
 """
 import pytest
+import asyncio
 import sys
 import os
 
@@ -9,8 +10,9 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project code'))
 
 from Client.utils.security import (
-    PasswordManager, InputValidator, SessionManager, 
-    hash_password, verify_password, validate_input, sanitize_input
+    PasswordManager, InputValidator, SessionManager, HAS_BCRYPT,
+    hash_password, verify_password, validate_input, sanitize_input,
+    hash_password_async, verify_password_async
 )
 
 
@@ -26,6 +28,40 @@ class TestPasswordManager:
         assert verify_password(password, hashed)
         assert not verify_password("wrong_password", hashed)
     
+    def test_pool_and_async_variants(self):
+        """Test hashing and verification on the password pool"""
+        futures = [PasswordManager.submit_hash_password(f"password-{i}") for i in range(4)]
+        hashes = [future.result(timeout=30) for future in futures]
+        assert PasswordManager.submit_verify_password("password-2", hashes[2]).result(timeout=30)
+        assert not PasswordManager.submit_verify_password("password-2", hashes[1]).result(timeout=30)
+
+        async def check():
+            hashed = await hash_password_async("TestPassword123!")
+            return await verify_password_async("TestPassword123!", hashed)
+
+        assert asyncio.run(check())
+
+    def test_bcrypt_cost_calibration(self):
+        """Test the cost is extrapolated from the probe, corrected once and clamped"""
+        # 1 ms at cost 4, doubling per step: 250 ms is reached at cost 12
+        def verify_ms(cost):
+            return 2.0 ** (cost - 4)
+
+        result = PasswordManager.calibrate_bcrypt_cost(target_ms=250, probe_cost=4, verify_ms=verify_ms)
+        assert result == {'cost': 12, 'verify_ms': 256.0, 'target_ms': 250}
+        # A probe that ran fast pushes the estimate one step too low; the check corrects it
+        probes = iter([0.5, 0.5, 0.5])
+        result = PasswordManager.calibrate_bcrypt_cost(
+            target_ms=250, probe_cost=4, verify_ms=lambda cost: next(probes, verify_ms(cost)))
+        assert result['cost'] == 12
+        assert PasswordManager.calibrate_bcrypt_cost(target_ms=10 ** 6, probe_cost=4,
+                                                     verify_ms=verify_ms)['cost'] == 16
+
+    @pytest.mark.skipif(not HAS_BCRYPT, reason="bcrypt not installed")
+    def test_hash_password_uses_rounds(self):
+        """Test hashes are made with the requested bcrypt cost"""
+        assert PasswordManager.hash_password("secret", rounds=5).startswith('$2b$05$')
+    
     def test_password_strength_validation(self):
         """Test password strength validation"""
         # Strong password
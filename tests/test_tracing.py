@@ -0,0 +1,102 @@
+"""
+Tests for local tracing spans
+"""
+import pytest
+import logging
+import queue
+import threading
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'project code'))
+
+from Client.models import database
+from Client.utils import tracing
+from Client.utils.logger import BoundedQueueHandler
+
+
+@pytest.fixture
+def exporter(tmp_path, monkeypatch):
+    """Enable tracing and export spans to a temporary file"""
+    exporter = tracing.SpanExporter(str(tmp_path / 'trace.json'))
+    monkeypatch.setattr(tracing, 'TRACING_ENABLED', True)
+    monkeypatch.setattr(tracing, 'TRACE_SAMPLE_RATE', 1.0)
+    monkeypatch.setattr(tracing, 'EXPORTER', exporter)
+    return exporter
+
+
+def export(exporter):
+    exporter.flush()
+    return {event['name']: event for event in tracing.load_trace(exporter.path)}
+
+
+class TestSpans:
+    """Test span nesting, sampling and export"""
+
+    def test_query_spans_nest_under_the_request(self, sqlite_db, exporter):
+        """Test controller -> query -> cursor -> pool wait share one trace"""
+        with tracing.start_span('controller.login') as root:
+            assert tracing.current_trace_id() == root.trace_id
+            database.execute_query("SELECT 1")
+        assert tracing.current_trace_id() is None
+
+        events = export(exporter)
+        assert {'controller.login', 'db.query', 'db.cursor', 'db.pool_wait'} <= set(events)
+        assert {event['args']['trace_id'] for event in events.values()} == {root.trace_id}
+        assert events['db.query']['args']['parent_id'] == root.span_id
+        assert events['db.cursor']['args']['parent_id'] == events['db.query']['args']['span_id']
+        assert events['db.pool_wait']['args']['parent_id'] == events['db.cursor']['args']['span_id']
+        assert events['db.query']['args']['sql'] == "SELECT 1"
+        assert events['db.query']['args']['rows'] == 1
+        assert events['db.query']['ph'] == 'X' and events['db.query']['dur'] >= 0
+
+    def test_threads_get_separate_traces(self, exporter):
+        """Test the current span does not leak into another thread"""
+        seen = []
+        with tracing.start_span('outer'):
+            thread = threading.Thread(target=lambda: seen.append(tracing.current_trace_id()))
+            thread.start()
+            thread.join()
+        assert seen == [None]
+
+    def test_errors_are_recorded(self, exporter):
+        """Test a span closed by an exception keeps the error"""
+        with pytest.raises(ValueError):
+            with tracing.start_span('failing'):
+                raise ValueError("boom")
+        assert export(exporter)['failing']['args']['error'] == "ValueError: boom"
+
+    def test_unsampled_trace_records_nothing(self, sqlite_db, exporter, monkeypatch):
+        """Test children of an unsampled root are skipped"""
+        monkeypatch.setattr(tracing, 'TRACE_SAMPLE_RATE', 0.0)
+        with tracing.start_span('request') as root:
+            assert root.trace_id is None
+            database.execute_query("SELECT 1")
+        assert exporter.flush() == 0
+
+    def test_log_emit_span_only_inside_a_trace(self, exporter):
+        """Test the logging pipeline adds a child span but never starts a trace"""
+        handler = BoundedQueueHandler(queue.Queue())
+        record = logging.LogRecord('app', logging.INFO, __file__, 1, "hello", None, None)
+        handler.handle(record)
+        assert exporter.flush() == 0
+        with tracing.start_span('request'):
+            handler.handle(record)
+        assert set(export(exporter)) == {'request', 'log.emit'}
+
+
+class TestDisabled:
+    """Test tracing costs nothing when it is off"""
+
+    def test_disabled_tracing_is_a_noop(self, monkeypatch):
+        """Test the shared no-op span is returned and functions stay unwrapped"""
+        monkeypatch.setattr(tracing, 'TRACING_ENABLED', False)
+
+        def work():
+            return 1
+
+        assert tracing.traced(work) is work
+        assert tracing.start_span('request') is tracing.NOOP_SPAN
+        with tracing.start_span('request'):
+            assert tracing.current_trace_id() is None